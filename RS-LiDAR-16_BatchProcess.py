@@ -0,0 +1,259 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Runs the RS-LiDAR-16 tools over many pcap files, with a pool of processes (one pcap per process at a time).
+Outputs of each pcap are saved under their own folder, OUTPUT_FOLDER/<pcap name>/, along with a log of what the tools printed.
+Prints the throughput of the whole batch, and which pcaps failed, at the end.
+
+How to use:
+Keep this file in the same folder as the RS-LiDAR-16 tools and the rslidar16 folder.
+Set up the other settings (eg. X_MAX, TARGET_FRAMES) in each tool as usual, PCAP_FILENAME and the output folders are set by this tool.
+Open cmd, run ./RS-LiDAR-16_BatchProcess.py "FOLDER_NAME" or ./RS-LiDAR-16_BatchProcess.py "FOLDER_NAME/*.pcap"
+
+Optional arguments:
+  -h, --help            show help message and exit
+  -t {pointcloud,layers,reflectivity} [{pointcloud,layers,reflectivity} ...], --tools {pointcloud,layers,reflectivity} [{pointcloud,layers,reflectivity} ...]
+                        Tools to run on each pcap.
+  -o OUTPUT_FOLDER, --output-folder OUTPUT_FOLDER
+                        Folder where outputs of each pcap are saved.
+  -j JOBS, --jobs JOBS  Number of pcaps processed at the same time, 0 for one per CPU.
+  -c, --frame-cache     If enabled, decoded frames are cached next to each pcap, so each pcap is only decoded once by all the tools.
+'''
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout, redirect_stderr
+import importlib.util
+import traceback
+import argparse
+import time
+import os
+from rslidar16 import find_pcap_files
+
+# Tool name: (filename of tool, function that runs the tool)
+TOOLS = {
+    "pointcloud": ("RS-LiDAR-16_PointCloud.py", "main"),
+    "layers": ("RS-LiDAR-16_PointCloudByLayers.py", "main"),
+    "reflectivity": ("RS-LiDAR-16_ReflectivityBySectors.py", "test"),
+}
+TOOL_FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+def parseArgs() -> argparse.Namespace:
+    """ Set up CLI args
+    """
+    parser = argparse.ArgumentParser(description="Runs RS-LiDAR-16 tools over many pcap files")
+    
+    parser.add_argument("inputs",
+                        nargs='+', action="store", metavar="INPUT",
+                        help="Folders of pcap files, pcap files, or glob patterns (eg. \"captures/*.pcap\").")
+    
+    parser.add_argument("-t", "--tools",
+                        nargs='+', choices=list(TOOLS), default=["pointcloud"],
+                        help="Tools to run on each pcap.")
+    
+    parser.add_argument("-o", "--output-folder",
+                        type=str, default="BatchOutput",
+                        help="Folder where outputs of each pcap are saved.")
+    
+    parser.add_argument("-j", "--jobs",
+                        type=int, default=0,
+                        help="Number of pcaps processed at the same time, 0 for one per CPU.")
+    
+    parser.add_argument("-c", "--frame-cache",
+                        default=False, action="store_true",
+                        help="If enabled, decoded frames are cached next to each pcap, so each pcap is only decoded once by all the tools.")
+    
+    args = parser.parse_args()
+    
+    return args
+
+def getOutputFolders(pcap_filenames: list[str], output_folder: str) -> list[str]:
+    """ Returns output folder of each pcap, OUTPUT_FOLDER/<pcap name>/
+        
+        Pcaps with the same name (in different folders) get a number added.
+
+        Args:
+           pcap_filenames: filenames of pcaps
+           output_folder: Folder where outputs of each pcap are saved
+    """
+    folders = []
+    used = set()
+    for filename in pcap_filenames:
+        name = os.path.splitext(os.path.basename(filename))[0]
+        folder = os.path.join(output_folder, name)
+        num = 1
+        while folder in used:
+            folder = os.path.join(output_folder, f"{name}_{num}")
+            num += 1
+        used.add(folder)
+        folders.append(folder)
+    return folders
+
+def load_tool(tool: str):
+    """ Returns tool as a new module, so no state is left over from a previous pcap
+
+        Args:
+           tool: name of tool (key of TOOLS)
+    """
+    filename = TOOLS[tool][0]
+    spec = importlib.util.spec_from_file_location(tool, os.path.join(TOOL_FOLDER, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def setup_tool(module, tool: str, pcap_filename: str, out_folder: str, frame_cache: bool):
+    """ Points tool at a pcap and its output folder, creates folders the tool expects
+
+        Args:
+           module: tool module (from load_tool)
+           tool: name of tool (key of TOOLS)
+           pcap_filename: Filename of input pcap file
+           out_folder: Output folder of the pcap
+           frame_cache: If true, tool reads decoded frames from the cache next to the pcap
+    """
+    module.PCAP_FILENAME = pcap_filename
+    module.USE_FRAME_CACHE = frame_cache
+    # Pcaps are already spread across processes
+    module.DECODE_WORKERS = 1
+    if tool in ("pointcloud", "layers"):
+        module.RENDER_WORKERS = 1
+    
+    if tool == "pointcloud":
+        module.IMAGE_FOLDER_NAME = os.path.join(out_folder, "PointCloud")
+        module.VIDEO_NAME = os.path.join(out_folder, "PointCloud.avi")
+        os.makedirs(module.IMAGE_FOLDER_NAME, exist_ok=True)
+    elif tool == "layers":
+        module.DATA_FOLDER_NAME = out_folder
+    elif tool == "reflectivity":
+        module.ROOT_FOLDER_NAME = out_folder
+        os.makedirs(os.path.join(out_folder, "ReflectivityRatioGraphs"), exist_ok=True)
+
+def process_pcap(pcap_filename: str, out_folder: str, tools: list[str], frame_cache: bool = False) -> dict:
+    """ Runs tools on one pcap (in a worker process), returns result of the pcap
+
+        What the tools print (and warnings) is saved to OUT_FOLDER/log.txt.
+
+        Args:
+           pcap_filename: Filename of input pcap file
+           out_folder: Output folder of the pcap
+           tools: names of tools to run (keys of TOOLS)
+           frame_cache: If true, decoded frames are cached next to the pcap and shared by the tools
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot
+    
+    os.makedirs(out_folder, exist_ok=True)
+    result = {
+        "pcap": pcap_filename,
+        "out_folder": out_folder,
+        "size": os.path.getsize(pcap_filename),
+        "error": None,
+    }
+    
+    start = time.perf_counter()
+    with open(os.path.join(out_folder, "log.txt"), "w") as log, redirect_stdout(log), redirect_stderr(log):
+        for tool in tools:
+            print(f"----- {tool} -----")
+            try:
+                module = load_tool(tool)
+                setup_tool(module, tool, pcap_filename, out_folder, frame_cache)
+                getattr(module, TOOLS[tool][1])()
+            except Exception as e:
+                traceback.print_exc(file=log)
+                result["error"] = f"{tool}: {type(e).__name__}: {str(e).strip()}"
+                break
+            finally:
+                matplotlib.pyplot.close("all")
+            print()
+    result["time"] = time.perf_counter() - start
+    
+    return result
+
+def print_summary(results: list[dict], elapsed: float):
+    """ Prints throughput of the batch, and which pcaps failed
+
+        Args:
+           results: results of each pcap (from process_pcap)
+           elapsed: seconds taken by the whole batch
+    """
+    failed = [r for r in results if r["error"] is not None]
+    total_mb = sum(r["size"] for r in results) / 1e6
+    
+    print("-"*20)
+    print(f"Processed {len(results)} pcaps ({total_mb:.1f} MB) in {elapsed:.1f}s")
+    print(f"Throughput: {total_mb / elapsed:.2f} MB/s, {len(results) / elapsed:.2f} pcaps/s")
+    print(f"Succeeded: {len(results) - len(failed)}, Failed: {len(failed)}")
+    for r in failed:
+        print(f"  FAILED {r['pcap']}")
+        print(f"    {r['error']}")
+        print(f"    See {os.path.join(r['out_folder'], 'log.txt')}")
+
+def main():
+    
+    args = parseArgs()
+    
+    PCAP_FILENAMES = find_pcap_files(args.inputs)
+    if len(PCAP_FILENAMES) == 0:
+        print("NO PCAP FILES FOUND")
+        return
+    OUT_FOLDERS = getOutputFolders(PCAP_FILENAMES, args.output_folder)
+    JOBS = args.jobs if args.jobs > 0 else os.cpu_count()
+    
+    print(f"Processing {len(PCAP_FILENAMES)} pcaps with {JOBS} processes")
+    
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(JOBS, len(PCAP_FILENAMES))) as pool:
+        futures = {
+            pool.submit(process_pcap, pcap_filename, out_folder, args.tools, args.frame_cache): pcap_filename
+            for pcap_filename, out_folder in zip(PCAP_FILENAMES, OUT_FOLDERS)
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # Worker process died (eg. out of memory)
+                pcap_filename = futures[future]
+                result = {
+                    "pcap": pcap_filename,
+                    "out_folder": OUT_FOLDERS[PCAP_FILENAMES.index(pcap_filename)],
+                    "size": os.path.getsize(pcap_filename),
+                    "error": f"{type(e).__name__}: {e}",
+                    "time": 0.0,
+                }
+            status = "FAILED" if result["error"] else "DONE"
+            print(f"[{len(results) + 1}/{len(PCAP_FILENAMES)}] {status} {result['pcap']} ({result['time']:.1f}s)")
+            results.append(result)
+    
+    print_summary(results, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Watches the reflectivity ratios of each sector (same ratios as RS-LiDAR-16_ReflectivityBySectors.py) frame by frame,
+and prints an alert as soon as a frame moves away from the rolling baselines (see rslidar16/anomaly.py).
+Works on a pcap file, or on packets received live from the sensor (or from RS-LiDAR-16_ReplayPcap.py).
+At the end, the number of frames, alerts and the time taken per frame are printed.
+
+How to use:
+Keep this file in the same folder as the rslidar16 folder.
+Open cmd, run ./RS-LiDAR-16_DetectAnomalies.py "capture.pcap"
+or ./RS-LiDAR-16_DetectAnomalies.py -l 6699 to watch packets received on UDP port 6699
+
+Optional arguments:
+  -h, --help            show help message and exit
+  -l PORT, --live PORT  Receive packets live on this UDP port instead of reading a pcap.
+  --idle-timeout IDLE_TIMEOUT
+                        Seconds without packets before live receiving stops, 0 to wait forever.
+  -n NUM_SECTORS, --num-sectors NUM_SECTORS
+                        Number of equal sectors.
+  -t THRESHOLDS [THRESHOLDS ...], --thresholds THRESHOLDS [THRESHOLDS ...]
+                        Reflectivity values (0-255) ratios are taken at.
+  -a ALPHA, --alpha ALPHA
+                        Weight of each new frame in the rolling baselines.
+  -z LIMIT, --limit LIMIT
+                        Standard deviations from a baseline a ratio is flagged at.
+  -w WARMUP, --warmup WARMUP
+                        Frames used to build the baselines before anything is flagged.
+  --min-std MIN_STD     Smallest standard deviation used.
+  -o OUTPUT_CSV, --output-csv OUTPUT_CSV
+                        Filename to save alerts to (CSV).
+  --source SOURCE       Only use packets sent from this IPv4 address, for pcaps with more than 1 sensor.
+'''
+
+import argparse
+import csv
+import time
+from rslidar16 import (EWMA_ALPHA, MIN_STD, WARMUP_FRAMES, Z_LIMIT, ReflectivityAlert, ReflectivityDetector,
+                       iter_frames, iter_live_frames)
+
+def parseArgs() -> argparse.Namespace:
+    """ Set up CLI args
+    """
+    parser = argparse.ArgumentParser(description="Flags RS-LiDAR-16 frames with unusual reflectivity ratios")
+    
+    parser.add_argument("pcap_filename",
+                        action="store", metavar="PCAP_FILENAME", nargs="?",
+                        help="Filename of input pcap file.")
+    
+    parser.add_argument("-l", "--live",
+                        type=int, default=None, metavar="PORT",
+                        help="Receive packets live on this UDP port instead of reading a pcap.")
+    
+    parser.add_argument("--idle-timeout",
+                        type=float, default=5,
+                        help="Seconds without packets before live receiving stops, 0 to wait forever.")
+    
+    parser.add_argument("-n", "--num-sectors",
+                        type=int, default=4,
+                        help="Number of equal sectors.")
+    
+    parser.add_argument("-t", "--thresholds",
+                        type=int, nargs="+", default=[32, 64, 96, 128, 160, 192],
+                        help="Reflectivity values (0-255) ratios are taken at.")
+    
+    parser.add_argument("-a", "--alpha",
+                        type=float, default=EWMA_ALPHA,
+                        help="Weight of each new frame in the rolling baselines.")
+    
+    parser.add_argument("-z", "--limit",
+                        type=float, default=Z_LIMIT,
+                        help="Standard deviations from a baseline a ratio is flagged at.")
+    
+    parser.add_argument("-w", "--warmup",
+                        type=int, default=WARMUP_FRAMES,
+                        help="Frames used to build the baselines before anything is flagged.")
+    
+    parser.add_argument("--min-std",
+                        type=float, default=MIN_STD,
+                        help="Smallest standard deviation used.")
+    
+    parser.add_argument("-o", "--output-csv",
+                        type=str, default=None,
+                        help="Filename to save alerts to (CSV).")
+    
+    parser.add_argument("--source",
+                        type=str, default=None,
+                        help="Only use packets sent from this IPv4 address, for pcaps with more than 1 sensor.")
+    
+    args = parser.parse_args()
+    if args.pcap_filename is None and args.live is None:
+        parser.error("either PCAP_FILENAME or --live PORT is required")
+    
+    return args
+
+def format_alert(alert: ReflectivityAlert, sectors: list[tuple[float, float]]) -> str:
+    """ Returns alert as one line of text
+
+        Args:
+           alert: Alert from ReflectivityDetector
+           sectors: (start, end) of each sector (in degrees)
+    """
+    start, end = sectors[alert.sector]
+    return (f"Frame {alert.frame} ({alert.timestamp:.3f}s): sector {alert.sector} ({start:g}-{end:g}deg) "
+            f"ratio > {alert.threshold} is {alert.ratio:.4f}, baseline {alert.mean:.4f} "
+            f"({alert.score:.1f} std, {alert.flagged} ratios flagged)")
+
+def main():
+    
+    args = parseArgs()
+    
+    deg_per_sector = 360 / args.num_sectors
+    sectors = [(i * deg_per_sector, (i + 1) * deg_per_sector) for i in range(args.num_sectors)]
+    detector = ReflectivityDetector(sectors, args.thresholds, args.alpha, args.limit, args.warmup, args.min_std)
+    
+    if args.live is not None:
+        print(f"Receiving on UDP port {args.live}")
+        frames = iter_live_frames(args.live, idle_timeout=args.idle_timeout or None, source=args.source)
+    else:
+        frames = iter_frames(args.pcap_filename, source=args.source)
+    
+    alerts = []
+    latencies = []
+    for number, frame in frames:
+        # Frame 1 starts wherever the capture does, so it only covers part of a turn and would skew the baselines.
+        # The last, open frame is never yielded, iter_frames and iter_live_frames stop at the last complete turn
+        if number == 1:
+            continue
+        
+        # Time from the frame being complete to its alert (if any) being printed
+        start = time.perf_counter()
+        alert = detector.process(frame)
+        if alert is not None:
+            print(format_alert(alert, sectors), flush=True)
+            alerts.append(alert)
+        latencies.append(time.perf_counter() - start)
+    
+    print(f"{detector.frames} frames, {detector.alerts} alerts")
+    if latencies:
+        print(f"Time per frame: mean {sum(latencies) / len(latencies) * 1000:.2f}ms, max {max(latencies) * 1000:.2f}ms")
+    
+    if args.output_csv:
+        with open(args.output_csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(ReflectivityAlert._fields)
+            writer.writerows(alerts)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Reads user-provided pcap files of several RS-LiDAR-16 sensors (or one pcap holding packets of all of them).
+Merges frames (one frame every 360 degrees) of the sensors by time, moves points of each sensor into a common frame.
+Generates each merged point cloud, saves to user-defined folder.
+
+How to use:
+Upload pcaps of the LiDAR ethernet streams to same folder as this file.
+Add each sensor to SENSORS: pcap name, IP address of the sensor (None if the pcap only holds that sensor),
+and where the sensor is in the common frame (x, y, z in meters, roll, pitch, yaw in degrees).
+Create folder for point cloud images, change IMAGE_FOLDER_NAME to the folder name.
+
+Change X_MAX, Y_MAX, Z_MAX accordingly to fit data required.
+Set COLOR_BY_SENSOR to True to color points by sensor instead of reflectivity.
+Set USE_DIFOP_CALIBRATION to True to use the vertical angles calibrated for each unit, if the pcaps have DIFOP packets.
+Change MAX_SKEW to the max difference in start time of merged frames.
+Set RENDER_WORKERS to save images with more than 1 process, while the next frames are merged.
+Set IMAGE_FORMAT to save images as "jpeg", "webp", or "npy" (one raw image stack) instead of "png".
+Images are saved by WRITER_THREADS threads in the background, while the next frames are rendered.
+'''
+
+# (pcap filename, sensor IP address or None, x, y, z, roll, pitch, yaw) of each sensor
+SENSORS = [
+    ("front.pcap", None, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+    ("rear.pcap", None, -1.0, 0.0, 0.0, 0.0, 0.0, 180.0),
+]
+X_MAX = 3                                  # Point cloud will display from -X_MAX to +X_MAX (in meters)
+Y_MAX = X_MAX                              # Point cloud will display from -Y_MAX to +Y_MAX (in meters)
+Z_MAX = 1                                  # Point cloud will display from -Z_MAX to +Z_MAX (in meters)
+COLOR_BY_SENSOR = False                    # If true, points are colored by sensor instead of reflectivity
+USE_DIFOP_CALIBRATION = False              # If true, uses vertical angles calibrated for each unit (from DIFOP packets in the pcaps)
+MAX_SKEW = 0.05                            # Max difference in start time of merged frames (in seconds)
+RENDER_WORKERS = 1                         # Number of processes to save images with, 0 for one per CPU
+IMAGE_FOLDER_NAME = "foldername"           # Where images of point cloud will be saved (NEED TO CREATE FOLDER BEFOREHAND)
+IMAGE_FORMAT = "png"                       # "png", "jpeg", "webp", or "npy" (all frames in one raw image stack, IMAGE_FOLDER_NAME/images)
+PNG_COMPRESSION = 6                        # zlib level of PNG images (0-9), lower is faster and larger
+IMAGE_QUALITY = 90                         # Quality of JPEG and WebP images (0-100)
+WRITER_THREADS = 2                         # Number of threads saving images in the background, 0 to save each image before rendering the next
+
+from rslidar16 import Sensor, SyncedFrames, extrinsic_matrix, iter_synced_frames, PointCloudRenderer, RenderPool, Rendered, ImageWriter
+
+writer = None   # Saves the rendered images in the background (rslidar16.ImageWriter)
+
+def process_frames(sensors: list[Sensor]) -> int:
+    """ Saves each merged frame of the sensors as an image, returns number of frames saved
+
+        Args:
+           sensors: sensors to merge (from get_sensors)
+    """
+    global writer
+    
+    # Render pool is closed first, so its last images still reach the writer
+    with ImageWriter(IMAGE_FORMAT, WRITER_THREADS, compression=PNG_COMPRESSION, quality=IMAGE_QUALITY) as writer, \
+         RenderPool(make_renderer(), RENDER_WORKERS, callback=frame_rendered) as pool:
+        for synced in iter_synced_frames(sensors, MAX_SKEW, USE_DIFOP_CALIBRATION):
+            save_frame(pool, synced)
+    return pool.rendered
+
+def get_sensors() -> list[Sensor]:
+    """ Returns sensors in SENSORS, with their extrinsic transforms
+    """
+    return [
+        Sensor(pcap_filename, source, extrinsic_matrix(x, y, z, roll, pitch, yaw), f"Sensor {i}")
+        for i, (pcap_filename, source, x, y, z, roll, pitch, yaw) in enumerate(SENSORS)
+    ]
+
+def make_renderer() -> PointCloudRenderer:
+    """ Returns renderer of the merged frames, for RenderPool
+    """
+    # Images are handed back for the image writer, not saved by the renderer
+    if COLOR_BY_SENSOR:
+        return PointCloudRenderer(X_MAX, Y_MAX, Z_MAX, cmap="tab10", color_range=(0, 9), save=False)
+    return PointCloudRenderer(X_MAX, Y_MAX, Z_MAX, save=False)
+
+def save_frame(pool: RenderPool, synced: SyncedFrames):
+    """ Hands 3D point cloud of a merged frame to the render pool, saved as an image under IMAGE_FOLDER_NAME
+
+        Args:
+           pool: render pool (from rslidar16.RenderPool)
+           synced: frames of all sensors (from rslidar16.iter_synced_frames)
+    """
+    xyz, intensity, sensor = synced.fused()
+    
+    # Only plot points inside the graph
+    keep = (abs(xyz[:, 0]) <= X_MAX) & (abs(xyz[:, 1]) <= Y_MAX) & (abs(xyz[:, 2]) <= Z_MAX)
+    color = sensor[keep] if COLOR_BY_SENSOR else intensity[keep]
+    pool.submit(xyz[keep], color, f"{IMAGE_FOLDER_NAME}/{str(synced.number).zfill(3)}", f'Frame {str(synced.number).zfill(3)}')
+
+def frame_rendered(rendered: Rendered):
+    """ Hands merged frame rendered by the render pool to the image writer
+
+        Args:
+           rendered: rendered frame (from rslidar16.Rendered)
+    """
+    writer.write(rendered.filename, rendered.image)
+    print(f"SAVED! {rendered.title}", end="\r")
+    
+def main():
+    """Merge frames of the sensors and save each merged frame"""
+    num_frames = process_frames(get_sensors())
+    
+    print(f"Finished processing {num_frames} images")
+
+if __name__ == '__main__':
+    main()
@@ -31,202 +31,137 @@ For Robosense RS-LiDAR-16
 What this does:
 Reads user-provided pcap file.
 Generates each frame (one frame every 360 degrees), saves to user-defined folder.
-Combines frames into video.
+Adds each frame to a video as soon as it is generated, in frame order.
 
 How to use:
 Upload pcap of LiDAR ethernet stream to same folder as this file, change PCAP_FILENAME to the pcap name.
 Create folder for point cloud images, change IMAGE_FOLDER_NAME to the folder name.
-Change VIDEO_NAME to desired name.
+Change VIDEO_NAME to desired name, or set it to None to only save images.
+Set SAVE_IMAGES to False to only make the video, without saving each frame as an image.
+Set IMAGE_FORMAT to save images as "jpeg", "webp", or "npy" (one raw image stack) instead of "png".
+Images are saved by WRITER_THREADS threads in the background, while the next frames are rendered.
 
 Change X_MAX, Y_MAX, Z_MAX accordingly to fit data required.
 Set IGNORE_OUT_OF_RANGE to True to reduce calculations required.
+Set USE_DIFOP_CALIBRATION to True to use the vertical angles calibrated for the unit, if the pcap has DIFOP packets.
+Set DECODE_WORKERS to decode the pcap with more than 1 process.
+Set RENDER_WORKERS to save images with more than 1 process, while the next frames are decoded.
+Set RENDER_BACKEND to "numpy" to draw images straight from the points (much faster, no axes or title), seen from RASTER_VIEW.
+Set USE_FRAME_CACHE to True to keep the decoded frames next to the pcap (PCAP_FILENAME.framecache), so later runs of any RS-LiDAR-16 tool skip decoding.
+Set LIVE_PORT to the MSOP port (usually 6699) to save frames received live from the sensor instead of reading PCAP_FILENAME, stops after LIVE_IDLE_TIMEOUT seconds without packets.
 '''
 
 X_MAX = 3                                  # Point cloud will display from -X_MAX to +X_MAX (in meters)
 Y_MAX = X_MAX                              # Point cloud will display from -Y_MAX to +Y_MAX (in meters)
 Z_MAX = 1                                  # Point cloud will display from -Z_MAX to +Z_MAX (in meters)
 IGNORE_OUT_OF_RANGE = True                 # If true, will not plot points out of X_MAX, Y_MAX, Z_MAX
+USE_DIFOP_CALIBRATION = False              # If true, uses vertical angles calibrated for the unit (from DIFOP packets in the pcap)
+DECODE_WORKERS = 1                         # Number of processes to decode pcap with, 0 for one per CPU
+RENDER_WORKERS = 1                         # Number of processes to save images with, 0 for one per CPU
+RENDER_BACKEND = "matplotlib"              # "matplotlib" for 3D plots with axes, or "numpy" to draw points straight into an image (much faster)
+RASTER_VIEW = "camera"                     # View drawn by the numpy backend, "camera" (same angle as the 3D plot), "bev" (from above) or "side"
+USE_FRAME_CACHE = False                    # If true, decoded frames are cached next to the pcap and reused by later runs
+LIVE_PORT = None                           # If set, frames are received live from the sensor on this UDP port instead of read from PCAP_FILENAME
+LIVE_IDLE_TIMEOUT = 5                      # Seconds without packets before live receiving stops
 IMAGE_FOLDER_NAME = "foldername"           # Where images of point cloud will be saved (NEED TO CREATE FOLDER BEFOREHAND)
-VIDEO_NAME = "video_filename.avi"              # Filename of output video
+VIDEO_NAME = "video_filename.avi"              # Filename of output video, None for no video
+VIDEO_FPS = 10                             # Frames per second of output video
+SAVE_IMAGES = True                         # If false, frames only go into the video, no images are saved
+IMAGE_FORMAT = "png"                       # "png", "jpeg", "webp", or "npy" (all frames in one raw image stack, IMAGE_FOLDER_NAME/images)
+PNG_COMPRESSION = 6                        # zlib level of PNG images (0-9), lower is faster and larger
+IMAGE_QUALITY = 90                         # Quality of JPEG and WebP images (0-100)
+WRITER_THREADS = 2                         # Number of threads saving images in the background, 0 to save each image before rendering the next
 PCAP_FILENAME = "wireshark_pcap_filename.pcap" # Filename of input pcap file
 
-import dpkt
-from math import sin, cos, radians, sqrt
-import matplotlib.pyplot as plt
+from math import sqrt
+from rslidar16 import iter_frames, iter_live_frames, load_trig_tables, load_live_trig_tables, CompactFrame, TrigTables, PointCloudRenderer, RasterRenderer, RenderPool, Rendered, VideoSink, ImageWriter
 
-def print_packets(pcap):
-    """ Print out information about each packet in a pcap
+video = None    # Video the frames are added to as they are rendered (rslidar16.VideoSink)
+writer = None   # Saves the rendered images in the background (rslidar16.ImageWriter)
 
-        Adapted from: https://github.com/kbandla/dpkt/blob/master/examples/print_packets.py
+def process_frames(pcap_filename: str) -> int:
+    """ Saves each frame in a pcap as an image, returns number of frames saved
 
         Args:
-           pcap: dpkt pcap reader object (dpkt.pcap.Reader)
+           pcap_filename: Filename of input pcap file
     """
-    # For each packet in the pcap process the contents
-    for timestamp, buf in pcap:
+    trig = load_trig_tables(pcap_filename, USE_DIFOP_CALIBRATION)
+    return render_frames(iter_frames(pcap_filename, workers=DECODE_WORKERS, cache=USE_FRAME_CACHE), trig)
 
-        # Unpack the Ethernet frame (mac src/dst, ethertype)
-        eth = dpkt.ethernet.Ethernet(buf)
-
-        # Make sure the Ethernet data contains an IP packet
-        if not isinstance(eth.data, dpkt.ip.IP):
-            print('Non IP Packet type not supported %s\n' % eth.data.__class__.__name__)
-            continue
-        
-        # Extract out the data, check headers before processing
-        pktdata = eth.data.data.data
-        try:
-            header = pktdata[0:42]
-            if header[0:8].hex() == "55aa050a5aa550a0":
-                process_pkt(pktdata)
-        except:
-            pass
-
-cnt = 1
-x = []
-y = []
-z = []
-intensity = []
-
-def process_pkt(pktdata):
-    global X_MAX, Y_MAX, Z_MAX
-    global IGNORE_OUT_OF_RANGE, IMAGE_FOLDER_NAME, VIDEO_NAME, PCAP_FILENAME
-    global cnt, x, y, z, intensity
-    """ Print out information for returned values
+def process_live_frames(port: int) -> int:
+    """ Saves each frame received live from the sensor as an image, returns number of frames saved
 
         Args:
-           pktdata: packet data (dpkt.ethernet.Ethernet(buf).data.data.data)
+           port: UDP port to receive MSOP packets on
     """
-    
-    
-    # Extract datablocks, each datablock starts with 0xffee
-    datablocks = []
-    idxlist = [42, 142, 242, 342, 442, 542, 642, 742, 842, 942, 1042, 1142]
-    for idx in idxlist:
-        datablocks.append(pktdata[idx:idx+100])
-    
-    # Process each datablock
-    for block in datablocks:
-        
-        azimuth1 = get_azimuth(block[2:4])
-        azimuth2 = (azimuth1 + 0.35) % 360
-        
-        # If complete 1 360deg turn, add new frame
-        if (0.01< azimuth1 < 0.1 or 0.01< azimuth2 < 0.1) and len(x) > 10:
-            
-            fig = plt.figure(figsize=(7.2, 7.2))
-            ax = fig.add_subplot(projection='3d')
-            # xyz as coords, . as marker, s is marker size, c is color of marker, cmap is color map which ranges from 0-255
-            ax.scatter(x, y, z, marker=".", s = 1, c = intensity, cmap = "viridis")
-            
-            # Set plot axes limits
-            ax.axes.set_xlim3d(left=-X_MAX, right=X_MAX) 
-            ax.axes.set_ylim3d(bottom=-Y_MAX, top=Y_MAX) 
-            ax.axes.set_zlim3d(bottom=-Z_MAX, top=Z_MAX) 
-            
-            # Save as image
-            plt.title(f'Frame {str(cnt).zfill(3)}')
-            plt.savefig(fname = f"{IMAGE_FOLDER_NAME}\{str(cnt).zfill(3)}")
-            print(f"SAVED! Frame {str(cnt).zfill(3)}", end="\r")
-            plt.close()
-            
-            # Reset values
-            cnt += 1
-            x = []
-            y = []
-            z = []
-            intensity = []
-        
-        # split into both returns, return 2 will have +0.35deg
-        return1 = block[4:52]
-        return2 = block[52:]
-        
-        channellist = [-15, -13, -11, -9, -7, -5, -3, -1, 15, 13, 11, 9, 7, 5, 3, 1]
-        
-        for i in range(0, len(return1), 3):
-            # If IGNORE_OUT_OF_RANGE and distance to point is more than graph display, pass
-            if IGNORE_OUT_OF_RANGE and (get_distance(return1[i:i+3][0:2]) > sqrt(X_MAX**2 + Y_MAX**2 + Z_MAX**2)):
-                pass
-            else:
-                coords = polar_to_cartesian(return1[i:i+3], azimuth1, channellist[i//3])
-                
-                x.append(coords[0])
-                y.append(coords[1])
-                z.append(coords[2])
-                intensity.append(return1[i:i+3][2])
-                
-        for i in range(0, len(return2), 3):
-            # If IGNORE_OUT_OF_RANGE and distance to point is more than graph display, pass
-            if IGNORE_OUT_OF_RANGE and (get_distance(return2[i:i+3][0:2]) > sqrt(X_MAX**2 + Y_MAX**2 + Z_MAX**2)):
-                pass
-            else:
-                coords = polar_to_cartesian(return2[i:i+3], azimuth2, channellist[i//3])
-                
-                x.append(coords[0])
-                y.append(coords[1])
-                z.append(coords[2])
-                intensity.append(return2[i:i+3][2])
-        
-def polar_to_cartesian(bytedata, horizangle, vertangle):
-    """ Returns (x, y, z) cartesian coordinates.
+    trig = load_live_trig_tables(USE_DIFOP_CALIBRATION)
+    return render_frames(iter_live_frames(port, idle_timeout=LIVE_IDLE_TIMEOUT), trig)
 
-        Args:
-           bytedata: 3-byte data to be converted (2-byte distance value, 1-byte reflectivity)
-           horizangle: Horizontal angle corresponding to return
-           vertangle: Vertical angle corresponding to channel
-    """
-    r = get_distance(bytedata[0:2])
-    x = r * sin(radians(90-vertangle)) * cos(radians(horizangle))
-    y = r * sin(radians(90-vertangle)) * sin(radians(horizangle))
-    z = r * cos(radians(90-vertangle))
-    return (x, y, z)
-
-def get_distance(bytedata):
-    """ Returns decimal distance value.
+def render_frames(frame_iter, trig: TrigTables) -> int:
+    """ Renders each frame, saved under IMAGE_FOLDER_NAME and added to VIDEO_NAME in frame order, returns number of frames rendered
 
         Args:
-           bytedata: 2-byte data to be converted
+           frame_iter: Iterable of (frame number, frame), from rslidar16.iter_frames or rslidar16.iter_live_frames
+           trig: sin/cos lookup tables (from rslidar16.load_trig_tables)
+    """
+    global video, writer
+    video = VideoSink(VIDEO_NAME, VIDEO_FPS) if VIDEO_NAME else None
+    writer = ImageWriter(IMAGE_FORMAT, WRITER_THREADS, compression=PNG_COMPRESSION, quality=IMAGE_QUALITY) if SAVE_IMAGES else None
+    try:
+        with RenderPool(make_renderer(), RENDER_WORKERS, callback=frame_rendered) as pool:
+            for cnt, frame in frame_iter:
+                save_frame(pool, frame, cnt, trig)
+    finally:
+        if writer is not None:
+            writer.close()
+        if video is not None:
+            video.close()
+    return pool.rendered
+
+def make_renderer():
+    """ Returns renderer of RENDER_BACKEND, for RenderPool
     """
-    return int(bytedata.hex(), 16)/100
+    # Images are handed back for the video and the image writer, not saved by the renderer
+    if RENDER_BACKEND == "numpy":
+        return RasterRenderer(RASTER_VIEW, ((-X_MAX, X_MAX), (-Y_MAX, Y_MAX), (-Z_MAX, Z_MAX)), save=False)
+    return PointCloudRenderer(X_MAX, Y_MAX, Z_MAX, save=False)
 
-def get_azimuth(bytedata):
-    """ Returns decimal azimuth value.
+def save_frame(pool: RenderPool, frame: CompactFrame, cnt: int, trig: TrigTables):
+    """ Hands 3D point cloud of a frame to the render pool, saved as an image under IMAGE_FOLDER_NAME
 
         Args:
-           bytedata: 2-byte data to be converted
+           pool: render pool (from rslidar16.RenderPool)
+           frame: points of the frame (from rslidar16.iter_frames)
+           cnt: frame number
+           trig: sin/cos lookup tables (from rslidar16.load_trig_tables)
     """
-    return int(bytedata.hex(), 16)/100
+    # If IGNORE_OUT_OF_RANGE and distance to point is more than graph display, pass
+    if IGNORE_OUT_OF_RANGE:
+        frame = frame[frame.distance <= sqrt(X_MAX**2 + Y_MAX**2 + Z_MAX**2)]
     
-def convert_to_video():
-    """ Converts images in IMAGE_FOLDER_NAME to a .avi video, saved as VIDEO_NAME
-    """
-    import cv2
-    import os
-
-    image_folder = IMAGE_FOLDER_NAME
-    video_name = VIDEO_NAME
-
-    images = [img for img in os.listdir(image_folder) if img.endswith(".png")]
-    frame = cv2.imread(os.path.join(image_folder, images[0]))
-    height, width, layers = frame.shape
+    # Named by frame number, so names do not depend on which worker saves the image
+    pool.submit(frame.xyz(trig), frame.intensity, f"{IMAGE_FOLDER_NAME}/{str(cnt).zfill(3)}", f'Frame {str(cnt).zfill(3)}')
 
-    video = cv2.VideoWriter(video_name, 0, 10, (width,height))
+def frame_rendered(rendered: Rendered):
+    """ Hands frame rendered by the render pool to the image writer, and adds it to the video (frames arrive in frame order)
 
-    for image in images:
-        video.write(cv2.imread(os.path.join(image_folder, image)))
-
-    cv2.destroyAllWindows()
-    video.release()
-    
+        Args:
+           rendered: rendered frame (from rslidar16.Rendered)
+    """
+    if writer is not None:
+        writer.write(rendered.filename, rendered.image)
+    if video is not None:
+        video.write(rendered.image)
+    print(f"SAVED! {rendered.title}", end="\r")
+        
 def main():
-    """Open up a test pcap file and print out the packets"""
-    with open(PCAP_FILENAME, 'rb') as f:
-        print("Opened file")
-        pcap = dpkt.pcap.Reader(f)
-        print_packets(pcap)
+    """Open up a test pcap file and save each frame"""
+    if LIVE_PORT:
+        num_frames = process_live_frames(LIVE_PORT)
+    else:
+        num_frames = process_frames(PCAP_FILENAME)
     
-    print("Finished processing images")    
-    convert_to_video()
+    print(f"Finished processing {num_frames} images")    
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -39,12 +39,25 @@ Change IMAGE_FOLDER_NAME to the folder name. Point cloud images will be saved un
 
 Change X_START, X_END, Y_START, Y_END, Z_MAX accordingly to fit data required.
 Change TARGET_FRAME_START and TARGET_FRAME_END accordingly to choose desired frames
+(Optional) Change TARGET_TIME_START and TARGET_TIME_END to choose frames by time instead
+(Optional) Set USE_DIFOP_CALIBRATION to True to use the vertical angles calibrated for the unit, if the pcap has DIFOP packets
+(Optional) Set DECODE_WORKERS to decode the pcap with more than 1 process
+(Optional) Set RENDER_WORKERS to save images with more than 1 process, while the next frames are decoded
+(Optional) Set RENDER_BACKEND to "numpy" to draw images straight from the points (much faster, no axes or title)
+(Optional) Set IMAGE_FORMAT to save images as "jpeg", "webp", or "npy" (one raw image stack per folder) instead of "png",
+images are saved by WRITER_THREADS threads in the background, while the next layers are rendered
+(Optional) Set LAYER_GRID to True to save all 16 layers of a frame in one 4x4 grid image, under DATA_FOLDER_NAME/PointCloudByLayers/Grid
+(Optional) Set USE_FRAME_CACHE to True to keep the decoded frames next to the pcap (PCAP_FILENAME.framecache), so later runs of any RS-LiDAR-16 tool skip decoding
+(Optional) Set LIVE_PORT to the MSOP port (usually 6699) to process frames received live from the sensor instead of reading PCAP_FILENAME,
+frames are then counted from the first packet received, and TARGET_TIME_START/END are not used
+
+On first run, frame positions are indexed and saved next to the pcap (PCAP_FILENAME.frameidx.npz),
+later runs go straight to the desired frames.
 '''
 
-import dpkt
-from math import sin, cos, radians
-import matplotlib.pyplot as plt
+import numpy as np
 import os
+from rslidar16 import PcapReader, FrameIndex, iter_frames, iter_live_frames, load_trig_tables, load_live_trig_tables, CompactFrame, TrigTables, LayerGridRenderer, LayerRenderer, RasterRenderer, RenderPool, Rendered, ImageWriter
 
 
 X_START = -4        # Min X coords (left)
@@ -53,152 +66,142 @@ Y_START = -3        # Min Y coords (bottom)
 Y_END = 2           # Max Y coords (top)
 TARGET_FRAME_START = 65 # Frame to start processing (inclusive)
 TARGET_FRAME_END = 105  # Frame to stop processing (inclusive)
+TARGET_TIME_START = None    # (Optional) Seconds from start of capture to start processing, overrides TARGET_FRAME_START/END
+TARGET_TIME_END = None      # (Optional) Seconds from start of capture to stop processing
+USE_DIFOP_CALIBRATION = False   # If true, uses vertical angles calibrated for the unit (from DIFOP packets in the pcap)
+DECODE_WORKERS = 1              # Number of processes to decode pcap with, 0 for one per CPU
+RENDER_WORKERS = 1              # Number of processes to save images with, 0 for one per CPU
+RENDER_BACKEND = "matplotlib"   # "matplotlib" for plots with axes, or "numpy" to draw points straight into an image (much faster)
+IMAGE_FORMAT = "png"            # "png", "jpeg", "webp", or "npy" (all frames of a folder in one raw image stack, FOLDER/images)
+PNG_COMPRESSION = 6             # zlib level of PNG images (0-9), lower is faster and larger
+IMAGE_QUALITY = 90              # Quality of JPEG and WebP images (0-100)
+WRITER_THREADS = 2              # Number of threads saving images in the background, 0 to save each image before rendering the next
+LAYER_GRID = False              # If true, all 16 layers of a frame are saved in one 4x4 grid image (matplotlib only), instead of one image per layer
+USE_FRAME_CACHE = False         # If true, decoded frames are cached next to the pcap and reused by later runs
+LIVE_PORT = None                # If set, frames are received live from the sensor on this UDP port instead of read from PCAP_FILENAME
+LIVE_IDLE_TIMEOUT = 5           # Seconds without packets before live receiving stops
 DATA_FOLDER_NAME = "foldername"           # Where data of images of point cloud is saved (relative to this file)
 PCAP_FILENAME = "foldername/pcapfilename.pcap"    # Filename of input pcap file (relative to this file)
 
+writer = None    # Saves the rendered images in the background (rslidar16.ImageWriter)
 
 
-def print_packets(pcap: dpkt.pcap.Reader):
-    """Print out information about each packet in a pcap
+def target_frames(index: FrameIndex) -> range:
+    """ Returns frame numbers to process, from TARGET_TIME_START/END or TARGET_FRAME_START/END
 
-        Adapted from: https://github.com/kbandla/dpkt/blob/master/examples/print_packets.py
-
-       Args:
-           pcap: dpkt pcap reader object (dpkt.pcap.Reader)
+        Args:
+           index: frame index of the pcap (rslidar16.FrameIndex)
     """
-    # For each packet in the pcap process the contents
-    for timestamp, buf in pcap:
-
-        # Unpack the Ethernet frame (mac src/dst, ethertype)
-        eth = dpkt.ethernet.Ethernet(buf)
-
-        # Make sure the Ethernet data contains an IP packet
-        if not isinstance(eth.data, dpkt.ip.IP):
-            print('Non IP Packet type not supported %s\n' % eth.data.__class__.__name__)
-            continue
-        
-        # Extract out the data, check headers before processing
-        pktdata = eth.data.data.data
-        try:
-            header = pktdata[0:42]
-            # print(f"Header: {header[0:8].hex()}")
-            if header[0:8].hex() == "55aa050a5aa550a0":
-                process_pkt(pktdata)
-        except:
-            pass
+    # Last frame is not a complete 360deg turn, skip it
+    last_frame = len(index) - 1
+    
+    if TARGET_TIME_START != None and TARGET_TIME_END != None:
+        frames = index.frames_between(index.start_time + TARGET_TIME_START, index.start_time + TARGET_TIME_END)
+    elif TARGET_FRAME_START and TARGET_FRAME_END != None:
+        frames = range(TARGET_FRAME_START, TARGET_FRAME_END + 1)
+    else:
+        frames = range(1, last_frame + 1)
+    
+    return range(max(frames.start, 1), min(frames.stop, last_frame + 1))
 
-# Global vars
-cnt = 1
-all_coords = [[] for i in range(16)]
-theta = []
+def process_frames(pcap_filename: str) -> int:
+    """ Process each target frame in a pcap, returns number of frames processed
 
-def process_pkt(pktdata):
-    """Print out information for returned values
+        Frames are found using the frame index saved next to the pcap (built on first run),
+        so packets before the target frames are not read.
 
-       Args:
-           pktdata: packet data (dpkt.ethernet.Ethernet(buf).data.data.data)
+        Args:
+           pcap_filename: Filename of input pcap file
     """
-    global DATA_FOLDER_NAME, PCAP_FILENAME
-    global cnt, all_coords
-    
-    # Extract datablocks, each datablock starts with 0xffee
-    datablocks = []
-    idxlist = [42, 142, 242, 342, 442, 542, 642, 742, 842, 942, 1042, 1142]
-    for idx in idxlist:
-        datablocks.append(pktdata[idx:idx+100])
-    
-    # Process each datablock
-    for block in datablocks:
-        
-        azimuth1 = get_azimuth(block[2:4])
-        azimuth2 = (azimuth1 + 0.35) % 360
-        
-        # If complete 1 360deg turn, add new frame
-        if (0.01< azimuth1 < 0.1 or 0.01< azimuth2 < 0.1) and len(all_coords[0]) > 10:
-            
-            # Check if target frames are set
-            if TARGET_FRAME_START and TARGET_FRAME_END != None:
-            # Check if within target frame, else can skip
-                if TARGET_FRAME_START <= cnt and TARGET_FRAME_END >= cnt:
-                    for i in range(16):
-                        generateFrames(all_coords[i], i)
-                else:
-                    print(f"Skipping frame {cnt}" + " "*35, end="\r")
-                        
-            # Else if no target frames set, just run all        
-            else:
-                for i in range(16):
-                        generateFrames(all_coords[i], i)
-            # Reset values
-            cnt += 1
-            all_coords = [[] for i in range(16)]
-        
-        # split into both returns, return 2 will have +0.35deg
-        return1 = block[4:52]
-        return2 = block[52:]
-        channellist = [-15, -13, -11, -9, -7, -5, -3, -1, 15, 13, 11, 9, 7, 5, 3, 1]
-        
-        for i in range(0, len(return1), 3):
-            coords = polar_to_cartesian(return1[i:i+3], azimuth1, channellist[i//3])
-            all_coords[i//3].append(coords)
-                
-        for i in range(0, len(return2), 3):
-            coords = polar_to_cartesian(return2[i:i+3], azimuth2, channellist[i//3])
-            all_coords[i//3].append(coords)
-
-def generateFrames(plane_coords: list[tuple[float, float]], plane: int):
-    global cnt, DATA_FOLDER_NAME
-    
-    # Create data list
-    x = [i[0] for i in plane_coords]
-    y = [i[1] for i in plane_coords]
-    
-    # Plot
-    fig, ax = plt.subplots()
-    ax.scatter(x, y, marker=".", s=0.4)
+    with PcapReader(pcap_filename) as pcap:
+        frames = target_frames(FrameIndex.load_or_build(pcap))
+    if len(frames) == 0:
+        return 0
     
-    # Set marker limits
-    ax.set_xlim(X_START, X_END)
-    ax.set_ylim(Y_START, Y_END)
-    
-    # Set title
-    ax.set_title(f'Frame {str(cnt).zfill(3)}')
-    # plt.show()
+    global writer
+    trig = load_trig_tables(pcap_filename, USE_DIFOP_CALIBRATION)
+    # Frames past the end of the capture are never decoded, so only count those that were
+    num_frames = 0
+    # Render pool is closed first, so its last images still reach the writer
+    with make_writer() as writer, RenderPool(make_renderer(), RENDER_WORKERS, callback=layer_rendered) as pool:
+        for cnt, frame in iter_frames(pcap_filename, frames.start, frames.stop - 1, workers=DECODE_WORKERS, cache=USE_FRAME_CACHE):
+            process_frame(pool, frame, cnt, trig)
+            num_frames += 1
+    return num_frames
+
+def process_live_frames(port: int) -> int:
+    """ Process each target frame received live from the sensor, returns number of frames processed
+
+        Args:
+           port: UDP port to receive MSOP packets on
+    """
+    first_frame = TARGET_FRAME_START or 1
+    last_frame = TARGET_FRAME_END
     
-    # Save and close plot
-    plt.savefig(fname = f"{DATA_FOLDER_NAME}/PointCloudByLayers/Layer{str(plane).zfill(2)}/{str(cnt).zfill(3)}")
-    print(f"Saved in: {DATA_FOLDER_NAME}/PointCloudByLayers/Layer{str(plane).zfill(2)}/{str(cnt).zfill(3)}", end="\r")
-    plt.close()
+    global writer
+    trig = load_live_trig_tables(USE_DIFOP_CALIBRATION)
+    num_frames = 0
+    with make_writer() as writer, RenderPool(make_renderer(), RENDER_WORKERS, callback=layer_rendered) as pool:
+        for cnt, frame in iter_live_frames(port, first_frame=first_frame, last_frame=last_frame, idle_timeout=LIVE_IDLE_TIMEOUT):
+            process_frame(pool, frame, cnt, trig)
+            num_frames += 1
+    return num_frames
+
+def make_renderer():
+    """ Returns renderer of RENDER_BACKEND, for RenderPool
+    """
+    # Images are handed back for the image writer, not saved by the renderer
+    if LAYER_GRID:
+        return LayerGridRenderer(X_START, X_END, Y_START, Y_END, save=False)
+    if RENDER_BACKEND == "numpy":
+        # Same size as the matplotlib plots, seen from above
+        return RasterRenderer("bev", ((X_START, X_END), (Y_START, Y_END), None), size=(640, 480), save=False)
+    return LayerRenderer(X_START, X_END, Y_START, Y_END, save=False)
+
+def make_writer() -> ImageWriter:
+    """ Returns image writer of IMAGE_FORMAT
+    """
+    return ImageWriter(IMAGE_FORMAT, WRITER_THREADS, compression=PNG_COMPRESSION, quality=IMAGE_QUALITY)
 
-def polar_to_cartesian(bytedata: str, horizangle: float, vertangle: float) -> tuple[float, float, float]:
-    """ Returns (x, y, z) cartesian coordinates.
+def process_frame(pool: RenderPool, frame: CompactFrame, cnt: int, trig: TrigTables):
+    """ Generates each layer of a frame
 
-        Args:
-           bytedata: 3-byte data to be converted (2-byte distance value, 1-byte reflectivity)
-           horizangle: Horizontal angle corresponding to return
-           vertangle: Vertical angle corresponding to channel
+       Args:
+           pool: render pool (from rslidar16.RenderPool)
+           frame: points of the frame (from rslidar16.iter_frames)
+           cnt: frame number
+           trig: sin/cos lookup tables (from rslidar16.load_trig_tables)
     """
-    r = get_distance(bytedata[0:2])
-    x = r * sin(radians(90-vertangle)) * cos(radians(horizangle))
-    y = r * sin(radians(90-vertangle)) * sin(radians(horizangle))
-    z = r * cos(radians(90-vertangle))
-    return (x, y, z)
+    xyz = frame.xyz(trig)
+    
+    if LAYER_GRID:
+        layers = [xyz[frame.channel == i, :2] for i in range(16)]
+        pool.submit(layers, None, f"{DATA_FOLDER_NAME}/PointCloudByLayers/Grid/{str(cnt).zfill(3)}", f'Frame {str(cnt).zfill(3)}')
+        return
+    
+    for i in range(16):
+        layer = frame.channel == i
+        generateFrames(pool, xyz[layer, :2], i, cnt)
 
-def get_distance(bytedata: str) -> float:
-    """ Returns decimal distance value.
+def generateFrames(pool: RenderPool, plane_coords: np.ndarray, plane: int, cnt: int):
+    """ Hands one layer of a frame to the render pool, saved under DATA_FOLDER_NAME/PointCloudByLayers/LayerXY
 
-        Args:
-           bytedata: 2-byte data to be converted
+       Args:
+           pool: render pool (from rslidar16.RenderPool)
+           plane_coords: (x, y) of each point of the layer
+           plane: layer number
+           cnt: frame number
     """
-    return int(bytedata.hex(), 16)/100
+    pool.submit(plane_coords, None, f"{DATA_FOLDER_NAME}/PointCloudByLayers/Layer{str(plane).zfill(2)}/{str(cnt).zfill(3)}", f'Frame {str(cnt).zfill(3)}')
 
-def get_azimuth(bytedata: str) -> float:
-    """ Returns decimal azimuth value.
+def layer_rendered(rendered: Rendered):
+    """ Hands layer rendered by the render pool to the image writer
 
-        Args:
-           bytedata: 2-byte data to be converted
+       Args:
+           rendered: rendered layer (from rslidar16.Rendered)
     """
-    return int(bytedata.hex(), 16)/100
+    writer.write(rendered.filename, rendered.image)
+    print(f"Saved in: {rendered.filename}", end="\r")
 
 def createDirectories(DATA_FOLDER_NAME: str):
     """ Creates directories for files to be saved in.
@@ -212,6 +215,14 @@ def createDirectories(DATA_FOLDER_NAME: str):
     except FileExistsError:
         print(f"Directory '{DATA_FOLDER_NAME}/PointCloudByLayers' already exists.")
         
+    if LAYER_GRID:
+        try:
+            os.mkdir(f"{DATA_FOLDER_NAME}/PointCloudByLayers/Grid")
+            print(f"Directory '{DATA_FOLDER_NAME}/PointCloudByLayers/Grid' created successfully.")
+        except FileExistsError:
+            print(f"Directory '{DATA_FOLDER_NAME}/PointCloudByLayers/Grid' already exists.")
+        return
+    
     for i in range(16):
         try:
             os.mkdir(f"{DATA_FOLDER_NAME}/PointCloudByLayers/Layer{str(i).zfill(2)}")
@@ -223,13 +234,13 @@ def createDirectories(DATA_FOLDER_NAME: str):
 def main():
     createDirectories(DATA_FOLDER_NAME)
 
-    """Open up a test pcap file and print out the packets"""
-    with open(PCAP_FILENAME, 'rb') as f:
-        print("Opened file")
-        pcap = dpkt.pcap.Reader(f)
-        print_packets(pcap)
+    """Open up a test pcap file and generate each target frame"""
+    if LIVE_PORT:
+        num_frames = process_live_frames(LIVE_PORT)
+    else:
+        num_frames = process_frames(PCAP_FILENAME)
     
-    print(f"\nFinished processing {cnt-1} frames")    
+    print(f"\nFinished processing {num_frames} frames")    
     
 
 if __name__ == '__main__':
@@ -31,67 +31,86 @@ For Robosense RS-LiDAR-16
 What this does:
 Reads user-provided pcap file.
 Plots graph of ratio of points with user-defined reflectivity, to total amount of points, in a given sector.
-Number of sectors of a point cloud is user-defined, under `NUM_SECTORS`. Each sector will be NUM_SECTORS/360 degrees.
+Number of sectors of a point cloud is user-defined, under `NUM_SECTORS`. Each sector will be 360/NUM_SECTORS degrees.
 Threshold values are user-defined, under `ratios`.
+Ratios come from one histogram of each frame (azimuth x layer x intensity, see rslidar16/reflectivity.py),
+so any number of thresholds and sectors costs about the same.
 
 How to use:
 Change TARGET_FRAMES to array of integers of frames to plot in graph
+(Optional) Change TARGET_TIME_START and TARGET_TIME_END to choose frames by time instead
+(Optional) Set DECODE_WORKERS to decode the pcap with more than 1 process
+(Optional) Set USE_FRAME_CACHE to True to keep the decoded frames next to the pcap (PCAP_FILENAME.framecache), so later runs of any RS-LiDAR-16 tool skip decoding
+(Optional) Set LIVE_PORT to the MSOP port (usually 6699) to process frames received live from the sensor instead of reading PCAP_FILENAME,
+frames are then counted from the first packet received, and TARGET_TIME_START/END are not used
+(Optional) Set SECTOR_SLICE_DEGREES (with LIVE_PORT) to receive each frame in slices of that many degrees, ratios of each sector
+are then printed as soon as the sensor has turned past its end, instead of once the frame is done
+(Optional) Set STREAM_RATIOS to True to write the sector ratios of each frame to the metrics store as soon as it is decoded,
+then drop its points, so only one frame is held in memory no matter how many frames are processed
+(Optional) Set EXPORT_CSV to True to also save the sector ratios as a csv file
+
+Sector ratios of each frame are saved under ROOT_FOLDER_NAME/DetectAttack/metrics, one .npy file per column
+(frame, timestamp, points, ratios) and schema.json (see rslidar16/metrics.py), replacing those of earlier runs.
+Open them with rslidar16.MetricsTable.open for further analysis.
 Change ROOT_FOLDER_NAME to the folder name to where data will be stored.
 Upload pcap of LiDAR ethernet stream to same folder as this file, change PCAP_FILENAME to the pcap name.
 
 Change NUM_SECTORS to desired number of sectors
-Change ratios to 6 reflectivity values to set as threshold
+(Optional) Set SECTOR_EDGES to a list of (start, end) degrees of each sector instead, sectors can be of any size
+Change ratios to reflectivity values to set as threshold (any number of values)
+
+On first run, frame positions are indexed and saved next to the pcap (PCAP_FILENAME.frameidx.npz),
+later runs go straight to the desired frames.
 '''
 
-import dpkt
-from math import sin, cos, radians
 import matplotlib.pyplot as plt
-import numpy as np
 import os
+from rslidar16 import PcapReader, FrameIndex, MetricsTable, MetricsWriter, ReflectivityHistogram, SectorAccumulator, SectorSlicer, edge_codes_for, threshold_ratios, iter_frames, iter_live_frames, iter_live_slices
   
 TARGET_FRAMES = [x for x in range(180)] # Frames to plot in graph
 ROOT_FOLDER_NAME = "FOLDER_NAME"    # Where folder of frames of point cloud will be saved
 PCAP_FILENAME = "FOLDER_NAME/FILENAME.pcap"    # Filename of input pcap file
+TARGET_TIME_START = None    # (Optional) Seconds from start of capture to start plotting, overrides TARGET_FRAMES
+TARGET_TIME_END = None      # (Optional) Seconds from start of capture to stop plotting
+DECODE_WORKERS = 1              # Number of processes to decode pcap with, 0 for one per CPU
+USE_FRAME_CACHE = False         # If true, decoded frames are cached next to the pcap and reused by later runs
+LIVE_PORT = None                # If set, frames are received live from the sensor on this UDP port instead of read from PCAP_FILENAME
+LIVE_IDLE_TIMEOUT = 5           # Seconds without packets before live receiving stops
+SECTOR_SLICE_DEGREES = None     # (Optional) With LIVE_PORT, frames are received in slices of this many degrees, and ratios of each sector are printed as soon as it is done. Sector edges must fall on slice edges
+STREAM_RATIOS = False           # If true, ratios of each frame are written to the metrics store as soon as it is decoded, instead of keeping every frame until the end
+EXPORT_CSV = False              # If true, also saves the sector ratios of each frame as ROOT_FOLDER_NAME/DetectAttack/metrics.csv
 
 NUM_SECTORS = 4    # Number of sectors
+SECTOR_EDGES = None    # (Optional) List of (start, end) degrees of each sector, eg. [(0, 45), (45, 180), (180, 360)], overrides NUM_SECTORS
 
 ratios = [32, 64, 96, 128, 160, 192]    # Threhold reflectivity values (0-256)
 
 
 
-def plot_frame_intensities(log_data, sector_num):
-    # Parse the log data
-    lines = log_data.strip().split('\n')
-    frame_numbers = []
-    intensity1 = []
-    intensity2 = []
-    intensity3 = []
-    intensity4 = []
-    intensity5 = []
-    intensity6 = []
-
-    for line in lines:
-        parts = line.split('|')
-        frame_part = parts[0].strip()
-        frame_num = int(frame_part.split()[1])  # Extract frame number
-        frame_numbers.append(frame_num)
-        intensity1.append(float(parts[1].strip()))
-        intensity2.append(float(parts[2].strip()))
-        intensity3.append(float(parts[3].strip()))
-        intensity4.append(float(parts[4].strip()))
-        intensity5.append(float(parts[5].strip()))
-        intensity6.append(float(parts[6].strip()))
+def get_sectors() -> list[tuple[float, float]]:
+    """ Returns (start, end) of each sector (in degrees), from SECTOR_EDGES or NUM_SECTORS """
+    if SECTOR_EDGES:
+        return [(float(start), float(end)) for start, end in SECTOR_EDGES]
+    deg_per_sector = 360 // NUM_SECTORS
+    return [(i * deg_per_sector, (i + 1) * deg_per_sector) for i in range(NUM_SECTORS)]
+
+def plot_frame_intensities(table: MetricsTable, sector_num: int):
+    """ Plots ratio of each threshold in a sector over frames
+
+        Args:
+           table: sector metrics of each frame (from rslidar16.MetricsTable)
+           sector_num: sector number
+    """
+    frame_numbers = table["frame"]
+    # Each ratio is a view of the store, no copy is made
+    sector_ratios = table["ratios"][:, sector_num]
 
     # Plotting
     plt.figure(figsize=(12, 6))
     
-    # Plot each intensity column
-    plt.plot(frame_numbers, intensity1, label = ratios[0])
-    plt.plot(frame_numbers, intensity2, label = ratios[1])
-    plt.plot(frame_numbers, intensity3, label = ratios[2])
-    plt.plot(frame_numbers, intensity4, label = ratios[3])
-    plt.plot(frame_numbers, intensity5, label = ratios[4])
-    plt.plot(frame_numbers, intensity6, label = ratios[5])
+    # Plot each threshold
+    for i, threshold in enumerate(table.attributes["thresholds"]):
+        plt.plot(frame_numbers, sector_ratios[:, i], label = threshold)
 
     # Formatting the plot
     plt.xlabel('Frame Number')
@@ -101,180 +120,208 @@ def plot_frame_intensities(log_data, sector_num):
     plt.grid(True)
     plt.tight_layout()
     # plt.show()
-    plt.savefig(fname = f"{ROOT_FOLDER_NAME}/ReflectivityRatioGraphs/sector{sector_num}")
+    plt.savefig(fname = f"{ROOT_FOLDER_NAME}/ReflectivityRatioGraphs/sector{str(sector_num).zfill(3)}")
+    plt.close()
 
 
 class Frame:
-    DEG_PER_SECTOR = 360 // NUM_SECTORS
+    """ Ratios of each sector of a frame, from its reflectivity histogram
+
+        Args:
+           histogram: counts of the frame by azimuth, channel and intensity (from rslidar16.ReflectivityHistogram)
+           number: frame number
+           timestamp: timestamp (in seconds) of the first packet of the frame
+    """
     
-    def __init__(self, data: np.array):
-        self.sector_illum_data = self.init_illum_data(data)
-        
-    def init_illum_data(self, data: np.array):
-        output = []
-        for i in range(0, 360, self.DEG_PER_SECTOR):
-            filtered = data[(data[:, 1] >= i) & (data[:, 1] <= i+self.DEG_PER_SECTOR)]
-            output.append(filtered)
-        return output
+    def __init__(self, histogram: ReflectivityHistogram, number: int = 0, timestamp: float = 0.0):
+        self.number = number
+        self.timestamp = timestamp
+        self.sectors = get_sectors()
+        # Points of each sector and intensity, shape (sectors, 256)
+        self.intensity_counts = histogram.sector_counts(self.sectors, by_channel=False)
+        # Ratio of every sector and threshold, shape (sectors, thresholds)
+        self.reflectivity_ratios = threshold_ratios(self.intensity_counts, ratios)
     
     def get_reflectivity_ratio(self, sector_num: int, threshold: int):
-        count = np.sum(self.sector_illum_data[sector_num][:, 3] > threshold)
-        return count / self.sector_illum_data[sector_num][:, 3].size
+        counts = self.intensity_counts[sector_num]
+        return counts[threshold + 1:].sum() / counts.sum()
+
+
+def target_frames(index: FrameIndex) -> list[int]:
+    """ Returns frame numbers to process, from TARGET_TIME_START/END or TARGET_FRAMES
+
+        Args:
+           index: frame index of the pcap (rslidar16.FrameIndex)
+    """
+    # Last frame is not a complete 360deg turn, skip it
+    last_frame = len(index) - 1
     
-    def write_to_log(self, frame_num: int, sector_num: int):
-        a = self.get_reflectivity_ratio(sector_num, ratios[0])
-        b = self.get_reflectivity_ratio(sector_num, ratios[1])
-        c = self.get_reflectivity_ratio(sector_num, ratios[2])
-        d = self.get_reflectivity_ratio(sector_num, ratios[3])
-        e = self.get_reflectivity_ratio(sector_num, ratios[4])
-        f = self.get_reflectivity_ratio(sector_num, ratios[5])
-        
-        with open(f"{ROOT_FOLDER_NAME}/DetectAttack/log{str(sector_num).zfill(3)}", "a") as file:
-            file.write(f"Frame {str(frame_num).zfill(3)} | {str(a)} | {str(b)} | {str(c)} | {str(d)} | {str(e)} | {str(f)} \n")
+    if TARGET_TIME_START != None and TARGET_TIME_END != None:
+        frames = index.frames_between(index.start_time + TARGET_TIME_START, index.start_time + TARGET_TIME_END)
+    else:
+        frames = sorted(set(TARGET_FRAMES))
+    
+    return [frame for frame in frames if 1 <= frame <= last_frame]
 
+all_frames = []
+metrics_writer = None
 
-def print_packets(pcap):
-    """Print out information about each packet in a pcap
+def process_frames(pcap_filename: str) -> int:
+    """ Process each target frame in a pcap, returns number of frames processed
 
-        Adapted from: https://github.com/kbandla/dpkt/blob/master/examples/print_packets.py
+        Frames are found using the frame index saved next to the pcap (built on first run),
+        so packets before and after the target frames are not read.
 
-       Args:
-           pcap: dpkt pcap reader object (dpkt.pcap.Reader)
+        Args:
+           pcap_filename: Filename of input pcap file
+    """
+    if len(TARGET_FRAMES) == 0 and (TARGET_TIME_START == None or TARGET_TIME_END == None):
+        print("PLEASE SET TARGET FRAMES")
+        return 0
+    
+    with PcapReader(pcap_filename) as pcap:
+        frames = target_frames(FrameIndex.load_or_build(pcap))
+    if len(frames) == 0:
+        return 0
+    
+    return process_target_frames(iter_frames(pcap_filename, frames[0], frames[-1], workers=DECODE_WORKERS, cache=USE_FRAME_CACHE), frames)
+
+def process_live_frames(port: int) -> int:
+    """ Process each target frame received live from the sensor, returns number of frames processed
+
+        Args:
+           port: UDP port to receive MSOP packets on
     """
-    # For each packet in the pcap process the contents
-    for timestamp, buf in pcap:
+    frames = [frame for frame in sorted(set(TARGET_FRAMES)) if frame >= 1]
+    if len(frames) == 0:
+        print("PLEASE SET TARGET FRAMES")
+        return 0
+    
+    if SECTOR_SLICE_DEGREES:
+        return process_live_slices(port, frames)
+    return process_target_frames(iter_live_frames(port, first_frame=frames[0], last_frame=frames[-1], idle_timeout=LIVE_IDLE_TIMEOUT), frames)
 
-        # Unpack the Ethernet frame (mac src/dst, ethertype)
-        eth = dpkt.ethernet.Ethernet(buf)
+def process_target_frames(frame_iter, frames: list[int]) -> int:
+    """ Adds each target frame to all_frames, or writes its ratios to the metrics store if STREAM_RATIOS is set.
+        Returns number of frames processed
 
-        # Make sure the Ethernet data contains an IP packet
-        if not isinstance(eth.data, dpkt.ip.IP):
-            print('Non IP Packet type not supported %s\n' % eth.data.__class__.__name__)
+        Args:
+           frame_iter: Iterable of (frame number, frame), from rslidar16.iter_frames or rslidar16.iter_live_frames
+           frames: Frame numbers to keep
+    """
+    edges = edge_codes_for(get_sectors())
+    num_frames = 0
+    for cnt, frame in frame_iter:
+        if cnt not in frames:
+            print(f"Skipping frame {str(cnt).zfill(3)}" + " "*35, end="\r")
             continue
         
-        # Extract out the data, check headers before processing
-        pktdata = eth.data.data.data
-        try:
-            header = pktdata[0:42]
-            # print(f"Header: {header[0:8].hex()}")
-            if header[0:8].hex() == "55aa050a5aa550a0":
-                process_pkt(pktdata)
-        except:
-            pass
-
-cnt = 1
-frame_data = np.array([0, 0, 0, 0]) # distance, horiz_angle, vert_angle, intensity
-all_frames = []
+        histogram = ReflectivityHistogram.from_points(frame.points, edges)
+        if STREAM_RATIOS:
+            # Points are dropped once the ratios are written, only one frame is held in memory
+            write_frame_metrics(Frame(histogram, cnt, frame.timestamp))
+        else:
+            data_to_Frame_obj(histogram, cnt, frame.timestamp)
+        num_frames += 1
+        print(f"Saved frame {str(cnt).zfill(3)}"+ " "*35)
+    return num_frames
+
+def sector_slice_ranges(sectors: list[tuple[float, float]], slicer: SectorSlicer) -> list[tuple[int, int]]:
+    """ Returns (first, last) slice number of each sector (inclusive)
 
-def data_to_Frame_obj(frame_data: np.array):
-    """Converts np.array to Frame object
-
-       Args:
-           frame_data: np.array of [distance, horiz_angle, vert_angle, intensity] of each angle
+        Args:
+           sectors: (start, end) of each sector (in degrees)
+           slicer: slicer the slices come from (rslidar16.SectorSlicer)
     """
-    frame_data = frame_data[1:]
-    f = Frame(frame_data)
-    all_frames.append(f)
+    slice_ranges = []
+    for start, end in sectors:
+        start_code, end_code = int(round(start * 100)), int(round(end * 100))
+        if start_code % slicer.width or (end_code % slicer.width and end_code != 36000):
+            raise ValueError(f"Sector edges must be multiples of SECTOR_SLICE_DEGREES ({SECTOR_SLICE_DEGREES}deg)")
+        slice_ranges.append((start_code // slicer.width, -(-end_code // slicer.width) - 1))
+    return slice_ranges
 
-def write_all_frames_to_log():
-    for i in range(len(all_frames)):
-        for j in range(NUM_SECTORS):
-            all_frames[i].write_to_log(i, j)
+def process_live_slices(port: int, frames: list[int]) -> int:
+    """ Process each target frame received live from the sensor slice by slice (SECTOR_SLICE_DEGREES), returns number of frames processed
 
-def process_pkt(pktdata):
-    global ROOT_FOLDER_NAME, PCAP_FILENAME
-    global cnt, frame_data
-    """Print out information for returned values
+        Ratios of each sector are printed as soon as its last slice has arrived, mid-rotation.
+        Each frame is added to all_frames (or the metrics store) once all of its slices have arrived.
 
-       Args:
-           pktdata: packet data (dpkt.ethernet.Ethernet(buf).data.data.data)
+        Args:
+           port: UDP port to receive MSOP packets on
+           frames: Frame numbers to keep
     """
+    slicer = SectorSlicer(SECTOR_SLICE_DEGREES)
+    sectors = get_sectors()
+    slice_ranges = sector_slice_ranges(sectors, slicer)
+    edges = edge_codes_for(sectors)
+    accumulator = SectorAccumulator(slicer.num_slices)
     
-    # Extract datablocks, each datablock starts with 0xffee
-    datablocks = []
-    idxlist = [42, 142, 242, 342, 442, 542, 642, 742, 842, 942, 1042, 1142]
-    for idx in idxlist:
-        datablocks.append(pktdata[idx:idx+100])
-    
-    # Process each datablock
-    for block in datablocks:
-        if cnt > max(TARGET_FRAMES): return
-        azimuth1 = get_azimuth(block[2:4])
-        azimuth2 = (azimuth1 + 0.35) % 360
+    num_frames = 0
+    for piece in iter_live_slices(port, slice_degrees=SECTOR_SLICE_DEGREES, idle_timeout=LIVE_IDLE_TIMEOUT):
+        if piece.frame > frames[-1]:
+            break
+        if piece.frame not in frames:
+            print(f"Skipping frame {str(piece.frame).zfill(3)}" + " "*35, end="\r")
+            continue
         
-        # If complete 1 360deg turn, add new frame
-        if (0.01 < azimuth1 < 0.5 or 0.01 < azimuth2 < 0.5) and frame_data.size > 500:
-            
-            # Check if target frames are set
-            if len(TARGET_FRAMES) > 0:
-            # Check if within target frame, else can skip
-                if cnt in TARGET_FRAMES:                 
-                    data_to_Frame_obj(frame_data)
-                    print(f"Saved frame {str(cnt).zfill(3)}"+ " "*35)
-                    
-                else:
-                    print(f"Skipping frame {str(cnt).zfill(3)}" + " "*35, end="\r")
-                        
-            # Else if no target frames set, just run all        
-            else:
-                print("PLEASE SET TARGET FRAMES")
-            
-            # Reset values
-            cnt += 1
-            frame_data = np.array([0, 0, 0, 0])
-            
-        # split into both returns, return 2 will have +0.35deg
-        return1 = block[4:52]
-        return2 = block[52:]
-        channellist = [-15, -13, -11, -9, -7, -5, -3, -1, 15, 13, 11, 9, 7, 5, 3, 1]
+        accumulator.add(piece)
+        for sector_num, (first, last) in enumerate(slice_ranges):
+            if piece.sector == last:
+                sector_ratios = ", ".join(f"{threshold}: {accumulator.reflectivity_ratio(threshold, first, last):.4f}" for threshold in ratios)
+                print(f"Frame {str(piece.frame).zfill(3)} sector {sector_num}: {sector_ratios}")
         
-        for i in range(0, len(return1), 3):
-            distance = get_distance(return1[i:i+3][0:2])
-            horiz_angle = azimuth1
-            vert_angle = channellist[i//3]
-            intensity = return1[i:i+3][2]
-            
-            temp = np.array([distance, horiz_angle, vert_angle, intensity])
-            frame_data = np.vstack((frame_data, temp))
-                
-        for i in range(0, len(return2), 3):
-            distance = get_distance(return2[i:i+3][0:2])
-            horiz_angle = azimuth2
-            vert_angle = channellist[i//3]
-            intensity = return2[i:i+3][2]
-            
-            temp = np.array([distance, horiz_angle, vert_angle, intensity])
-            frame_data = np.vstack((frame_data, temp))
-
-def polar_to_cartesian(bytedata: str, horizangle: float, vertangle: float) -> tuple[float, float, float]:
-    """ Returns (x, y, z) cartesian coordinates.
-
-        Args:
-           bytedata: 3-byte data to be converted (2-byte distance value, 1-byte reflectivity)
-           horizangle: Horizontal angle corresponding to return
-           vertangle: Vertical angle corresponding to channel
-    """
-    r = get_distance(bytedata[0:2])
-    x = r * sin(radians(90-vertangle)) * cos(radians(horizangle))
-    y = r * sin(radians(90-vertangle)) * sin(radians(horizangle))
-    z = r * cos(radians(90-vertangle))
-    return (x, y, z)
+        if accumulator.complete:
+            histogram = ReflectivityHistogram.from_points(accumulator.to_frame().points, edges)
+            if STREAM_RATIOS:
+                write_frame_metrics(Frame(histogram, piece.frame, accumulator.timestamp))
+            else:
+                data_to_Frame_obj(histogram, piece.frame, accumulator.timestamp)
+            num_frames += 1
+            print(f"Saved frame {str(piece.frame).zfill(3)}"+ " "*35)
+    return num_frames
 
-def get_distance(bytedata: str) -> float:
-    """ Returns decimal distance value.
+def data_to_Frame_obj(histogram: ReflectivityHistogram, number: int = 0, timestamp: float = 0.0):
+    """Converts histogram of a frame to Frame object, kept in all_frames
 
-        Args:
-           bytedata: 2-byte data to be converted
+       Args:
+           histogram: counts of the frame by azimuth, channel and intensity (from rslidar16.ReflectivityHistogram)
+           number: frame number
+           timestamp: timestamp (in seconds) of the first packet of the frame
     """
-    return int(bytedata.hex(), 16)/100
+    f = Frame(histogram, number, timestamp)
+    all_frames.append(f)
 
-def get_azimuth(bytedata: str) -> float:
-    """ Returns decimal azimuth value.
+def write_frame_metrics(f: Frame):
+    """ Adds sector ratios of a frame to the metrics store (ROOT_FOLDER_NAME/DetectAttack/metrics),
+        the store is opened on first use, replacing metrics of earlier runs
 
         Args:
-           bytedata: 2-byte data to be converted
+            f: Frame object
     """
-    return int(bytedata.hex(), 16)/100
+    global metrics_writer
+    if metrics_writer is None:
+        columns = {
+            "frame": ("i8", ()),
+            "timestamp": ("f8", ()),
+            "points": ("i8", (len(f.sectors),)),
+            "ratios": ("f8", (len(f.sectors), len(ratios))),
+        }
+        metrics_writer = MetricsWriter(f"{ROOT_FOLDER_NAME}/DetectAttack/metrics", columns, {"sectors": f.sectors, "thresholds": ratios})
+    metrics_writer.append(frame=f.number, timestamp=f.timestamp, points=f.intensity_counts.sum(axis=1), ratios=f.reflectivity_ratios)
+
+def write_all_frames_to_metrics():
+    for f in all_frames:
+        write_frame_metrics(f)
+
+def close_metrics():
+    """ Writes out the metrics store, returns its table (None if no frame was processed) """
+    global metrics_writer
+    if metrics_writer is None:
+        return None
+    metrics_writer.close()
+    metrics_writer = None
+    return MetricsTable.open(f"{ROOT_FOLDER_NAME}/DetectAttack/metrics")
 
 def createDirectories(ROOT_FOLDER_NAME: str):
     """ Creates directories for files to be saved in.
@@ -293,23 +340,28 @@ def test():
     createDirectories(ROOT_FOLDER_NAME)
 
     """Open up a test pcap file and print out the packets"""
-    with open(PCAP_FILENAME, 'rb') as f:
-        print("Opened file")
-        pcap = dpkt.pcap.Reader(f)
-        print_packets(pcap)
+    if LIVE_PORT:
+        num_frames = process_live_frames(LIVE_PORT)
+    else:
+        num_frames = process_frames(PCAP_FILENAME)
+    
+    print(f"Finished adding {num_frames}.")
     
-    print(f"Finished adding {cnt-1}.")
+    if not STREAM_RATIOS:
+        print(f"Writing all frames to metrics")
+        write_all_frames_to_metrics()
+    table = close_metrics()
+    if table is None:
+        return
     
-    print(f"Writing all frames to log")
-    write_all_frames_to_log()
+    if EXPORT_CSV:
+        table.to_csv(f"{ROOT_FOLDER_NAME}/DetectAttack/metrics.csv")
+        print(f"Saved {ROOT_FOLDER_NAME}/DetectAttack/metrics.csv")
     
     print("Drawing plots")
-    for i in range(0, NUM_SECTORS):
-        sector_num = str(i).zfill(3)
-        with open(f"{ROOT_FOLDER_NAME}/DetectAttack/log{sector_num}", "r") as f:
-            log_data= f.read()
-        plot_frame_intensities(log_data, sector_num)
-        print(f"Saved sector {sector_num}")
+    for i in range(0, len(table.attributes["sectors"])):
+        plot_frame_intensities(table, i)
+        print(f"Saved sector {str(i).zfill(3)}")
     print("Finished!")
 
 if __name__ == '__main__':
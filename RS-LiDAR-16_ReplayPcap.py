@@ -0,0 +1,111 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Sends the MSOP packets of a pcap file to a UDP port, as a stand-in for the sensor (see rslidar16/replay.py).
+Packets are sent with their original timing, faster or slower by a fixed multiple, or as fast as possible,
+then the packets/s reached and the pacing error (time sent minus time due) are printed.
+Use it to test the tools with LIVE_PORT set, or to measure how fast a live receiver keeps up.
+
+How to use:
+Keep this file in the same folder as the rslidar16 folder.
+Open cmd, run ./RS-LiDAR-16_ReplayPcap.py "capture.pcap"
+or ./RS-LiDAR-16_ReplayPcap.py "capture.pcap" -s 0 -n 10 to send it 10 times as fast as possible
+
+Optional arguments:
+  -h, --help            show help message and exit
+  --host HOST           Address to send packets to.
+  -p PORT, --port PORT  UDP port to send MSOP packets to.
+  --difop-port DIFOP_PORT
+                        UDP port to send DIFOP packets to.
+  --no-difop            If enabled, does not send DIFOP packets.
+  -s SPEED, --speed SPEED
+                        Multiple of real time to send at (eg. 1 for original timing, 2 for twice as fast), 0 for as fast as possible.
+  -n REPEAT, --repeat REPEAT
+                        Number of times to send the pcap.
+  --source SOURCE       Only send packets sent from this IPv4 address, for pcaps with more than 1 sensor.
+'''
+
+import argparse
+from rslidar16 import DIFOP_PORT, MSOP_PORT, replay_pcap
+
+def parseArgs() -> argparse.Namespace:
+    """ Set up CLI args
+    """
+    parser = argparse.ArgumentParser(description="Sends the MSOP packets of a RS-LiDAR-16 pcap file to a UDP port")
+    
+    parser.add_argument("pcap_filename",
+                        action="store", metavar="PCAP_FILENAME",
+                        help="Filename of input pcap file.")
+    
+    parser.add_argument("--host",
+                        type=str, default="127.0.0.1",
+                        help="Address to send packets to.")
+    
+    parser.add_argument("-p", "--port",
+                        type=int, default=MSOP_PORT,
+                        help="UDP port to send MSOP packets to.")
+    
+    parser.add_argument("--difop-port",
+                        type=int, default=DIFOP_PORT,
+                        help="UDP port to send DIFOP packets to.")
+    
+    parser.add_argument("--no-difop",
+                        default=False, action="store_true",
+                        help="If enabled, does not send DIFOP packets.")
+    
+    parser.add_argument("-s", "--speed",
+                        type=float, default=1.0,
+                        help="Multiple of real time to send at (eg. 1 for original timing, 2 for twice as fast), 0 for as fast as possible.")
+    
+    parser.add_argument("-n", "--repeat",
+                        type=int, default=1,
+                        help="Number of times to send the pcap.")
+    
+    parser.add_argument("--source",
+                        type=str, default=None,
+                        help="Only send packets sent from this IPv4 address, for pcaps with more than 1 sensor.")
+    
+    args = parser.parse_args()
+    
+    return args
+
+def main():
+    
+    args = parseArgs()
+    
+    difop_port = None if args.no_difop else args.difop_port
+    print(f"Sending {args.pcap_filename} to {args.host}:{args.port}")
+    for _ in range(args.repeat):
+        report = replay_pcap(args.pcap_filename, args.host, args.port, args.speed, difop_port, args.source)
+        print(report.format())
+
+if __name__ == "__main__":
+    main()
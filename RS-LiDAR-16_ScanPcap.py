@@ -0,0 +1,159 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Checks pcap files for packet loss, reordering and timing gaps, without decoding any points (see rslidar16/scan.py).
+Prints a report of each pcap: missing, out of order and duplicate packets, azimuth jumps, timing gaps,
+jitter of time between packets, and packets per frame.
+Several pcaps are checked at the same time, so a day of captures can be checked in minutes.
+
+How to use:
+Keep this file in the same folder as the rslidar16 folder.
+Open cmd, run ./RS-LiDAR-16_ScanPcap.py "FOLDER_NAME" or ./RS-LiDAR-16_ScanPcap.py "FOLDER_NAME/*.pcap"
+
+Optional arguments:
+  -h, --help            show help message and exit
+  -j JOBS, --jobs JOBS  Number of pcaps checked at the same time, 0 for one per CPU.
+  -e EVENTS, --events EVENTS
+                        Max number of problems listed for each pcap.
+  -o OUTPUT_CSV, --output-csv OUTPUT_CSV
+                        If set, saves a summary of each pcap (one row per pcap) to this csv file.
+'''
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import time
+import csv
+import os
+from rslidar16 import PcapReader, ScanReport, find_pcap_files, scan_pcap
+
+def parseArgs() -> argparse.Namespace:
+    """ Set up CLI args
+    """
+    parser = argparse.ArgumentParser(description="Checks RS-LiDAR-16 pcap files for packet loss, reordering and timing gaps")
+    
+    parser.add_argument("inputs",
+                        nargs='+', action="store", metavar="INPUT",
+                        help="Folders of pcap files, pcap files, or glob patterns (eg. \"captures/*.pcap\").")
+    
+    parser.add_argument("-j", "--jobs",
+                        type=int, default=0,
+                        help="Number of pcaps checked at the same time, 0 for one per CPU.")
+    
+    parser.add_argument("-e", "--events",
+                        type=int, default=20,
+                        help="Max number of problems listed for each pcap.")
+    
+    parser.add_argument("-o", "--output-csv",
+                        type=str, default="",
+                        help="If set, saves a summary of each pcap (one row per pcap) to this csv file.")
+    
+    args = parser.parse_args()
+    
+    return args
+
+def scan_file(pcap_filename: str):
+    """ Returns ScanReport of a pcap (in a worker process), or error message if it could not be read
+
+        Args:
+           pcap_filename: Filename of input pcap file
+    """
+    try:
+        with PcapReader(pcap_filename) as pcap:
+            return scan_pcap(pcap)
+    except (OSError, ValueError) as e:
+        return f"{type(e).__name__}: {e}"
+
+def summary_row(report: ScanReport) -> dict:
+    """ Returns summary of a pcap, as a row of the csv file
+
+        Args:
+           report: report of the pcap (from scan_pcap)
+    """
+    full = report.frame_packets[1:-1] if len(report.frame_packets) > 2 else report.frame_packets
+    return {
+        "pcap": report.filename,
+        "size_mb": round(os.path.getsize(report.filename) / 1e6, 3),
+        "packets": report.packets,
+        "duration_s": round(report.duration, 3),
+        "missing_packets": report.missing_packets,
+        **report.counts,
+        "jitter_std_us": round(report.jitter_std * 1e6, 1),
+        "jitter_max_us": round(report.jitter_max * 1e6, 1),
+        "truncated": report.truncated,
+        "frames": len(report.frame_packets),
+        "min_packets_per_frame": int(full.min()) if len(full) else 0,
+        "max_packets_per_frame": int(full.max()) if len(full) else 0,
+    }
+
+def main():
+    
+    args = parseArgs()
+    
+    PCAP_FILENAMES = find_pcap_files(args.inputs)
+    if len(PCAP_FILENAMES) == 0:
+        print("NO PCAP FILES FOUND")
+        return
+    JOBS = args.jobs if args.jobs > 0 else os.cpu_count()
+    
+    rows = []
+    problems = []
+    total_bytes = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(JOBS, len(PCAP_FILENAMES))) as pool:
+        # Reports are printed in order of filename
+        for pcap_filename, report in zip(PCAP_FILENAMES, pool.map(scan_file, PCAP_FILENAMES)):
+            total_bytes += os.path.getsize(pcap_filename)
+            if isinstance(report, str):
+                print(f"{pcap_filename}\n  FAILED: {report}")
+                problems.append(pcap_filename)
+                continue
+            
+            print(report.format(args.events))
+            rows.append(summary_row(report))
+            if not report.ok:
+                problems.append(pcap_filename)
+    elapsed = time.perf_counter() - start
+    
+    if args.output_csv and rows:
+        with open(args.output_csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Saved summary to {args.output_csv}")
+    
+    print("-"*20)
+    print(f"Checked {len(PCAP_FILENAMES)} pcaps ({total_bytes / 1e6:.1f} MB) in {elapsed:.1f}s ({total_bytes / 1e6 / elapsed:.1f} MB/s)")
+    print(f"Pcaps with problems: {len(problems)}")
+    for pcap_filename in problems:
+        print(f"  {pcap_filename}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Cuts a frame range or time window out of a pcap file, saves it as a new pcap file (see rslidar16/slicer.py).
+Packets are copied byte for byte, so the new pcap works with all the RS-LiDAR-16 tools and Wireshark.
+
+How to use:
+Keep this file in the same folder as the rslidar16 folder.
+Open cmd, run ./RS-LiDAR-16_SlicePcap.py "capture.pcap" "slice.pcap" -f 65 105
+or ./RS-LiDAR-16_SlicePcap.py "capture.pcap" "slice.pcap" -t 10 15
+
+Optional arguments:
+  -h, --help            show help message and exit
+  -f FIRST_FRAME LAST_FRAME, --frames FIRST_FRAME LAST_FRAME
+                        Frames to keep (inclusive).
+  -t START_TIME END_TIME, --time START_TIME END_TIME
+                        Seconds from start of capture to keep (inclusive).
+  --no-difop            If enabled, does not add a DIFOP packet when there is none in the slice.
+'''
+
+import argparse
+import time
+from rslidar16 import PcapReader, FrameIndex, frame_range_bounds, slice_pcap, time_range_bounds
+
+def parseArgs() -> argparse.Namespace:
+    """ Set up CLI args
+    """
+    parser = argparse.ArgumentParser(description="Cuts a frame range or time window out of a RS-LiDAR-16 pcap file")
+    
+    parser.add_argument("pcap_filename",
+                        action="store", metavar="PCAP_FILENAME",
+                        help="Filename of input pcap file.")
+    
+    parser.add_argument("out_filename",
+                        action="store", metavar="OUT_FILENAME",
+                        help="Filename of output pcap file.")
+    
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("-f", "--frames",
+                        nargs=2, type=int, metavar=("FIRST_FRAME", "LAST_FRAME"),
+                        help="Frames to keep (inclusive).")
+    
+    target.add_argument("-t", "--time",
+                        nargs=2, type=float, metavar=("START_TIME", "END_TIME"),
+                        help="Seconds from start of capture to keep (inclusive).")
+    
+    parser.add_argument("--no-difop",
+                        default=False, action="store_true",
+                        help="If enabled, does not add a DIFOP packet when there is none in the slice.")
+    
+    args = parser.parse_args()
+    
+    return args
+
+def main():
+    
+    args = parseArgs()
+    
+    start_time = time.perf_counter()
+    with PcapReader(args.pcap_filename) as pcap:
+        index = FrameIndex.load_or_build(pcap)
+        
+        if args.frames:
+            first_frame, last_frame = args.frames
+            start, end, slice_frame = frame_range_bounds(pcap, index, first_frame, last_frame)
+            last_frame = min(last_frame, len(index))
+            print(f"Frames {first_frame}-{last_frame} will be frames {slice_frame}-{slice_frame + last_frame - first_frame} of {args.out_filename}")
+        else:
+            start, end = time_range_bounds(pcap, index, index.start_time + args.time[0], index.start_time + args.time[1])
+        
+        written = slice_pcap(pcap, args.out_filename, start, end, keep_difop=not args.no_difop)
+    
+    elapsed = time.perf_counter() - start_time
+    print(f"Saved {written / 1e6:.1f} MB to {args.out_filename} in {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
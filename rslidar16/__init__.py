@@ -0,0 +1,133 @@
+'''
+Shared helpers for the RS-LiDAR-16 tools.
+
+Import from the tools in the same folder, eg. `from rslidar16 import decode_packets`
+'''
+
+from .decoder import (
+    MSOP_MAGIC,
+    MSOP_PACKET_SIZE,
+    BLOCKS_PER_PACKET,
+    RETURNS_PER_BLOCK,
+    RETURNS_PER_PACKET,
+    CHANNEL_LIST,
+    DIFOP_MAGIC,
+    DIFOP_PACKET_SIZE,
+    DECODER_VERSION,
+    MSOP_DTYPE,
+    POINT_DTYPE,
+    Returns,
+    as_packets,
+    block_azimuths,
+    decode_compact,
+    decode_packets,
+    parse_vertical_angles,
+)
+from .pcap import (
+    PcapReader,
+    Record,
+    find_pcap_files,
+)
+from .trig import (
+    TrigTables,
+    azimuth_to_code,
+    get_trig_tables,
+    load_trig_tables,
+    read_vertical_angles,
+)
+from .compact import (
+    CompactFrame,
+)
+from .index import (
+    FrameIndex,
+    find_wraps,
+)
+from .frames import (
+    iter_frames,
+)
+from .parallel import (
+    iter_frames_parallel,
+)
+from .cache import (
+    FrameCache,
+    hash_pcap,
+)
+from .scan import (
+    ScanEvent,
+    ScanReport,
+    scan_pcap,
+)
+from .slicer import (
+    frame_range_bounds,
+    slice_pcap,
+    time_range_bounds,
+)
+from .merge import (
+    Sensor,
+    SyncedFrames,
+    extrinsic_matrix,
+    iter_synced_frames,
+    transform_points,
+)
+from .sectors import (
+    SectorAccumulator,
+    SectorSlice,
+    SectorSlicer,
+    iter_sector_slices,
+    slice_batches,
+)
+from .live import (
+    DIFOP_PORT,
+    MSOP_PORT,
+    LiveReceiver,
+    iter_live_frames,
+    iter_live_slices,
+    load_live_trig_tables,
+    receive_vertical_angles,
+)
+from .replay import (
+    ReplayReport,
+    replay_pcap,
+)
+from .reflectivity import (
+    ReflectivityHistogram,
+    edge_codes_for,
+    threshold_ratios,
+)
+from .metrics import (
+    MetricsTable,
+    MetricsWriter,
+)
+from .anomaly import (
+    EWMA_ALPHA,
+    MIN_STD,
+    WARMUP_FRAMES,
+    Z_LIMIT,
+    EwmaBaseline,
+    ReflectivityAlert,
+    ReflectivityDetector,
+    detect_anomalies,
+)
+from .render import (
+    LayerGridRenderer,
+    LayerRenderer,
+    PointCloudRenderer,
+    RenderPool,
+    Rendered,
+    save_figure,
+)
+from .raster import (
+    VIRIDIS_LUT,
+    Rasterizer,
+    RasterRenderer,
+    write_png,
+)
+from .video import (
+    VIDEO_FPS,
+    VideoSink,
+)
+from .writer import (
+    IMAGE_FORMATS,
+    ImageWriter,
+    encode_image,
+)
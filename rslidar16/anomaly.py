@@ -0,0 +1,190 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Flags frames whose reflectivity ratios (of each sector and threshold, see reflectivity.py) move away from
+what the sensor usually sees, while frames are still coming in (eg. spoofed or injected points).
+
+Each ratio keeps an exponentially weighted mean and variance (EWMA), updated in O(1) per frame,
+so the time taken per frame does not grow with the length of the capture.
+The histogram of each frame has one bin per sector edge, so the time does not depend on where the edges are either.
+A frame is flagged if any ratio is more than limit standard deviations from its mean.
+Ratios of flagged frames are not added to the baselines, so an attack does not become the new normal
+while it goes on. The first warmup frames only build the baselines, nothing is flagged.
+'''
+
+from typing import Iterable, Iterator, NamedTuple
+import numpy as np
+from .compact import CompactFrame
+from .reflectivity import ReflectivityHistogram, edge_codes_for, threshold_ratios
+
+EWMA_ALPHA = 0.05      # Weight of each new frame in the rolling mean and variance (about 1/alpha frames of memory)
+Z_LIMIT = 4.0          # Frames with a ratio more than Z_LIMIT standard deviations from its rolling mean are flagged
+WARMUP_FRAMES = 20     # Frames used to build the baselines before anything is flagged
+MIN_STD = 0.01         # Smallest standard deviation used, so very steady ratios do not flag tiny changes
+
+
+class EwmaBaseline:
+    """ Rolling mean and variance of an array of values, updated once per frame.
+
+        Args:
+           shape: Shape of the values (eg. (sectors, thresholds))
+           alpha: Weight of each new frame
+           warmup: Frames averaged equally before alpha is used, values are not scored until then
+    """
+
+    def __init__(self, shape: tuple, alpha: float = EWMA_ALPHA, warmup: int = WARMUP_FRAMES):
+        self.alpha = alpha
+        self.warmup = warmup
+        self.mean = np.zeros(shape)
+        self.var = np.zeros(shape)
+        self.count = np.zeros(shape, dtype=np.int64)    # Frames added to each value
+
+    def score(self, values: np.ndarray, min_std: float = MIN_STD) -> np.ndarray:
+        """ Returns distance of each value from its mean, in standard deviations.
+            nan where a value is nan or its baseline is still warming up.
+
+            Args:
+               values: New values
+               min_std: Smallest standard deviation used
+        """
+        std = np.maximum(np.sqrt(self.var), min_std)
+        score = np.abs(values - self.mean) / std
+        score[self.count < self.warmup] = np.nan
+        return score
+
+    def update(self, values: np.ndarray, mask: np.ndarray = None):
+        """ Adds values to the baselines, nan values are skipped.
+
+            Args:
+               values: New values
+               mask: Only add values where mask is True
+        """
+        keep = ~np.isnan(values)
+        if mask is not None:
+            keep &= mask
+        
+        # Equal weights while warming up, so the first frames do not count for more
+        alpha = np.maximum(self.alpha, 1 / (self.count + 1))
+        diff = np.where(keep, values - self.mean, 0.0)
+        step = alpha * diff
+        self.mean += step
+        self.var = np.where(keep, (1 - alpha) * (self.var + diff * step), self.var)
+        self.count += keep
+
+
+class ReflectivityAlert(NamedTuple):
+    """ A frame with reflectivity ratios away from their baselines.
+
+        frame: Frame number
+        timestamp: Timestamp (in seconds) of the first packet of the frame
+        score: Largest distance from a baseline (in standard deviations)
+        sector: Sector number of the ratio furthest from its baseline
+        threshold: Threshold of the ratio furthest from its baseline
+        ratio: Value of that ratio
+        mean: Baseline of that ratio
+        flagged: Number of ratios (sector and threshold) past the limit
+    """
+    frame: int
+    timestamp: float
+    score: float
+    sector: int
+    threshold: int
+    ratio: float
+    mean: float
+    flagged: int
+
+
+class ReflectivityDetector:
+    """ Scores the reflectivity ratios of each frame against rolling baselines.
+
+        Args:
+           sectors: (start, end) of each sector (in degrees)
+           thresholds: Reflectivity values (0-255) ratios are taken at
+           alpha: Weight of each new frame in the baselines
+           limit: Distance from a baseline (in standard deviations) a ratio is flagged at
+           warmup: Frames used to build the baselines before anything is flagged
+           min_std: Smallest standard deviation used
+    """
+
+    def __init__(self, sectors: list[tuple[float, float]], thresholds: list[int], alpha: float = EWMA_ALPHA,
+                 limit: float = Z_LIMIT, warmup: int = WARMUP_FRAMES, min_std: float = MIN_STD):
+        self.sectors = sectors
+        self.thresholds = list(thresholds)
+        self.limit = limit
+        self.min_std = min_std
+        self.edges = edge_codes_for(sectors)
+        self.baseline = EwmaBaseline((len(sectors), len(self.thresholds)), alpha, warmup)
+        self.frames = 0
+        self.alerts = 0
+
+    def process(self, frame: CompactFrame) -> ReflectivityAlert:
+        """ Returns alert if the ratios of a frame are away from their baselines, else None
+
+            Args:
+               frame: points of the frame (from rslidar16.iter_frames or rslidar16.iter_live_frames)
+        """
+        histogram = ReflectivityHistogram.from_points(frame.points, self.edges)
+        ratios = threshold_ratios(histogram.sector_counts(self.sectors, by_channel=False), self.thresholds)
+        return self.check(frame.number, frame.timestamp, ratios)
+
+    def check(self, number: int, timestamp: float, ratios: np.ndarray) -> ReflectivityAlert:
+        """ Returns alert if ratios of a frame are away from their baselines, else None.
+            Ratios within the limit are added to the baselines.
+
+            Args:
+               number: Frame number
+               timestamp: Timestamp (in seconds) of the frame
+               ratios: Ratio of each sector and threshold, shape (sectors, thresholds)
+        """
+        score = self.baseline.score(ratios, self.min_std)
+        flagged = score > self.limit
+        self.baseline.update(ratios, ~flagged)
+        self.frames += 1
+        
+        if not flagged.any():
+            return None
+        self.alerts += 1
+        sector, i = np.unravel_index(np.nanargmax(score), score.shape)
+        return ReflectivityAlert(number, timestamp, float(score[sector, i]), int(sector), self.thresholds[i],
+                                 float(ratios[sector, i]), float(self.baseline.mean[sector, i]), int(flagged.sum()))
+
+
+def detect_anomalies(frames: Iterable[tuple[int, CompactFrame]], detector: ReflectivityDetector) -> Iterator[ReflectivityAlert]:
+    """ Yields alert of each flagged frame, as soon as the frame is done.
+
+        Args:
+           frames: Iterable of (frame number, frame), eg. from iter_frames or iter_live_frames
+           detector: Detector holding the baselines
+    """
+    for _, frame in frames:
+        alert = detector.process(frame)
+        if alert is not None:
+            yield alert
@@ -0,0 +1,283 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Caches the decoded frames of a pcap file on disk, so later runs of any of the tools skip decoding.
+The cache is a folder saved next to the pcap (eg. capture.pcap.framecache/), holding:
+
+manifest.json: Cache and decoder versions, pcap size, mtime and content hash, number of frames and points
+frames.npy: Frame number, first point, number of points and timestamp of each frame (CACHE_FRAME_DTYPE)
+distance.npy, azimuth.npy, channel.npy, intensity.npy: One column per field of POINT_DTYPE,
+points of all frames one after another
+
+Columns are opened memory-mapped, so opening the cache takes milliseconds no matter how long the capture is,
+and only the pages of the frames (and columns) used are read from disk.
+
+The cache is rebuilt if the decoder version or the pcap content changes.
+The content hash is only recomputed if the pcap size or mtime has changed (eg. after copying it).
+'''
+
+from typing import Iterator
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+from .compact import CompactFrame
+from .decoder import DECODER_VERSION, POINT_DTYPE, RETURNS_PER_BLOCK
+from .frames import iter_frames
+from .index import FrameIndex
+from .pcap import PcapReader
+
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".framecache"
+MANIFEST_FILENAME = "manifest.json"
+HASH_CHUNK_SIZE = 8 * 1024 * 1024    # Bytes of pcap hashed at once
+
+CACHE_FRAME_DTYPE = np.dtype([
+    ("number", "u4"),       # Frame number (starts at 1)
+    ("start", "i8"),        # Position of the first point of the frame in the columns
+    ("count", "i8"),        # Number of points in the frame
+    ("timestamp", "f8"),    # pcap timestamp (in seconds) of the first packet of the frame
+])
+
+
+def hash_pcap(filename: str) -> str:
+    """ Returns content hash (blake2b, hex) of a file.
+
+        Args:
+           filename: Filename of pcap file
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filename, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FrameCache:
+    """ Decoded frames of a pcap file, memory-mapped from the cache folder.
+
+        Args:
+           folder: Cache folder
+           frames: Structured array (CACHE_FRAME_DTYPE), one entry per frame
+           columns: Array of each field of POINT_DTYPE, points of all frames one after another
+    """
+
+    def __init__(self, folder: str, frames: np.ndarray, columns: dict[str, np.ndarray]):
+        self.folder = folder
+        self.frames = frames
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __getitem__(self, frame_num: int) -> CompactFrame:
+        """ Returns points of one frame, copied out of the columns.
+
+            Args:
+               frame_num: Frame number (starts at 1)
+        """
+        frame = self.frames[self._position(frame_num)]
+        return self._read(frame)
+
+    def _position(self, frame_num: int) -> int:
+        pos = int(np.searchsorted(self.frames["number"], frame_num))
+        if pos == len(self.frames) or self.frames["number"][pos] != frame_num:
+            raise IndexError(f"Frame {frame_num} is not in {self.folder}")
+        return pos
+
+    def _read(self, frame: np.void) -> CompactFrame:
+        start = int(frame["start"])
+        end = start + int(frame["count"])
+        points = np.empty(end - start, dtype=POINT_DTYPE)
+        for name in POINT_DTYPE.names:
+            points[name] = self.columns[name][start:end]
+        return CompactFrame(points, int(frame["number"]), float(frame["timestamp"]))
+
+    @property
+    def frame_numbers(self) -> np.ndarray:
+        return self.frames["number"]
+
+    def column(self, name: str, first_frame: int = None, last_frame: int = None) -> np.ndarray:
+        """ Returns one field of the points of a range of frames, as a view of the memory-mapped column (no copy).
+
+            Args:
+               name: Field of POINT_DTYPE (distance, azimuth, channel or intensity)
+               first_frame: Frame number to start from (inclusive), defaults to the first frame
+               last_frame: Frame number to stop at (inclusive), defaults to the last frame
+        """
+        if len(self.frames) == 0:
+            return self.columns[name][:0]
+        first = self._position(first_frame) if first_frame is not None else 0
+        last = self._position(last_frame) if last_frame is not None else len(self.frames) - 1
+        start = int(self.frames["start"][first])
+        end = int(self.frames["start"][last] + self.frames["count"][last])
+        return self.columns[name][start:max(start, end)]
+
+    def iter_frames(self, first_frame: int = 1, last_frame: int = None) -> Iterator[tuple[int, CompactFrame]]:
+        """ Yields (frame number, frame) of each cached frame, same as rslidar16.iter_frames.
+
+            Args:
+               first_frame: Frame number to start from (inclusive)
+               last_frame: Frame number to stop at (inclusive), defaults to the last frame
+        """
+        numbers = self.frames["number"]
+        first = np.searchsorted(numbers, first_frame, side="left")
+        last = len(numbers) if last_frame is None else np.searchsorted(numbers, last_frame, side="right")
+        for frame in self.frames[first:last]:
+            yield int(frame["number"]), self._read(frame)
+
+    @staticmethod
+    def folder_of(pcap_path: str) -> str:
+        """ Returns default cache folder of a pcap, next to the pcap. """
+        return pcap_path + CACHE_SUFFIX
+
+    @classmethod
+    def open(cls, pcap_path: str, folder: str = None) -> "FrameCache":
+        """ Returns cache of a pcap, None if there is no cache matching the pcap content and decoder version.
+
+            Args:
+               pcap_path: Filename of input pcap file
+               folder: Cache folder, defaults to next to the pcap
+        """
+        folder = folder or cls.folder_of(pcap_path)
+        manifest_filename = os.path.join(folder, MANIFEST_FILENAME)
+        stat = os.stat(pcap_path)
+        
+        try:
+            with open(manifest_filename, "r") as f:
+                manifest = json.load(f)
+            if (manifest["version"] != CACHE_VERSION or manifest["decoder_version"] != DECODER_VERSION
+                    or manifest["pcap_size"] != stat.st_size):
+                return None
+            
+            # Same size but touched (eg. copied), only reuse if the content is the same
+            if manifest["pcap_mtime"] != stat.st_mtime_ns:
+                if hash_pcap(pcap_path) != manifest["pcap_hash"]:
+                    return None
+                manifest["pcap_mtime"] = stat.st_mtime_ns
+                try:
+                    with open(manifest_filename, "w") as f:
+                        json.dump(manifest, f, indent=4)
+                except OSError:
+                    pass
+            
+            frames = np.load(os.path.join(folder, "frames.npy"))
+            columns = {name: np.load(os.path.join(folder, f"{name}.npy"), mmap_mode="r") for name in POINT_DTYPE.names}
+        except (OSError, KeyError, ValueError):
+            return None
+        
+        if frames.dtype != CACHE_FRAME_DTYPE or any(len(c) != manifest["num_points"] for c in columns.values()):
+            return None
+        return cls(folder, frames, columns)
+
+    @classmethod
+    def build(cls, pcap_path: str, folder: str = None, workers: int = 1) -> "FrameCache":
+        """ Decodes every frame of a pcap into a new cache folder, returns the cache.
+
+            The frame index gives the number of points beforehand, so frames are written
+            straight into the columns, only one frame is held in memory at a time.
+
+            Args:
+               pcap_path: Filename of input pcap file
+               folder: Cache folder, defaults to next to the pcap
+               workers: Number of processes to decode with (see rslidar16.iter_frames), 0 for one per CPU
+        """
+        folder = folder or cls.folder_of(pcap_path)
+        stat = os.stat(pcap_path)
+        with PcapReader(pcap_path) as pcap:
+            index = FrameIndex.load_or_build(pcap)
+        
+        # Last frame is not a full 360deg turn, so iter_frames does not yield it
+        counts = index.frames["blocks"][:-1].astype(np.int64) * RETURNS_PER_BLOCK
+        num_points = int(counts.sum())
+        
+        # Build in a temporary folder, so a stopped build never leaves a cache that looks valid
+        tmp_folder = folder + ".tmp"
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        os.makedirs(tmp_folder)
+        
+        columns = {
+            name: np.lib.format.open_memmap(os.path.join(tmp_folder, f"{name}.npy"), "w+", dtype=POINT_DTYPE[name], shape=(num_points,))
+            for name in POINT_DTYPE.names
+        }
+        frames = np.zeros(len(counts), dtype=CACHE_FRAME_DTYPE)
+        
+        print(f"Caching frames of {pcap_path}")
+        num_frames = 0
+        pos = 0
+        for cnt, frame in iter_frames(pcap_path, workers=workers):
+            if num_frames == len(frames) or pos + len(frame) > num_points:
+                raise ValueError(f"Frames of {pcap_path} do not match its frame index")
+            for name in POINT_DTYPE.names:
+                columns[name][pos:pos + len(frame)] = frame.points[name]
+            frames[num_frames] = (cnt, pos, len(frame), frame.timestamp)
+            num_frames += 1
+            pos += len(frame)
+            print(f"Cached frame {str(cnt).zfill(3)}", end="\r")
+        if num_frames != len(frames) or pos != num_points:
+            raise ValueError(f"Frames of {pcap_path} do not match its frame index")
+        
+        for column in columns.values():
+            column.flush()
+        del columns
+        np.save(os.path.join(tmp_folder, "frames.npy"), frames)
+        
+        manifest = {
+            "version": CACHE_VERSION,
+            "decoder_version": DECODER_VERSION,
+            "pcap_size": stat.st_size,
+            "pcap_mtime": stat.st_mtime_ns,
+            "pcap_hash": hash_pcap(pcap_path),
+            "num_frames": num_frames,
+            "num_points": num_points,
+            "columns": {name: POINT_DTYPE[name].str for name in POINT_DTYPE.names},
+        }
+        with open(os.path.join(tmp_folder, MANIFEST_FILENAME), "w") as f:
+            json.dump(manifest, f, indent=4)
+        
+        shutil.rmtree(folder, ignore_errors=True)
+        os.replace(tmp_folder, folder)
+        return cls.open(pcap_path, folder)
+
+    @classmethod
+    def load_or_build(cls, pcap_path: str, folder: str = None, workers: int = 1) -> "FrameCache":
+        """ Returns cache of a pcap, built first if there is no cache matching the pcap.
+
+            Args:
+               pcap_path: Filename of input pcap file
+               folder: Cache folder, defaults to next to the pcap
+               workers: Number of processes to decode with if building, 0 for one per CPU
+        """
+        cache = cls.open(pcap_path, folder)
+        if cache is None:
+            cache = cls.build(pcap_path, folder, workers)
+        return cache
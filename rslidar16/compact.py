@@ -0,0 +1,128 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Holds the points of a frame the way the sensor sends them, 6 bytes per point
+(2-byte distance, 2-byte azimuth, 1-byte channel, 1-byte intensity, see POINT_DTYPE),
+instead of float rows or lists of tuples. A full frame (~28k points) is under 200kB,
+so hundreds of frames can be kept in memory for the sector and layer analyses.
+
+Values are only expanded to floats, or to float32 (x, y, z), when asked for.
+'''
+
+import numpy as np
+from .decoder import POINT_DTYPE
+from .trig import TrigTables, get_trig_tables
+
+
+class CompactFrame:
+    """ Points of one frame (or part of one), in POINT_DTYPE.
+
+        Args:
+           points: Structured array (POINT_DTYPE), one entry per point
+           number: Frame number (starts at 1)
+           timestamp: pcap timestamp (in seconds) of the first packet of the frame
+    """
+
+    def __init__(self, points: np.ndarray, number: int = 0, timestamp: float = 0.0):
+        self.points = points
+        self.number = number
+        self.timestamp = timestamp
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def __getitem__(self, key) -> "CompactFrame":
+        """ Returns frame with only the selected points, eg. frame[frame.channel == 0]. """
+        return CompactFrame(self.points[key], self.number, self.timestamp)
+
+    @property
+    def nbytes(self) -> int:
+        return self.points.nbytes
+
+    @property
+    def distance(self) -> np.ndarray:
+        """ Distance of each point (in meters). """
+        return self.points["distance"] / 100
+
+    @property
+    def azimuth(self) -> np.ndarray:
+        """ Horizontal angle of each point (in degrees). """
+        return self.points["azimuth"] / 100
+
+    @property
+    def azimuth_code(self) -> np.ndarray:
+        """ Horizontal angle of each point (in 0.01deg). """
+        return self.points["azimuth"]
+
+    @property
+    def channel(self) -> np.ndarray:
+        """ Channel number of each point (0-15). """
+        return self.points["channel"]
+
+    @property
+    def intensity(self) -> np.ndarray:
+        """ Reflectivity of each point (0-255). """
+        return self.points["intensity"]
+
+    def vertical_angle(self, trig: TrigTables = None) -> np.ndarray:
+        """ Returns vertical angle of each point (in degrees).
+
+            Args:
+               trig: sin/cos lookup tables (defaults to CHANNEL_LIST angles)
+        """
+        trig = trig or get_trig_tables()
+        return trig.vertical_angles[self.points["channel"]]
+
+    def xyz(self, trig: TrigTables = None) -> np.ndarray:
+        """ Returns float32 (x, y, z) cartesian coordinates of each point, shape (points, 3).
+
+            Args:
+               trig: sin/cos lookup tables (defaults to CHANNEL_LIST angles)
+        """
+        trig = trig or get_trig_tables()
+        distance = self.points["distance"] * np.float32(0.01)
+        
+        xyz = np.empty((len(self.points), 3), dtype=np.float32)
+        xyz[:, 0], xyz[:, 1], xyz[:, 2] = trig.cartesian(distance, self.points["azimuth"], self.points["channel"])
+        return xyz
+
+    @classmethod
+    def concatenate(cls, frames: list["CompactFrame"]) -> "CompactFrame":
+        """ Returns frames joined together, numbered as the first frame.
+
+            Args:
+               frames: list of CompactFrame
+        """
+        return cls(np.concatenate([frame.points for frame in frames]), frames[0].number, frames[0].timestamp)
+
+    @classmethod
+    def empty(cls, number: int = 0) -> "CompactFrame":
+        return cls(np.empty(0, dtype=POINT_DTYPE), number)
@@ -0,0 +1,214 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Decodes MSOP packets (1248 bytes each) into distance, azimuth, channel and intensity arrays.
+A single packet or a batch of back-to-back packets is viewed as a NumPy structured array, so all
+384 returns of a packet (12 datablocks x 32 returns) are decoded at once instead of one by one.
+
+Packet layout:
+42-byte header, starts with 0x55aa050a5aa550a0
+12 datablocks of 100 bytes, each starts with 0xffee, followed by a 2-byte azimuth and 32 returns
+Each return is a 2-byte distance value and a 1-byte reflectivity, return 17-32 will have +0.35deg
+6-byte tail
+
+DIFOP packets (1248 bytes, sent once a second) hold the device info, including
+the vertical angle of each channel calibrated for each unit.
+'''
+
+from typing import NamedTuple, Optional
+import numpy as np
+
+MSOP_MAGIC = bytes.fromhex("55aa050a5aa550a0")   # First 8 bytes of every MSOP packet
+MSOP_PACKET_SIZE = 1248                          # Size of MSOP packet (UDP payload)
+BLOCKS_PER_PACKET = 12                           # Datablocks per packet
+RETURNS_PER_BLOCK = 32                           # Returns per datablock (2 firings of 16 channels)
+RETURNS_PER_PACKET = BLOCKS_PER_PACKET * RETURNS_PER_BLOCK
+
+# Bump when decode_compact gives different points for the same packets, so cached frames are rebuilt
+DECODER_VERSION = 1
+
+# Vertical angle of each channel (in degrees)
+CHANNEL_LIST = [-15, -13, -11, -9, -7, -5, -3, -1, 15, 13, 11, 9, 7, 5, 3, 1]
+
+DIFOP_MAGIC = bytes.fromhex("a5ff005a11115555")  # First 8 bytes of every DIFOP packet
+DIFOP_PACKET_SIZE = 1248                         # Size of DIFOP packet (UDP payload)
+DIFOP_VERT_ANGLE_OFFSET = 468                    # 16 channels, 3 bytes each (1-byte sign, 2-byte value in 0.01deg)
+
+# All values in the packet are big-endian
+RETURN_DTYPE = np.dtype([
+    ("distance", ">u2"),
+    ("intensity", "u1"),
+])
+BLOCK_DTYPE = np.dtype([
+    ("flag", ">u2"),
+    ("azimuth", ">u2"),
+    ("returns", RETURN_DTYPE, (RETURNS_PER_BLOCK,)),
+])
+MSOP_DTYPE = np.dtype([
+    ("header", "V42"),
+    ("blocks", BLOCK_DTYPE, (BLOCKS_PER_PACKET,)),
+    ("tail", "V6"),
+])
+
+# Time the packet was sent, at byte 20 of the MSOP header
+MSOP_TIME_OFFSET = 20
+MSOP_TIME_DTYPE = np.dtype([
+    ("year", "u1"),
+    ("month", "u1"),
+    ("day", "u1"),
+    ("hour", "u1"),
+    ("minute", "u1"),
+    ("second", "u1"),
+    ("ms", ">u2"),
+    ("us", ">u2"),
+])
+
+# Return 17-32 of each datablock will have +0.35deg (in 0.01deg)
+SECOND_FIRING_OFFSET = 35
+
+# Compact point, 6 bytes per return, values as sent by the sensor
+POINT_DTYPE = np.dtype([
+    ("distance", "<u2"),    # In 0.01m
+    ("azimuth", "<u2"),     # In 0.01deg (0-35999)
+    ("channel", "u1"),      # Channel number (0-15), index into CHANNEL_LIST
+    ("intensity", "u1"),    # Reflectivity (0-255)
+])
+
+# Channel of each return in a datablock
+_BLOCK_CHANNELS = np.tile(np.arange(16, dtype=np.uint8), 2)
+
+
+class Returns(NamedTuple):
+    """ Decoded returns of one or more packets, one entry per return.
+
+        distance: Distance (in meters)
+        azimuth: Horizontal angle (in degrees)
+        channel: Channel number (0-15), index into CHANNEL_LIST
+        intensity: Reflectivity (0-255)
+    """
+    distance: np.ndarray
+    azimuth: np.ndarray
+    channel: np.ndarray
+    intensity: np.ndarray
+
+
+def as_packets(data) -> np.ndarray:
+    """ Returns structured array view (MSOP_DTYPE) of packet data, no copy is made.
+
+        Args:
+           data: bytes-like object of one or more back-to-back MSOP packets
+    """
+    # Already a structured array, eg. from PcapReader.iter_batches() or np.concatenate() (which may swap byte order)
+    if isinstance(data, np.ndarray) and data.dtype.names == MSOP_DTYPE.names:
+        return data
+    data = memoryview(data).cast("B")
+    return np.frombuffer(data, dtype=MSOP_DTYPE, count=len(data) // MSOP_PACKET_SIZE)
+
+def block_azimuths(packets: np.ndarray) -> np.ndarray:
+    """ Returns azimuth (in degrees) of each datablock, shape (packets, 12).
+
+        Args:
+           packets: structured array of packets (MSOP_DTYPE)
+    """
+    return packets["blocks"]["azimuth"] / 100
+
+def decode_packets(data) -> Returns:
+    """ Returns decoded distance, azimuth, channel and intensity of every return.
+
+        Returns are in packet order, then datablock order, then channel order,
+        identical to walking each datablock 3 bytes at a time.
+
+        Args:
+           data: bytes-like object of one or more back-to-back MSOP packets, or array from as_packets()
+    """
+    packets = as_packets(data)
+    blocks = packets["blocks"]
+    
+    # split into both returns, return 2 will have +0.35deg
+    azimuth1 = blocks["azimuth"] / 100
+    azimuth2 = (azimuth1 + 0.35) % 360
+    azimuth = np.repeat(np.stack((azimuth1, azimuth2), axis=-1), 16, axis=-1)
+    
+    distance = blocks["returns"]["distance"] / 100
+    intensity = blocks["returns"]["intensity"]
+    channel = np.broadcast_to(_BLOCK_CHANNELS, intensity.shape)
+    
+    return Returns(
+        distance.ravel(),
+        azimuth.ravel(),
+        channel.ravel(),
+        intensity.ravel(),
+    )
+
+def decode_compact(data) -> np.ndarray:
+    """ Returns every return as a compact point (POINT_DTYPE), without converting to floats.
+
+        Points are in the same order as decode_packets().
+
+        Args:
+           data: bytes-like object of one or more back-to-back MSOP packets, or array from as_packets()
+    """
+    packets = as_packets(data)
+    blocks = packets["blocks"]
+    
+    points = np.empty(blocks.shape + (RETURNS_PER_BLOCK,), dtype=POINT_DTYPE)
+    points["distance"] = blocks["returns"]["distance"]
+    points["intensity"] = blocks["returns"]["intensity"]
+    points["channel"] = _BLOCK_CHANNELS
+    
+    # split into both returns, return 2 will have +0.35deg
+    azimuth = blocks["azimuth"].astype(np.uint32)
+    points["azimuth"][..., :16] = azimuth[..., None]
+    points["azimuth"][..., 16:] = ((azimuth + SECOND_FIRING_OFFSET) % 36000)[..., None]
+    
+    return points.ravel()
+
+def parse_vertical_angles(difop) -> Optional[list[float]]:
+    """ Returns calibrated vertical angle (in degrees) of each channel from a DIFOP packet,
+        or None if the packet holds no calibration (all 0x00 or 0xff) or any angle is out of range.
+
+        Args:
+           difop: 1248-byte DIFOP packet data
+    """
+    data = bytes(difop[DIFOP_VERT_ANGLE_OFFSET:DIFOP_VERT_ANGLE_OFFSET+48])
+    if len(data) < 48 or data in (bytes(48), b"\xff"*48):
+        return None
+    
+    angles = []
+    for i in range(0, 48, 3):
+        # First byte is sign, 0 is positive, 1 is negative
+        value = int.from_bytes(data[i+1:i+3], "big") / 100
+        angles.append(-value if data[i] else value)
+    
+    # RS-LiDAR-16 covers -15deg to +15deg, anything far off is not a valid calibration
+    if any(abs(angle) > 30 for angle in angles):
+        return None
+    return angles
@@ -0,0 +1,180 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Streams frames (one frame every 360 degrees) out of a pcap file, one frame at a time.
+A new frame starts when the azimuth drops between 2 datablocks (see index.find_wraps),
+checked on whole batches of packets at once.
+
+Only one frame is held in memory at a time, no matter how long the capture is,
+so frames can be handed to other processes, or the loop stopped early.
+'''
+
+from typing import Iterable, Iterator
+import numpy as np
+from .compact import CompactFrame
+from .decoder import BLOCKS_PER_PACKET, RETURNS_PER_BLOCK, decode_compact
+from .index import FrameIndex, find_wraps
+from .pcap import PCAP_GLOBAL_HEADER_SIZE, PcapReader
+
+
+def iter_segments(pcap: PcapReader, start: int = PCAP_GLOBAL_HEADER_SIZE, end: int = None, skip: int = 0, batch_size: int = 256, source: str = None) -> Iterator[tuple[np.ndarray, float, bool]]:
+    """ Yields (points, timestamp, closed) of each run of datablocks between 2 wraps, in a byte range of a pcap.
+
+        closed is True if the run ended with a wrap (ie. it is the end of a frame),
+        only the last run yielded can be open, if the byte range ends mid-frame.
+
+        Args:
+           pcap: mmap pcap reader object (rslidar16.PcapReader)
+           start: Byte offset of the first record header
+           end: Byte offset to stop at (defaults to end of file)
+           skip: Number of datablocks to drop from the first packet
+           batch_size: Number of packets decoded at once
+           source: Only use packets sent from this IPv4 address (see PcapReader.iter_batches)
+    """
+    batches = ((timestamps, packets) for timestamps, _, packets in pcap.iter_batches(batch_size, start, end, source))
+    yield from assemble_segments(batches, skip)
+
+def assemble_segments(batches: Iterable[tuple[np.ndarray, np.ndarray]], skip: int = 0) -> Iterator[tuple[np.ndarray, float, bool]]:
+    """ Yields (points, timestamp, closed) of each run of datablocks between 2 wraps, from batches of MSOP packets.
+
+        Same as iter_segments, for packets that do not come from a pcap (eg. live.LiveReceiver).
+        Each batch is decoded before the next one is asked for, so batches can be views of a reused buffer.
+
+        Args:
+           batches: Iterable of (timestamps, packets) with packets as MSOP_DTYPE array
+           skip: Number of datablocks to drop from the first packet
+    """
+    pending = []    # Points of the current run
+    timestamp = None
+    previous = None
+    for timestamps, packets in batches:
+        points = decode_compact(packets)
+        azimuths = packets["blocks"]["azimuth"].ravel()
+        block_timestamps = np.repeat(timestamps, BLOCKS_PER_PACKET)
+        
+        # Drop datablocks of the previous frame
+        if skip:
+            points = points[skip * RETURNS_PER_BLOCK:]
+            azimuths = azimuths[skip:]
+            block_timestamps = block_timestamps[skip:]
+            skip = 0
+        if timestamp is None:
+            timestamp = float(block_timestamps[0])
+        
+        cut = 0
+        for pos in find_wraps(azimuths, previous):
+            pending.append(points[cut * RETURNS_PER_BLOCK:pos * RETURNS_PER_BLOCK])
+            yield np.concatenate(pending), timestamp, True
+            pending = []
+            timestamp = float(block_timestamps[pos])
+            cut = pos
+        
+        pending.append(points[cut * RETURNS_PER_BLOCK:])
+        previous = azimuths[-1]
+    
+    if pending:
+        yield np.concatenate(pending), timestamp, False
+
+def iter_frames(pcap_path: str, first_frame: int = 1, last_frame: int = None, batch_size: int = 256, workers: int = 1, cache: bool = False, source: str = None) -> Iterator[tuple[int, CompactFrame]]:
+    """ Yields (frame number, frame) of each frame in a pcap.
+
+        Frame numbers start at 1, same as FrameIndex. Frame 1 starts at the first packet,
+        and the last frame is only yielded if it is a complete 360deg turn.
+        If first_frame is after frame 1, the frame index is used to go straight to it.
+
+        Args:
+           pcap_path: Filename of input pcap file
+           first_frame: Frame number to start from (inclusive)
+           last_frame: Frame number to stop at (inclusive), defaults to the end of the capture
+           batch_size: Number of packets decoded at once
+           workers: Number of processes to decode with (see parallel.iter_frames_parallel), 0 for one per CPU
+           cache: If true, frames are read from the decoded-frame cache next to the pcap (see cache.FrameCache),
+                  which is built first if it does not match the pcap
+           source: Only use packets sent from this IPv4 address (eg. "192.168.1.200"), for pcaps with more than 1 sensor.
+                   The frame index, cache and workers are not used then, as they hold frames of every sensor
+    """
+    if source is not None:
+        with PcapReader(pcap_path) as pcap:
+            yield from number_frames(iter_segments(pcap, batch_size=batch_size, source=source), first_frame, last_frame)
+        return
+    
+    if cache:
+        from .cache import FrameCache
+        yield from FrameCache.load_or_build(pcap_path, workers=workers).iter_frames(first_frame, last_frame)
+        return
+    
+    if workers != 1:
+        from .parallel import iter_frames_parallel
+        yield from iter_frames_parallel(pcap_path, first_frame, last_frame, workers=workers or None)
+        return
+    
+    with PcapReader(pcap_path) as pcap:
+        start, skip, frame_num = seek_frame(pcap, first_frame)
+        if start is None:
+            return
+        
+        yield from number_frames(iter_segments(pcap, start, skip=skip, batch_size=batch_size), first_frame, last_frame, frame_num)
+
+def number_frames(segments: Iterable[tuple[np.ndarray, float, bool]], first_frame: int = 1, last_frame: int = None, frame_num: int = 1) -> Iterator[tuple[int, CompactFrame]]:
+    """ Yields (frame number, frame) of each closed segment from iter_segments or assemble_segments.
+
+        Stops at the first open segment (the frame is not a complete 360deg turn) or after last_frame.
+
+        Args:
+           segments: Iterable of (points, timestamp, closed)
+           first_frame: Frame number to start yielding from (inclusive)
+           last_frame: Frame number to stop at (inclusive), defaults to the end of the segments
+           frame_num: Frame number of the first segment
+    """
+    for points, timestamp, closed in segments:
+        if not closed:
+            return
+        if frame_num >= first_frame:
+            yield frame_num, CompactFrame(points, frame_num, timestamp)
+        if last_frame is not None and frame_num >= last_frame:
+            return
+        frame_num += 1
+
+def seek_frame(pcap: PcapReader, first_frame: int) -> tuple[int, int, int]:
+    """ Returns (byte offset, datablocks to skip, frame number) to start reading first_frame from,
+        using the frame index if first_frame is after frame 1. Byte offset is None if there is no such frame.
+
+        Args:
+           pcap: mmap pcap reader object (rslidar16.PcapReader)
+           first_frame: Frame number to start from
+    """
+    if first_frame <= 1:
+        return PCAP_GLOBAL_HEADER_SIZE, 0, 1
+    
+    index = FrameIndex.load_or_build(pcap)
+    if first_frame > len(index):
+        return None, 0, first_frame
+    return int(index[first_frame]["offset"]), int(index[first_frame]["first_block"]), first_frame
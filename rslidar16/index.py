@@ -0,0 +1,212 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Indexes where each frame (one frame every 360 degrees) starts in a pcap file, in one pass.
+The index is saved next to the pcap (eg. capture.pcap.frameidx.npz), and reused on later runs,
+so the tools can seek straight to a frame range or time window without parsing the packets before it.
+
+For each frame it holds:
+offset: Byte offset of the pcap record holding the first datablock of the frame
+first_block: Datablock (0-11) in that packet where the frame starts
+last_offset: Byte offset of the pcap record holding the last datablock of the frame
+blocks: Number of datablocks in the frame
+packets: Number of packets holding datablocks of the frame (packets at the edges are shared by 2 frames)
+first_timestamp, last_timestamp: pcap timestamps (in seconds) of the first and last packet of the frame
+
+Frame numbers start at 1, same as the tools.
+The first and last frame are usually not a full 360deg turn, as the capture can start and stop anywhere.
+'''
+
+import os
+import numpy as np
+from .compact import CompactFrame
+from .decoder import BLOCKS_PER_PACKET, RETURNS_PER_BLOCK, decode_compact
+from .pcap import PcapReader
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".frameidx.npz"
+
+# A new frame starts when the azimuth drops by more than half a turn between 2 datablocks,
+# small drops from out of order packets are not counted as a new frame
+WRAP_THRESHOLD = 18000    # In 0.01deg
+
+FRAME_DTYPE = np.dtype([
+    ("offset", "i8"),
+    ("first_block", "u1"),
+    ("last_offset", "i8"),
+    ("blocks", "u4"),
+    ("packets", "u4"),
+    ("first_timestamp", "f8"),
+    ("last_timestamp", "f8"),
+])
+
+
+def find_wraps(azimuths: np.ndarray, previous: int = None) -> np.ndarray:
+    """ Returns positions of datablocks that start a new frame.
+
+        Args:
+           azimuths: Azimuth codes (in 0.01deg) of consecutive datablocks
+           previous: Azimuth code of the datablock before azimuths[0], if any
+    """
+    azimuths = azimuths.astype(np.int32)
+    drops = np.diff(azimuths, prepend=azimuths[0] if previous is None else previous)
+    return np.flatnonzero(drops < -WRAP_THRESHOLD)
+
+
+class FrameIndex:
+    """ Frame boundaries of a pcap file.
+
+        Args:
+           frames: Structured array (FRAME_DTYPE), one entry per frame
+    """
+
+    def __init__(self, frames: np.ndarray):
+        self.frames = frames
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __getitem__(self, frame_num: int):
+        return self.frames[frame_num - 1]
+
+    @property
+    def start_time(self) -> float:
+        """ pcap timestamp of the first frame (in seconds). """
+        return float(self.frames["first_timestamp"][0]) if len(self.frames) else 0.0
+
+    @classmethod
+    def build(cls, pcap: PcapReader) -> "FrameIndex":
+        """ Returns index of pcap, only the datablock azimuths of each packet are read.
+
+            Args:
+               pcap: mmap pcap reader object (rslidar16.PcapReader)
+        """
+        starts = []    # (block number, packet number, offset, first_block, timestamp) of each frame
+        lasts = []     # (packet number, offset, timestamp) of the last packet of each frame
+        packet_base = 0
+        previous = None
+        last_packet = None
+        
+        for timestamps, offsets, packets in pcap.iter_batches(4096):
+            azimuths = packets["blocks"]["azimuth"].ravel()
+            if previous is None:
+                starts.append((0, 0, offsets[0], 0, timestamps[0]))
+            
+            for pos in find_wraps(azimuths, previous):
+                i, block = divmod(int(pos), BLOCKS_PER_PACKET)
+                
+                # Last datablock of previous frame may be in the previous batch
+                if pos == 0:
+                    lasts.append(last_packet)
+                else:
+                    j = (pos - 1) // BLOCKS_PER_PACKET
+                    lasts.append((packet_base + j, offsets[j], timestamps[j]))
+                starts.append((packet_base * BLOCKS_PER_PACKET + pos, packet_base + i, offsets[i], block, timestamps[i]))
+            
+            packet_base += len(packets)
+            previous = azimuths[-1]
+            last_packet = (packet_base - 1, offsets[-1], timestamps[-1])
+        
+        if last_packet is not None:
+            lasts.append(last_packet)
+        
+        frames = np.zeros(len(starts), dtype=FRAME_DTYPE)
+        if starts:
+            start_blocks = np.array([s[0] for s in starts] + [packet_base * BLOCKS_PER_PACKET])
+            frames["offset"] = [s[2] for s in starts]
+            frames["first_block"] = [s[3] for s in starts]
+            frames["first_timestamp"] = [s[4] for s in starts]
+            frames["last_offset"] = [l[1] for l in lasts]
+            frames["last_timestamp"] = [l[2] for l in lasts]
+            frames["blocks"] = np.diff(start_blocks)
+            frames["packets"] = np.array([l[0] for l in lasts]) - np.array([s[1] for s in starts]) + 1
+        return cls(frames)
+
+    @classmethod
+    def load_or_build(cls, pcap: PcapReader) -> "FrameIndex":
+        """ Returns index of pcap, loaded from the sidecar file if it matches the pcap,
+            else built and saved to the sidecar file.
+
+            Args:
+               pcap: mmap pcap reader object (rslidar16.PcapReader)
+        """
+        index_filename = pcap.filename + INDEX_SUFFIX
+        stat = os.stat(pcap.filename)
+        
+        try:
+            with np.load(index_filename) as data:
+                if (int(data["version"]) == INDEX_VERSION and int(data["pcap_size"]) == stat.st_size
+                        and int(data["pcap_mtime"]) == stat.st_mtime_ns):
+                    return cls(data["frames"])
+        except (OSError, KeyError, ValueError):
+            pass
+        
+        print(f"Indexing frames of {pcap.filename}")
+        index = cls.build(pcap)
+        try:
+            with open(index_filename, "wb") as f:
+                np.savez(f, frames=index.frames, version=INDEX_VERSION, pcap_size=stat.st_size, pcap_mtime=stat.st_mtime_ns)
+        except OSError:
+            print(f"Could not save index to {index_filename}")
+        return index
+
+    def frames_between(self, start_time: float, end_time: float) -> range:
+        """ Returns frame numbers of frames with packets between start_time and end_time (inclusive).
+
+            Args:
+               start_time: pcap timestamp (in seconds)
+               end_time: pcap timestamp (in seconds)
+        """
+        first = np.searchsorted(self.frames["last_timestamp"], start_time, side="left")
+        last = np.searchsorted(self.frames["first_timestamp"], end_time, side="right")
+        return range(int(first) + 1, max(int(last), int(first)) + 1)
+
+    def read_frame(self, pcap: PcapReader, frame_num: int) -> CompactFrame:
+        """ Returns points of one frame, only its packets are read.
+
+            Args:
+               pcap: mmap pcap reader object (rslidar16.PcapReader), of the same file
+               frame_num: Frame number (starts at 1)
+        """
+        frame = self[frame_num]
+        needed = int(frame["packets"])
+        
+        chunks = []
+        for _, _, packets in pcap.iter_batches(needed, start=int(frame["offset"])):
+            chunks.append(packets[:needed])
+            needed -= len(chunks[-1])
+            if needed <= 0:
+                break
+        
+        points = decode_compact(np.concatenate(chunks))
+        start = int(frame["first_block"]) * RETURNS_PER_BLOCK
+        end = start + int(frame["blocks"]) * RETURNS_PER_BLOCK
+        return CompactFrame(points[start:end], frame_num, float(frame["first_timestamp"]))
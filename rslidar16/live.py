@@ -0,0 +1,299 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Receives MSOP packets straight from the sensor over UDP, and assembles them into frames
+with the same wrap logic as a pcap (see frames.assemble_segments), so live frames can go
+to the same tools as frames read from a pcap.
+
+A background thread receives packets with recv_into, straight into a ring buffer of packet slots
+allocated once at start, so no memory is allocated per packet. The decoder reads whole batches of
+filled slots at once, as a MSOP_DTYPE view of the ring (no copy), and hands the slots back
+after decoding them. While the decoder is busy (eg. saving an image), packets keep being received
+into the ring, which holds RING_CAPACITY packets (about 40s of packets at 10Hz or 20Hz).
+Packets are only dropped if the ring is full, and are counted in LiveReceiver.dropped.
+
+To test without a sensor, send a pcap to the port with replay.replay_pcap (eg. RS-LiDAR-16_ReplayPcap.py).
+'''
+
+from typing import Iterator, Optional
+import socket
+import threading
+import time
+import numpy as np
+from .compact import CompactFrame
+from .decoder import DIFOP_MAGIC, DIFOP_PACKET_SIZE, MSOP_DTYPE, MSOP_MAGIC, MSOP_PACKET_SIZE, parse_vertical_angles
+from .frames import assemble_segments, number_frames
+from .sectors import SLICE_DEGREES, SectorSlice, slice_batches
+from .trig import TrigTables, get_trig_tables
+
+MSOP_PORT = 6699              # Default destination port of MSOP packets
+DIFOP_PORT = 7788             # Default destination port of DIFOP packets
+RING_CAPACITY = 32768         # Packets held in the ring buffer (~40MB)
+RECV_BUFFER_SIZE = 8 << 20    # Socket receive buffer asked for (SO_RCVBUF), the OS may give less
+POLL_INTERVAL = 0.1           # Seconds between checks for close() while no packets arrive
+
+_MSOP_MAGIC = np.frombuffer(MSOP_MAGIC, np.uint8)
+
+
+class LiveReceiver:
+    """ Receives MSOP packets from a UDP port into a preallocated ring buffer, on a background thread.
+
+        Use as a context manager, or call close() when done:
+
+            with LiveReceiver(MSOP_PORT) as receiver:
+                for timestamps, packets in receiver.iter_batches():
+                    ...
+    """
+    
+    def __init__(self, port: int = MSOP_PORT, host: str = "", capacity: int = RING_CAPACITY, source: str = None):
+        """ Args:
+               port: UDP port to receive MSOP packets on
+               host: Local address to bind to, defaults to all interfaces
+               capacity: Number of packets held in the ring buffer
+               source: Only keep packets sent from this IPv4 address (eg. "192.168.1.200"), for networks with more than 1 sensor
+        """
+        self.capacity = capacity
+        self.source = source
+        self.received = 0    # Packets put in the ring
+        self.dropped = 0     # Packets thrown away because the ring was full
+        self.invalid = 0     # Datagrams that are not MSOP packets
+        
+        self._ring = np.zeros((capacity, MSOP_PACKET_SIZE), np.uint8)
+        self._packets = self._ring.view(MSOP_DTYPE).reshape(capacity)
+        self._timestamps = np.zeros(capacity, "f8")
+        flat = memoryview(self._ring.reshape(-1))
+        self._slots = [flat[i * MSOP_PACKET_SIZE:(i + 1) * MSOP_PACKET_SIZE] for i in range(capacity)]
+        self._scratch = memoryview(bytearray(MSOP_PACKET_SIZE + 1))    # Received into when the ring is full
+        
+        # Packets received so far (head) and handed back by the decoder (tail), slot = count % capacity
+        self._head = 0
+        self._tail = 0
+        self._ready = threading.Event()
+        self._running = True
+        
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER_SIZE)
+        self.sock.settimeout(POLL_INTERVAL)
+        self.sock.bind((host, port))
+        self.port = self.sock.getsockname()[1]
+        
+        self._thread = threading.Thread(target=self._receive, name=f"rslidar16-recv-{self.port}", daemon=True)
+        self._thread.start()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+    
+    def close(self):
+        """ Stops receiving, packets already in the ring can still be read with iter_batches """
+        self._running = False
+        self._thread.join()
+        self.sock.close()
+        self._ready.set()
+    
+    @property
+    def pending(self) -> int:
+        """ Returns number of packets received but not decoded yet """
+        return self._head - self._tail
+    
+    def _receive(self):
+        """ Receives packets into the ring until close() is called (runs on the background thread) """
+        sock = self.sock
+        slots = self._slots
+        timestamps = self._timestamps
+        capacity = self.capacity
+        
+        while self._running:
+            head = self._head
+            full = head - self._tail >= capacity
+            buffer = self._scratch if full else slots[head % capacity]
+            try:
+                if self.source is None:
+                    size = sock.recv_into(buffer)
+                else:
+                    size, address = sock.recvfrom_into(buffer)
+                    if address[0] != self.source:
+                        continue
+            except socket.timeout:
+                continue
+            except OSError:
+                if not self._running:
+                    break
+                raise
+            
+            if size != MSOP_PACKET_SIZE:
+                self.invalid += 1
+                continue
+            if full:
+                self.dropped += 1
+                continue
+            
+            timestamps[head % capacity] = time.time()
+            self.received += 1
+            self._head = head + 1
+            self._ready.set()
+    
+    def iter_batches(self, batch_size: int = 256, idle_timeout: float = None) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """ Yields (timestamps, packets) of batches of received MSOP packets, as views of the ring buffer.
+
+            Batches hold up to batch_size packets, however many have arrived (at least 1).
+            The slots of a batch are handed back to the receiving thread when the next batch is asked for,
+            so decode each batch before asking for the next (eg. with frames.assemble_segments).
+            Stops after close() once the ring is empty, or if no packet arrives for idle_timeout seconds.
+
+            Args:
+               batch_size: Max number of packets per batch
+               idle_timeout: Seconds to wait for a packet before stopping, defaults to waiting forever
+        """
+        capacity = self.capacity
+        tail = self._tail
+        while True:
+            self._ready.clear()
+            if self._head == tail:
+                if not self._running:
+                    return
+                if not self._ready.wait(idle_timeout):
+                    return
+                continue
+            
+            # Only up to the end of the ring, the rest comes in the next batch
+            start = tail % capacity
+            count = min(self._head - tail, batch_size, capacity - start)
+            timestamps = self._timestamps[start:start + count]
+            packets = self._packets[start:start + count]
+            
+            valid = (self._ring[start:start + count, :len(_MSOP_MAGIC)] == _MSOP_MAGIC).all(axis=1)
+            if not valid.all():
+                self.invalid += int(np.count_nonzero(~valid))
+                timestamps = timestamps[valid]
+                packets = packets[valid]
+            if len(packets):
+                yield timestamps, packets
+            
+            tail += count
+            self._tail = tail
+
+def iter_live_frames(port: int = MSOP_PORT, host: str = "", first_frame: int = 1, last_frame: int = None, batch_size: int = 256, idle_timeout: float = None, source: str = None, receiver: LiveReceiver = None) -> Iterator[tuple[int, CompactFrame]]:
+    """ Yields (frame number, frame) of each frame received from the sensor, same as frames.iter_frames.
+
+        Frame numbers start at 1, from the first packet received. Frame 1 is usually not a complete 360deg turn,
+        as receiving starts partway through a turn.
+
+        Args:
+           port: UDP port to receive MSOP packets on
+           host: Local address to bind to, defaults to all interfaces
+           first_frame: Frame number to start from (inclusive)
+           last_frame: Frame number to stop at (inclusive), defaults to receiving until no packet arrives for idle_timeout
+           batch_size: Max number of packets decoded at once
+           idle_timeout: Seconds to wait for a packet before stopping, defaults to waiting forever
+           source: Only use packets sent from this IPv4 address (eg. "192.168.1.200"), for networks with more than 1 sensor
+           receiver: Receiver to read packets from, instead of opening one on port (it is not closed after)
+    """
+    if receiver is not None:
+        yield from number_frames(assemble_segments(receiver.iter_batches(batch_size, idle_timeout)), first_frame, last_frame)
+        return
+    
+    with LiveReceiver(port, host, source=source) as receiver:
+        yield from number_frames(assemble_segments(receiver.iter_batches(batch_size, idle_timeout)), first_frame, last_frame)
+        if receiver.dropped:
+            print(f"Dropped {receiver.dropped} packets, frames were not decoded fast enough")
+
+def iter_live_slices(port: int = MSOP_PORT, host: str = "", slice_degrees: float = SLICE_DEGREES, batch_size: int = 256, idle_timeout: float = None, source: str = None, receiver: LiveReceiver = None) -> Iterator[SectorSlice]:
+    """ Yields each azimuth slice received from the sensor as soon as it is complete (see sectors.SectorSlicer),
+        instead of waiting for the whole frame like iter_live_frames.
+
+        Args:
+           port: UDP port to receive MSOP packets on
+           host: Local address to bind to, defaults to all interfaces
+           slice_degrees: Width of each slice (in degrees)
+           batch_size: Max number of packets decoded at once
+           idle_timeout: Seconds to wait for a packet before stopping, defaults to waiting forever
+           source: Only use packets sent from this IPv4 address (eg. "192.168.1.200"), for networks with more than 1 sensor
+           receiver: Receiver to read packets from, instead of opening one on port (it is not closed after)
+    """
+    if receiver is not None:
+        yield from slice_batches(receiver.iter_batches(batch_size, idle_timeout), slice_degrees)
+        return
+    
+    with LiveReceiver(port, host, source=source) as receiver:
+        yield from slice_batches(receiver.iter_batches(batch_size, idle_timeout), slice_degrees)
+
+def receive_vertical_angles(port: int = DIFOP_PORT, host: str = "", timeout: float = 3.0, source: str = None) -> Optional[list[float]]:
+    """ Returns calibrated vertical angles from the first valid DIFOP packet received, or None if there is none before timeout.
+        The sensor sends a DIFOP packet every second.
+
+        Args:
+           port: UDP port to receive DIFOP packets on
+           host: Local address to bind to, defaults to all interfaces
+           timeout: Seconds to wait for a valid DIFOP packet
+           source: Only use DIFOP packets sent from this IPv4 address
+    """
+    buffer = bytearray(DIFOP_PACKET_SIZE + 1)
+    deadline = time.monotonic() + timeout
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        while (remaining := deadline - time.monotonic()) > 0:
+            sock.settimeout(remaining)
+            try:
+                size, address = sock.recvfrom_into(buffer)
+            except socket.timeout:
+                break
+            if source is not None and address[0] != source:
+                continue
+            if size == DIFOP_PACKET_SIZE and buffer.startswith(DIFOP_MAGIC):
+                angles = parse_vertical_angles(bytes(buffer[:size]))
+                if angles is not None:
+                    return angles
+    return None
+
+def load_live_trig_tables(use_difop: bool = True, port: int = DIFOP_PORT, host: str = "", timeout: float = 3.0, source: str = None) -> TrigTables:
+    """ Returns lookup tables for a live sensor, with vertical angles from its DIFOP packets if use_difop is set.
+        Falls back to CHANNEL_LIST if no valid DIFOP packet arrives before timeout.
+
+        Args:
+           use_difop: Load vertical angles from the DIFOP packets
+           port: UDP port to receive DIFOP packets on
+           host: Local address to bind to, defaults to all interfaces
+           timeout: Seconds to wait for a valid DIFOP packet
+           source: Only use DIFOP packets sent from this IPv4 address
+    """
+    if not use_difop:
+        return get_trig_tables()
+    
+    angles = receive_vertical_angles(port, host, timeout, source)
+    if angles is None:
+        print(f"No DIFOP packet on port {port}, using default vertical angles")
+        return get_trig_tables()
+    return get_trig_tables(tuple(angles))
@@ -0,0 +1,151 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Merges frames (one frame every 360 degrees) of several RS-LiDAR-16 sensors by time, for rigs with more than 1 sensor.
+Each sensor is read from its own pcap, or from a shared pcap by its IP address.
+
+Frames of all sensors are merged in order of their start time with a heap (heapq.merge), and grouped into
+synced tuples holding one frame of each sensor, started within MAX_SKEW of each other.
+Frames of a sensor without a match in time (eg. lost packets, sensor started late) are dropped.
+Only one frame per sensor is held in memory, no matter how long the captures are.
+
+Points of each sensor are moved into a common frame with its extrinsic transform (4x4 matrix),
+applied to all points of the frame at once.
+'''
+
+from typing import Iterator, NamedTuple
+import heapq
+import numpy as np
+from .compact import CompactFrame
+from .frames import iter_frames
+from .trig import load_trig_tables
+
+MAX_SKEW = 0.05    # Max difference in start time of the frames in a tuple (in seconds), half a turn at 10Hz
+
+
+class Sensor(NamedTuple):
+    """ One sensor to merge.
+
+        pcap_path: Filename of pcap file holding the packets of the sensor
+        source: IPv4 address of the sensor (eg. "192.168.1.200"), if the pcap holds packets of more than 1 sensor
+        transform: 4x4 matrix from the sensor to the common frame (see extrinsic_matrix), None to keep points as they are
+        name: Name of the sensor
+    """
+    pcap_path: str
+    source: str = None
+    transform: np.ndarray = None
+    name: str = ""
+
+
+class SyncedFrames(NamedTuple):
+    """ Frames of all sensors, started at about the same time.
+
+        number: Tuple number (starts at 1)
+        timestamp: pcap timestamp (in seconds) of the start of the earliest frame
+        frames: Frame of each sensor, in the same order as the sensors
+        xyz: float32 (x, y, z) of each point of each frame, in the common frame
+    """
+    number: int
+    timestamp: float
+    frames: tuple[CompactFrame, ...]
+    xyz: tuple[np.ndarray, ...]
+
+    def fused(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ Returns (xyz, intensity, sensor) of the points of all sensors,
+            sensor is the position of the sensor of each point (in the list of sensors).
+        """
+        xyz = np.concatenate(self.xyz) if self.xyz else np.empty((0, 3), dtype=np.float32)
+        intensity = np.concatenate([frame.intensity for frame in self.frames])
+        sensor = np.repeat(np.arange(len(self.frames), dtype=np.uint8), [len(frame) for frame in self.frames])
+        return xyz, intensity, sensor
+
+
+def extrinsic_matrix(x: float = 0.0, y: float = 0.0, z: float = 0.0, roll: float = 0.0, pitch: float = 0.0, yaw: float = 0.0) -> np.ndarray:
+    """ Returns 4x4 matrix from a sensor to the common frame, from the position and rotation of the sensor.
+
+        Args:
+           x, y, z: Position of the sensor in the common frame (in meters)
+           roll, pitch, yaw: Rotation of the sensor around x, y, z (in degrees), applied in the order roll, pitch, yaw
+    """
+    r, p, w = np.radians([roll, pitch, yaw])
+    rot_x = np.array([[1, 0, 0], [0, np.cos(r), -np.sin(r)], [0, np.sin(r), np.cos(r)]])
+    rot_y = np.array([[np.cos(p), 0, np.sin(p)], [0, 1, 0], [-np.sin(p), 0, np.cos(p)]])
+    rot_z = np.array([[np.cos(w), -np.sin(w), 0], [np.sin(w), np.cos(w), 0], [0, 0, 1]])
+    
+    matrix = np.eye(4)
+    matrix[:3, :3] = rot_z @ rot_y @ rot_x
+    matrix[:3, 3] = (x, y, z)
+    return matrix
+
+def transform_points(xyz: np.ndarray, transform: np.ndarray) -> np.ndarray:
+    """ Returns points moved by a 4x4 transform, all points at once.
+
+        Args:
+           xyz: (x, y, z) of each point, shape (n, 3)
+           transform: 4x4 matrix, or None to return xyz as it is
+    """
+    if transform is None:
+        return xyz
+    transform = np.asarray(transform, dtype=xyz.dtype)
+    return xyz @ transform[:3, :3].T + transform[:3, 3]
+
+def _timestamped_frames(position: int, sensor: Sensor, batch_size: int) -> Iterator[tuple[float, int, CompactFrame]]:
+    """ Yields (start time, sensor position, frame) of each frame of a sensor, for heapq.merge """
+    for _, frame in iter_frames(sensor.pcap_path, batch_size=batch_size, source=sensor.source):
+        yield frame.timestamp, position, frame
+
+def iter_synced_frames(sensors: list[Sensor], max_skew: float = MAX_SKEW, use_difop: bool = False, batch_size: int = 256) -> Iterator[SyncedFrames]:
+    """ Yields frames of all sensors, grouped by time (see SyncedFrames).
+
+        Args:
+           sensors: Sensors to merge
+           max_skew: Max difference in start time of the frames in a tuple (in seconds)
+           use_difop: Load vertical angles of each sensor from its DIFOP packets
+           batch_size: Number of packets decoded at once
+    """
+    trigs = [load_trig_tables(sensor.pcap_path, use_difop, sensor.source) for sensor in sensors]
+    streams = [_timestamped_frames(i, sensor, batch_size) for i, sensor in enumerate(sensors)]
+    
+    pending = [None] * len(sensors)    # Latest unmatched frame of each sensor
+    number = 1
+    for timestamp, position, frame in heapq.merge(*streams):
+        # Newer frame replaces the unmatched one, frames too old to match this one are dropped
+        pending[position] = frame
+        for i, other in enumerate(pending):
+            if other is not None and timestamp - other.timestamp > max_skew:
+                pending[i] = None
+        
+        if all(other is not None for other in pending):
+            frames = tuple(pending)
+            xyz = tuple(transform_points(f.xyz(trig), sensor.transform) for f, trig, sensor in zip(frames, trigs, sensors))
+            yield SyncedFrames(number, min(f.timestamp for f in frames), frames, xyz)
+            pending = [None] * len(sensors)
+            number += 1
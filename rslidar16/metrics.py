@@ -0,0 +1,204 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Keeps per-frame metrics (eg. reflectivity ratios of each sector) as a table of columns in memory,
+and writes them out in batches to a folder of binary files:
+
+schema.json: Store version, name, dtype and shape of each column, and attributes (eg. sectors and thresholds)
+NAME.npy: One column, one row per frame
+
+Columns are .npy files, so np.load(..., mmap_mode="r") reads them without copying or parsing text,
+and values are written exactly (no float formatting). The header of each .npy file is rewritten
+after every batch, so the files can be read while still being written (eg. during live receiving).
+Opening a writer replaces the metrics of earlier runs in the folder.
+'''
+
+import csv
+import json
+import os
+import struct
+import numpy as np
+
+METRICS_VERSION = 1
+SCHEMA_FILENAME = "schema.json"
+FLUSH_ROWS = 64          # Rows kept in memory before they are written out
+NPY_HEADER_SIZE = 256    # Bytes of each .npy header, fixed so it can be rewritten in place
+
+
+def _npy_header(dtype: np.dtype, shape: tuple) -> bytes:
+    """ Returns .npy (version 1.0) header padded to NPY_HEADER_SIZE bytes
+
+        Args:
+           dtype: dtype of the array
+           shape: shape of the array
+    """
+    header = repr({"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": tuple(shape)})
+    header = header.encode("latin1").ljust(NPY_HEADER_SIZE - 11) + b"\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header
+
+
+class MetricsWriter:
+    """ Adds rows of metrics to a store, FLUSH_ROWS at a time.
+
+        Use as a context manager, or call close() when done.
+
+        Args:
+           folder: Folder of the store, created if needed
+           columns: Name of each column and its (dtype, shape of one row), eg. {"ratios": ("f8", (4, 6))}
+           attributes: Anything else to keep in schema.json (must be JSON serializable)
+           flush_rows: Rows kept in memory before they are written out
+    """
+
+    def __init__(self, folder: str, columns: dict[str, tuple[str, tuple]], attributes: dict = None, flush_rows: int = FLUSH_ROWS):
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.rows = 0          # Rows written out
+        self._pending = 0      # Rows in the buffers
+        self._buffers = {name: np.zeros((flush_rows,) + tuple(shape), dtype=dtype) for name, (dtype, shape) in columns.items()}
+        
+        schema = {
+            "version": METRICS_VERSION,
+            "columns": {name: {"dtype": np.dtype(dtype).str, "shape": list(shape)} for name, (dtype, shape) in columns.items()},
+            "attributes": attributes or {},
+        }
+        with open(os.path.join(folder, SCHEMA_FILENAME), "w") as f:
+            json.dump(schema, f, indent=4)
+        
+        self._files = {}
+        for name, buffer in self._buffers.items():
+            self._files[name] = open(os.path.join(folder, f"{name}.npy"), "wb")
+            self._files[name].write(_npy_header(buffer.dtype, (0,) + buffer.shape[1:]))
+            self._files[name].flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def append(self, **values):
+        """ Adds one row, with a value for every column
+
+            Args:
+               values: Value of each column, by name
+        """
+        for name, buffer in self._buffers.items():
+            buffer[self._pending] = values[name]
+        self._pending += 1
+        if self._pending == len(next(iter(self._buffers.values()))):
+            self.flush()
+
+    def flush(self):
+        """ Writes out rows kept in memory, then updates the .npy headers """
+        if self._pending == 0:
+            return
+        for name, buffer in self._buffers.items():
+            file = self._files[name]
+            file.write(buffer[:self._pending].tobytes())
+            file.seek(0)
+            file.write(_npy_header(buffer.dtype, (self.rows + self._pending,) + buffer.shape[1:]))
+            file.seek(0, os.SEEK_END)
+            file.flush()
+        self.rows += self._pending
+        self._pending = 0
+
+    def close(self):
+        """ Writes out remaining rows and closes the files """
+        if not self._files:
+            return
+        self.flush()
+        for file in self._files.values():
+            file.close()
+        self._files = {}
+
+
+class MetricsTable:
+    """ Columns of a metrics store, opened memory-mapped.
+
+        Args:
+           columns: Array of each column, by name
+           attributes: Attributes from schema.json
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray], attributes: dict):
+        self.columns = columns
+        self.attributes = attributes
+
+    def __len__(self) -> int:
+        return min((len(column) for column in self.columns.values()), default=0)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @classmethod
+    def open(cls, folder: str) -> "MetricsTable":
+        """ Returns table of a store, columns are read-only views of the files (no copy is made).
+
+            Args:
+               folder: Folder of the store
+        """
+        with open(os.path.join(folder, SCHEMA_FILENAME)) as f:
+            schema = json.load(f)
+        if schema.get("version") != METRICS_VERSION:
+            raise ValueError(f"{folder} is metrics store version {schema.get('version')}, expected {METRICS_VERSION}")
+        
+        columns = {}
+        for name in schema["columns"]:
+            filename = os.path.join(folder, f"{name}.npy")
+            # An empty file cannot be memory-mapped
+            columns[name] = np.load(filename, mmap_mode="r" if os.path.getsize(filename) > NPY_HEADER_SIZE else None)
+        
+        # Columns may be a batch apart if read while being written
+        rows = min((len(column) for column in columns.values()), default=0)
+        return cls({name: column[:rows] for name, column in columns.items()}, schema["attributes"])
+
+    def to_csv(self, filename: str):
+        """ Saves table as a csv file, one row per row of the table.
+            Columns with more than one value per row get one csv column per value, eg. ratios_0_1.
+
+            Args:
+               filename: Filename of output csv file
+        """
+        header = []
+        flat = []
+        for name, column in self.columns.items():
+            values = column.reshape(len(column), -1)
+            flat.append(values)
+            if column.ndim == 1:
+                header.append(name)
+            else:
+                header += [f"{name}_" + "_".join(str(i) for i in index) for index in np.ndindex(column.shape[1:])]
+        
+        with open(filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for i in range(len(self)):
+                writer.writerow([value for values in flat for value in values[i].tolist()])
@@ -0,0 +1,142 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Decodes one pcap file with a pool of processes.
+The file is split into byte ranges that start on a packet record (see PcapReader.find_record),
+each range is decoded into runs of datablocks between wraps by a worker process,
+and runs cut at the edge of a range are stitched back together, so frames come out whole and in order.
+
+Only a few ranges are decoded ahead of the consumer, so memory stays bounded.
+'''
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+import os
+import numpy as np
+from .compact import CompactFrame
+from .decoder import RETURNS_PER_BLOCK
+from .frames import iter_segments, seek_frame
+from .index import WRAP_THRESHOLD, FrameIndex
+from .pcap import PcapReader
+
+CHUNK_SIZE = 8 * 1024 * 1024    # Bytes of pcap per worker task
+
+
+def chunk_bounds(pcap: PcapReader, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> list[int]:
+    """ Returns byte offsets splitting [start, end) into ranges of about chunk_size, each starting on a record.
+
+        Args:
+           pcap: mmap pcap reader object (rslidar16.PcapReader)
+           start: Byte offset of the first record header
+           end: Byte offset to stop at
+           chunk_size: Bytes per range
+    """
+    bounds = [start]
+    for guess in range(start + chunk_size, end, chunk_size):
+        offset = pcap.find_record(guess, end)
+        if offset > bounds[-1] and offset < end:
+            bounds.append(offset)
+    bounds.append(end)
+    return bounds
+
+def _decode_chunk(pcap_path: str, start: int, end: int, skip: int) -> list[tuple[np.ndarray, float, bool]]:
+    """ Worker task, returns runs of datablocks between wraps in [start, end) (see frames.iter_segments). """
+    with PcapReader(pcap_path) as pcap:
+        return list(iter_segments(pcap, start, end, skip))
+
+def iter_frames_parallel(pcap_path: str, first_frame: int = 1, last_frame: int = None, workers: int = None, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple[int, CompactFrame]]:
+    """ Yields (frame number, frame) of each frame in a pcap, same as frames.iter_frames, decoded by a process pool.
+
+        Args:
+           pcap_path: Filename of input pcap file
+           first_frame: Frame number to start from (inclusive)
+           last_frame: Frame number to stop at (inclusive), defaults to the end of the capture
+           workers: Number of processes (defaults to one per CPU)
+           chunk_size: Bytes of pcap per worker task
+    """
+    workers = workers or os.cpu_count() or 1
+    
+    with PcapReader(pcap_path) as pcap:
+        start, skip, frame_num = seek_frame(pcap, first_frame)
+        if start is None:
+            return
+        
+        # Stop reading after last_frame
+        end = len(pcap)
+        if last_frame is not None:
+            index = FrameIndex.load_or_build(pcap)
+            if last_frame < len(index):
+                end = int(index[last_frame + 1]["offset"]) + 1
+        bounds = chunk_bounds(pcap, start, end, chunk_size)
+    
+    tasks = [(bounds[i], bounds[i+1], skip if i == 0 else 0) for i in range(len(bounds) - 1)]
+    
+    pending = []    # Runs of the current frame, from previous ranges
+    timestamp = None
+    last_azimuth = None
+    
+    with ProcessPoolExecutor(workers) as pool:
+        # Keep a few ranges in flight ahead of the consumer
+        futures = [pool.submit(_decode_chunk, pcap_path, *task) for task in tasks[:2 * workers]]
+        next_task = len(futures)
+        
+        try:
+            for i in range(len(tasks)):
+                runs = futures[i].result()
+                futures[i] = None
+                if next_task < len(tasks):
+                    futures.append(pool.submit(_decode_chunk, pcap_path, *tasks[next_task]))
+                    next_task += 1
+                
+                for j, (points, run_timestamp, closed) in enumerate(runs):
+                    # Wrap between the last datablock of the previous range and the first of this one
+                    if j == 0 and pending and int(points["azimuth"][0]) - last_azimuth < -WRAP_THRESHOLD:
+                        yield frame_num, CompactFrame(np.concatenate(pending), frame_num, timestamp)
+                        if last_frame is not None and frame_num >= last_frame:
+                            return
+                        frame_num += 1
+                        pending = []
+                    
+                    if not pending:
+                        timestamp = run_timestamp
+                    pending.append(points)
+                    last_azimuth = int(points["azimuth"][-RETURNS_PER_BLOCK])
+                    
+                    if closed:
+                        yield frame_num, CompactFrame(np.concatenate(pending), frame_num, timestamp)
+                        if last_frame is not None and frame_num >= last_frame:
+                            return
+                        frame_num += 1
+                        pending = []
+        finally:
+            for future in futures:
+                if future is not None:
+                    future.cancel()
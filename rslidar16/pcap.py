@@ -0,0 +1,429 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Reads pcap files through mmap, walking the 16-byte record headers directly.
+MSOP packets are found by checking the MSOP header at a fixed offset (Ethernet + IPv4 + UDP headers),
+and are returned as zero-copy views of the file instead of building a dpkt object for every packet.
+Packets that cannot be classified at the fixed offset (eg. VLAN tags, IP options) fall back to dpkt.
+
+Only classic pcap files are supported (not pcapng), same as dpkt.pcap.Reader.
+'''
+
+import glob
+import mmap
+import os
+import socket
+import struct
+from typing import Iterator, NamedTuple
+import numpy as np
+from .decoder import MSOP_MAGIC, MSOP_PACKET_SIZE, MSOP_DTYPE
+
+PCAP_GLOBAL_HEADER_SIZE = 24
+PCAP_RECORD_HEADER_SIZE = 16
+
+# pcap magic numbers, as read little-endian: (byte order, timestamp divisor)
+_PCAP_MAGICS = {
+    0xa1b2c3d4: ("<", 1e6),    # microsecond timestamps
+    0xd4c3b2a1: (">", 1e6),
+    0xa1b23c4d: ("<", 1e9),    # nanosecond timestamps
+    0x4d3cb2a1: (">", 1e9),
+}
+
+LINKTYPE_ETHERNET = 1
+LINKTYPE_LINUX_SLL = 113
+
+# Link layer header size, and offset of the ethertype/protocol field in it
+_LINK_HEADERS = {
+    LINKTYPE_ETHERNET: (14, 12),
+    LINKTYPE_LINUX_SLL: (16, 14),
+}
+
+IPV4_HEADER_SIZE = 20
+UDP_HEADER_SIZE = 8
+
+_MSOP_MAGIC_INT = int.from_bytes(MSOP_MAGIC, "big")
+
+
+def source_address(source: str) -> bytes:
+    """ Returns IPv4 address as 4 bytes, or None if source is None.
+
+        Args:
+           source: IPv4 address (eg. "192.168.1.200")
+    """
+    return None if source is None else socket.inet_aton(source)
+
+
+def find_pcap_files(inputs: list[str]) -> list[str]:
+    """ Returns sorted list of pcap filenames (absolute paths), without duplicates
+
+        Args:
+           inputs: folders of pcap files, pcap files, or glob patterns
+    """
+    filenames = []
+    for path in inputs:
+        if os.path.isdir(path):
+            filenames += glob.glob(os.path.join(path, "*.pcap"))
+        elif os.path.isfile(path):
+            filenames.append(path)
+        else:
+            filenames += glob.glob(path)
+    
+    return sorted(set(os.path.abspath(f) for f in filenames if os.path.isfile(f)))
+
+
+class Record(NamedTuple):
+    """ One pcap record.
+
+        offset: Byte offset of the record header in the file
+        timestamp: Capture timestamp (in seconds)
+        data_start: Byte offset of the captured packet data in the file
+        caplen: Number of bytes captured
+    """
+    offset: int
+    timestamp: float
+    data_start: int
+    caplen: int
+
+
+class PcapReader:
+    """ mmap-backed pcap reader.
+
+        Payload views returned by the reader point into the mapped file,
+        they are only valid until the reader is closed.
+
+        Args:
+           filename: Filename of input pcap file
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._file = open(filename, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{filename} is empty")
+        
+        if len(self._mm) < PCAP_GLOBAL_HEADER_SIZE:
+            self.close()
+            raise ValueError(f"{filename} is not a pcap file")
+        
+        magic = struct.unpack_from("<I", self._mm, 0)[0]
+        if magic not in _PCAP_MAGICS:
+            self.close()
+            raise ValueError(f"{filename} is not a pcap file (pcapng is not supported, save as pcap in Wireshark)")
+        self.byteorder, self._ts_divisor = _PCAP_MAGICS[magic]
+        
+        self.linktype = struct.unpack_from(self.byteorder + "I", self._mm, 20)[0] & 0x0fffffff
+        if self.linktype not in _LINK_HEADERS:
+            self.close()
+            raise ValueError(f"{filename} has unsupported link type {self.linktype}")
+        link_size, self._ethertype_offset = _LINK_HEADERS[self.linktype]
+        
+        # Offset of the UDP payload inside a record, when there are no VLAN tags or IP options
+        self.payload_offset = link_size + IPV4_HEADER_SIZE + UDP_HEADER_SIZE
+        # Offset of the IPv4 source address inside a record
+        self._source_offset = link_size + 12
+        self._record_header = struct.Struct(self.byteorder + "IIII")
+        self._record_dtype = np.dtype([(name, self.byteorder + "u4") for name in ("ts_sec", "ts_frac", "caplen", "origlen")])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._mm)
+
+    @property
+    def buffer(self) -> mmap.mmap:
+        """ Mapped file, for slicing records by byte offset. """
+        return self._mm
+
+    def close(self):
+        """ Unmaps and closes the file. """
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                # Views are still being held by the caller, unmapped once they are released
+                pass
+            self._mm = None
+        self._file.close()
+
+    def records(self, start: int = PCAP_GLOBAL_HEADER_SIZE, end: int = None) -> Iterator[Record]:
+        """ Yields every record from byte offset start, stops at the first record starting at or after end.
+
+            Args:
+               start: Byte offset of the first record header
+               end: Byte offset to stop at (defaults to end of file)
+        """
+        mm = self._mm
+        size = len(mm)
+        if end is None or end > size:
+            end = size
+        unpack_from = self._record_header.unpack_from
+        divisor = self._ts_divisor
+        
+        offset = start
+        while offset < end and offset + PCAP_RECORD_HEADER_SIZE <= size:
+            ts_sec, ts_frac, caplen, _ = unpack_from(mm, offset)
+            data_start = offset + PCAP_RECORD_HEADER_SIZE
+            
+            # Truncated last record
+            if data_start + caplen > size:
+                return
+            
+            yield Record(offset, ts_sec + ts_frac / divisor, data_start, caplen)
+            offset = data_start + caplen
+
+    def find_record(self, offset: int, end: int = None, magic: bytes = MSOP_MAGIC, size: int = MSOP_PACKET_SIZE) -> int:
+        """ Returns byte offset of the first MSOP record header (or other payload, see magic) at or after offset, or end if there is none.
+
+            Used to split the file into byte ranges that start on a record, without walking every record before it.
+            Candidates are found by searching for the MSOP header, and checked against the record headers around them.
+
+            Args:
+               offset: Byte offset to search from
+               end: Byte offset to stop at (defaults to end of file)
+               magic: Header the payload starts with (defaults to MSOP header)
+               size: Size of the payload (defaults to MSOP packet size)
+        """
+        mm = self._mm
+        file_size = len(mm)
+        if end is None or end > file_size:
+            end = file_size
+        header_to_payload = PCAP_RECORD_HEADER_SIZE + self.payload_offset
+        
+        hit = mm.find(magic, offset + header_to_payload)
+        while 0 <= hit < end + header_to_payload:
+            candidate = hit - header_to_payload
+            if candidate >= end:
+                break
+            if self._is_record(candidate, size):
+                next_record = candidate + PCAP_RECORD_HEADER_SIZE + self._record_header.unpack_from(mm, candidate)[2]
+                if next_record >= file_size or self._is_record(next_record):
+                    return candidate
+            hit = mm.find(magic, hit + 1)
+        return end
+
+    def _is_record(self, offset: int, payload_size: int = 0) -> bool:
+        """ Returns True if a plausible record header starts at offset. """
+        if offset + PCAP_RECORD_HEADER_SIZE > len(self._mm):
+            return False
+        ts_sec, ts_frac, caplen, origlen = self._record_header.unpack_from(self._mm, offset)
+        return (ts_frac < self._ts_divisor and caplen <= origlen <= 0x40000
+                and caplen >= self.payload_offset + payload_size
+                and offset + PCAP_RECORD_HEADER_SIZE + caplen <= len(self._mm))
+
+    def classify(self, record: Record, magic: bytes = MSOP_MAGIC, size: int = MSOP_PACKET_SIZE):
+        """ Returns byte offset of the MSOP payload of a record in the file,
+            None if the record is not an MSOP packet,
+            or -1 if the record cannot be classified at the fixed offset.
+
+            Args:
+               record: Record from records()
+               magic: Header the payload starts with (defaults to MSOP header)
+               size: Size of the payload (defaults to MSOP packet size)
+        """
+        mm = self._mm
+        data_start = record.data_start
+        payload_start = data_start + self.payload_offset
+        
+        # Fast path, MSOP header at the fixed offset
+        if record.caplen >= self.payload_offset + size and mm[payload_start:payload_start+len(magic)] == magic:
+            return payload_start
+        
+        # Check ethertype, VLAN tagged packets and IPv4 with options need dpkt
+        if record.caplen < self._ethertype_offset + 3:
+            return None
+        ethertype_start = data_start + self._ethertype_offset
+        ethertype = mm[ethertype_start:ethertype_start+2]
+        if ethertype in (b"\x81\x00", b"\x88\xa8"):
+            return -1
+        if ethertype == b"\x08\x00" and mm[ethertype_start+2] != 0x45:
+            return -1
+        
+        # Plain IPv4 packet that is not MSOP, or not IPv4 at all
+        return None
+
+    def from_source(self, record: Record, source: bytes) -> bool:
+        """ Returns True if a record (classified at the fixed offset) was sent from source.
+
+            Args:
+               record: Record from records()
+               source: IPv4 address of the sender, 4 bytes (see socket.inet_aton)
+        """
+        source_start = record.data_start + self._source_offset
+        return self._mm[source_start:source_start+4] == source
+
+    def fallback_payload(self, record: Record, source: bytes = None):
+        """ Returns UDP payload of a record using dpkt, or None if it is not a UDP packet (from source, if set).
+
+            Args:
+               record: Record from records()
+               source: IPv4 address of the sender, 4 bytes (see socket.inet_aton)
+        """
+        import dpkt
+        
+        buf = bytes(self._mm[record.data_start:record.data_start+record.caplen])
+        try:
+            if self.linktype == LINKTYPE_LINUX_SLL:
+                link = dpkt.sll.SLL(buf)
+            else:
+                link = dpkt.ethernet.Ethernet(buf)
+        except dpkt.dpkt.UnpackError:
+            return None
+        
+        ip = link.data
+        if not isinstance(ip, (dpkt.ip.IP, dpkt.ip6.IP6)) or not isinstance(ip.data, dpkt.udp.UDP):
+            return None
+        if source is not None and ip.src != source:
+            return None
+        return ip.data.data
+
+    def iter_msop(self, start: int = PCAP_GLOBAL_HEADER_SIZE, end: int = None) -> Iterator[tuple[float, memoryview]]:
+        """ Yields (timestamp, payload) of each MSOP packet, payload is a 1248-byte memoryview.
+
+            Args:
+               start: Byte offset of the first record header
+               end: Byte offset to stop at (defaults to end of file)
+        """
+        return self.iter_payloads(MSOP_MAGIC, MSOP_PACKET_SIZE, start, end)
+
+    def iter_payloads(self, magic: bytes, size: int, start: int = PCAP_GLOBAL_HEADER_SIZE, end: int = None, source: str = None) -> Iterator[tuple[float, memoryview]]:
+        """ Yields (timestamp, payload) of each UDP payload starting with magic, payload is a memoryview of size bytes.
+
+            Args:
+               magic: Header the payload starts with
+               size: Size of the payload
+               start: Byte offset of the first record header
+               end: Byte offset to stop at (defaults to end of file)
+               source: Only yield packets sent from this IPv4 address (eg. "192.168.1.200"), for pcaps with more than 1 sensor
+        """
+        source = source_address(source)
+        view = memoryview(self._mm)
+        try:
+            for record in self.records(start, end):
+                payload_start = self.classify(record, magic, size)
+                if payload_start is None:
+                    continue
+                if payload_start >= 0:
+                    if source is None or self.from_source(record, source):
+                        yield record.timestamp, view[payload_start:payload_start+size]
+                    continue
+                
+                payload = self.fallback_payload(record, source)
+                if payload is not None and len(payload) >= size and payload[0:len(magic)] == magic:
+                    yield record.timestamp, memoryview(payload[:size])
+        finally:
+            view.release()
+
+    def iter_batches(self, batch_size: int = 256, start: int = PCAP_GLOBAL_HEADER_SIZE, end: int = None, source: str = None) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """ Yields (timestamps, offsets, packets) of up to batch_size MSOP packets at a time.
+
+            offsets are the byte offsets of the record headers in the file.
+            packets is a structured array (MSOP_DTYPE) to pass to decode_packets().
+            Packets evenly spaced in the file (ie. same record size, which is the usual case)
+            are found without walking each record (see _msop_run), and returned as a strided view of the file, without copying.
+
+            Args:
+               batch_size: Max number of packets per batch
+               start: Byte offset of the first record header
+               end: Byte offset to stop at (defaults to end of file)
+               source: Only yield packets sent from this IPv4 address (eg. "192.168.1.200"), for pcaps with more than 1 sensor
+        """
+        source = source_address(source)
+        size = len(self._mm)
+        if end is None or end > size:
+            end = size
+        
+        offset = start
+        while offset < end and offset + PCAP_RECORD_HEADER_SIZE <= size:
+            run = self._msop_run(offset, end, batch_size, source)
+            if run is not None:
+                yield run[:3]
+                offset = run[3]
+                continue
+            
+            # Not an MSOP packet at the fixed offset, check this record alone
+            record = next(self.records(offset, end), None)
+            if record is None:
+                return
+            offset = record.data_start + record.caplen
+            if self.classify(record) != -1:
+                continue
+            payload = self.fallback_payload(record, source)
+            if payload is not None and len(payload) >= MSOP_PACKET_SIZE and payload[0:8] == MSOP_MAGIC:
+                yield np.array([record.timestamp]), np.array([record.offset], dtype=np.int64), np.frombuffer(payload, dtype=MSOP_DTYPE, count=1)
+
+    def _msop_run(self, offset: int, end: int, max_packets: int, source: bytes = None):
+        """ Returns (timestamps, offsets, packets, next offset) of the run of same-size MSOP records starting at offset,
+            or None if the record at offset is not an MSOP packet at the fixed offset.
+
+            Record headers and MSOP headers of the whole run are checked at once, as strided views of the file.
+
+            Args:
+               offset: Byte offset of the first record header
+               end: Byte offset to stop at
+               max_packets: Max number of packets in the run
+               source: Only include packets sent from this IPv4 address, 4 bytes (see socket.inet_aton)
+        """
+        mm = self._mm
+        size = len(mm)
+        caplen = self._record_header.unpack_from(mm, offset)[2]
+        record_size = PCAP_RECORD_HEADER_SIZE + caplen
+        payload_start = offset + PCAP_RECORD_HEADER_SIZE + self.payload_offset
+        if (caplen < self.payload_offset + MSOP_PACKET_SIZE or offset + record_size > size
+                or mm[payload_start:payload_start+8] != MSOP_MAGIC):
+            return None
+        source_start = offset + PCAP_RECORD_HEADER_SIZE + self._source_offset
+        if source is not None and mm[source_start:source_start+4] != source:
+            return None
+        
+        count = min(max_packets, (end - 1 - offset) // record_size + 1, (size - offset) // record_size)
+        headers = np.ndarray((count,), dtype=self._record_dtype, buffer=mm, offset=offset, strides=(record_size,))
+        magics = np.ndarray((count,), dtype=">u8", buffer=mm, offset=payload_start, strides=(record_size,))
+        
+        # Run ends at the first record of another size, or that is not MSOP
+        same = (headers["caplen"] == caplen) & (magics == _MSOP_MAGIC_INT)
+        if source is not None:
+            sources = np.ndarray((count,), dtype=">u4", buffer=mm, offset=source_start, strides=(record_size,))
+            same &= sources == int.from_bytes(source, "big")
+        if not same.all():
+            count = int(np.argmin(same))
+            headers = headers[:count]
+        
+        timestamps = headers["ts_sec"] + headers["ts_frac"] / self._ts_divisor
+        offsets = offset + np.arange(count, dtype=np.int64) * record_size
+        packets = np.ndarray((count,), dtype=MSOP_DTYPE, buffer=mm, offset=payload_start, strides=(record_size,))
+        return timestamps, offsets, packets, offset + count * record_size
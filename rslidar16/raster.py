@@ -0,0 +1,244 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Draws frames straight into an RGB pixel buffer with NumPy, without matplotlib, for rendering many frames quickly.
+Points are projected from above (bird's-eye, "bev"), from the side ("side", x against z),
+or from a fixed 3D camera ("camera", same angle as the default matplotlib 3D view, but orthographic).
+Points outside the limits are dropped. Where several points land on one pixel, either the point nearest
+the camera (z-buffer) or the point with the highest intensity is kept.
+Points are coloured by intensity (0-255) with a 256-entry viridis lookup table, and images are saved as PNG
+with zlib (Python Standard Library).
+'''
+
+import os
+import struct
+import zlib
+import numpy as np
+from .render import Rendered
+
+# Viridis colour map (same as matplotlib), RGB of each intensity 0-255
+VIRIDIS_LUT = np.frombuffer(bytes.fromhex(
+    "44015444025645045745055946075a46085c460a5d460b5e470d60470e61471063471164471365481467481668481769"
+    "48186a481a6c481b6d481c6e481d6f481f70482071482173482374482475482576482677482878482979472a7a472c7a"
+    "472d7b472e7c472f7d46307e46327e46337f463480453581453781453882443983443a83443b84433d84433e85423f85"
+    "4240864241864142874144874045884046883f47883f48893e49893e4a893e4c8a3d4d8a3d4e8a3c4f8a3c508b3b518b"
+    "3b528b3a538b3a548c39558c39568c38588c38598c375a8c375b8d365c8d365d8d355e8d355f8d34608d34618d33628d"
+    "33638d32648e32658e31668e31678e31688e30698e306a8e2f6b8e2f6c8e2e6d8e2e6e8e2e6f8e2d708e2d718e2c718e"
+    "2c728e2c738e2b748e2b758e2a768e2a778e2a788e29798e297a8e297b8e287c8e287d8e277e8e277f8e27808e26818e"
+    "26828e26828e25838e25848e25858e24868e24878e23888e23898e238a8d228b8d228c8d228d8d218e8d218f8d21908d"
+    "21918c20928c20928c20938c1f948c1f958b1f968b1f978b1f988b1f998a1f9a8a1e9b8a1e9c891e9d891f9e891f9f88"
+    "1fa0881fa1881fa1871fa28720a38620a48621a58521a68522a78522a88423a98324aa8325ab8225ac8226ad8127ad81"
+    "28ae8029af7f2ab07f2cb17e2db27d2eb37c2fb47c31b57b32b67a34b67935b77937b87838b9773aba763bbb753dbc74"
+    "3fbc7340bd7242be7144bf7046c06f48c16e4ac16d4cc26c4ec36b50c46a52c56954c56856c66758c7655ac8645cc863"
+    "5ec96260ca6063cb5f65cb5e67cc5c69cd5b6ccd5a6ece5870cf5773d05675d05477d1537ad1517cd2507fd34e81d34d"
+    "84d44b86d54989d5488bd6468ed64590d74393d74195d84098d83e9bd93c9dd93ba0da39a2da37a5db36a8db34aadc32"
+    "addc30b0dd2fb2dd2db5de2bb8de29bade28bddf26c0df25c2df23c5e021c8e020cae11fcde11dd0e11cd2e21bd5e21a"
+    "d8e219dae319dde318dfe318e2e418e5e419e7e419eae51aece51befe51cf1e51df4e61ef6e620f8e621fbe723fde725"
+), dtype=np.uint8).reshape(256, 3)
+
+VIEWS = ("bev", "side", "camera")
+CAMERA_ELEVATION = 30      # Angle of the camera above the xy plane (in degrees), same as matplotlib 3D default
+CAMERA_AZIMUTH = -60       # Angle of the camera around the z axis (in degrees), same as matplotlib 3D default
+CAMERA_BOX_ASPECT = (4, 4, 3)    # Relative size of the x, y, z axes in the camera view, same as matplotlib 3D default
+BACKGROUND = (255, 255, 255)     # Colour of pixels without points
+POINT_COLOUR = (31, 119, 180)    # Colour of points when no intensity is given (matplotlib "C0")
+PNG_COMPRESSION = 6        # zlib level of saved PNG files (0-9), lower is faster and larger
+
+
+def write_png(filename: str, image: np.ndarray, compression: int = PNG_COMPRESSION):
+    """ Saves an RGB (or RGBA) image as a PNG file.
+
+        Args:
+           filename: Filename of output image
+           image: uint8 array, shape (height, width, 3) or (height, width, 4)
+           compression: zlib level (0-9)
+    """
+    height, width, channels = image.shape
+    colour_type = {3: 2, 4: 6}[channels]
+    # Every row starts with filter type 0 (none)
+    rows = np.zeros((height, width * channels + 1), dtype=np.uint8)
+    rows[:, 1:].reshape(height, width, channels)[:] = image
+    
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+    
+    with open(filename, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, colour_type, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(rows.tobytes(), compression)))
+        f.write(chunk(b"IEND", b""))
+
+
+class Rasterizer:
+    """ Projects points into a pixel buffer, one image per frame.
+
+        Args:
+           view: "bev" (x right, y up), "side" (x right, z up) or "camera" (fixed 3D camera)
+           limits: ((x_min, x_max), (y_min, y_max), (z_min, z_max)) shown (in meters), None for no z limit
+                   (points off the image are left out)
+           size: (width, height) of the image (in pixels)
+           splat: "zbuffer" to keep the point nearest the camera on each pixel, "max" to keep the highest intensity
+           point_size: Width of each point (in pixels)
+    """
+
+    def __init__(self, view: str, limits: tuple, size: tuple[int, int] = (720, 720), splat: str = "zbuffer", point_size: int = 1):
+        if view not in VIEWS:
+            raise ValueError(f"view must be one of {VIEWS}")
+        if splat not in ("zbuffer", "max"):
+            raise ValueError("splat must be 'zbuffer' or 'max'")
+        
+        self.view = view
+        self.limits = np.array([lim if lim is not None else (-np.inf, np.inf) for lim in limits], dtype=float)
+        self.size = size
+        self.splat = splat
+        self.point_size = point_size
+        self.axes, self.scale, self.offset = self._projection()
+
+    def _projection(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ Returns (axes, scale, offset), pixel column, row and depth of a point are (xyz @ axes) * scale + offset """
+        if self.view == "bev":
+            # Depth is -z, so the highest point is nearest
+            axes = np.array([[1, 0, 0], [0, -1, 0], [0, 0, -1]], dtype=float).T
+        elif self.view == "side":
+            # Camera at -y looking at +y
+            axes = np.array([[1, 0, 0], [0, 0, -1], [0, 1, 0]], dtype=float).T
+        else:
+            elev, azim = np.radians(CAMERA_ELEVATION), np.radians(CAMERA_AZIMUTH)
+            right = [-np.sin(azim), np.cos(azim), 0]
+            up = [-np.sin(elev) * np.cos(azim), -np.sin(elev) * np.sin(azim), np.cos(elev)]
+            towards_camera = [np.cos(elev) * np.cos(azim), np.cos(elev) * np.sin(azim), np.sin(elev)]
+            # Each axis is scaled to its share of the box, as matplotlib does
+            box = np.array(CAMERA_BOX_ASPECT, dtype=float) / np.ptp(self._finite_limits(), axis=1)
+            axes = box[:, None] * np.array([right, np.negative(up), np.negative(towards_camera)]).T
+        
+        # Fit the corners of the limits to the image, keeping the same scale on both axes
+        corners = np.array(np.meshgrid(*self._finite_limits())).reshape(3, -1).T @ axes
+        low, high = corners.min(axis=0), corners.max(axis=0)
+        width, height = self.size
+        span = np.where(high - low > 0, high - low, 1)
+        pixels = min((width - 1) / span[0], (height - 1) / span[1])
+        scale = np.array([pixels, pixels, 1.0])
+        offset = np.array([(width - 1 - span[0] * pixels) / 2, (height - 1 - span[1] * pixels) / 2, 0]) - low * scale
+        return axes, scale, offset
+
+    def _finite_limits(self) -> np.ndarray:
+        """ Returns limits, with unlimited axes as -1 to 1 (only used to place the image) """
+        return np.where(np.isfinite(self.limits), self.limits, [-1, 1])
+
+    def draw(self, xyz: np.ndarray, intensity: np.ndarray = None) -> np.ndarray:
+        """ Returns RGB image of the points, shape (height, width, 3)
+
+            Args:
+               xyz: (x, y, z) of each point, shape (points, 3), or (x, y) with z taken as 0
+               intensity: Intensity (0-255) of each point, defaults to POINT_COLOUR for every point
+        """
+        width, height = self.size
+        xyz = np.asarray(xyz, dtype=np.float32)
+        if xyz.shape[1] == 2:
+            xyz = np.column_stack((xyz, np.zeros(len(xyz), dtype=np.float32)))
+        
+        inside = np.all((xyz >= self.limits[:, 0]) & (xyz <= self.limits[:, 1]), axis=1)
+        xyz = xyz[inside]
+        projected = (xyz @ self.axes) * self.scale + self.offset
+        col = np.rint(projected[:, 0]).astype(np.intp)
+        row = np.rint(projected[:, 1]).astype(np.intp)
+        
+        if intensity is None:
+            colours = np.broadcast_to(np.array(POINT_COLOUR, dtype=np.uint8), (len(xyz), 3))
+            key = projected[:, 2]
+        else:
+            intensity = np.asarray(intensity)[inside]
+            colours = VIRIDIS_LUT[intensity]
+            key = projected[:, 2] if self.splat == "zbuffer" else -intensity.astype(np.int32)
+        
+        # Larger points cover point_size x point_size pixels
+        if self.point_size > 1:
+            shift = np.arange(self.point_size) - (self.point_size - 1) // 2
+            repeats = self.point_size ** 2
+            col = np.broadcast_to(col[:, None, None] + shift[None, None, :], (len(col), self.point_size, self.point_size)).reshape(-1)
+            row = np.broadcast_to(row[:, None, None] + shift[None, :, None], (len(row), self.point_size, self.point_size)).reshape(-1)
+            key = np.repeat(key, repeats)
+            colours = np.repeat(colours, repeats, axis=0)
+        
+        # Points of an unlimited axis (None) can still land off the image, eg. high points seen from the side
+        keep = (col >= 0) & (col < width) & (row >= 0) & (row < height)
+        col, row, key, colours = col[keep], row[keep], key[keep], colours[keep]
+        
+        # Sort by pixel, then by key, and keep the first (nearest or brightest) point of each pixel
+        pixel = row * width + col
+        order = np.lexsort((key, pixel))
+        pixel = pixel[order]
+        first = np.ones(len(pixel), dtype=bool)
+        first[1:] = pixel[1:] != pixel[:-1]
+        
+        image = np.empty((height * width, 3), dtype=np.uint8)
+        image[:] = BACKGROUND
+        image[pixel[first]] = colours[order[first]]
+        return image.reshape(height, width, 3)
+
+
+class RasterRenderer:
+    """ Saves frames as PNG images drawn by a Rasterizer, can be used with RenderPool in place of PointCloudRenderer or LayerRenderer.
+
+        Args:
+           view: "bev", "side" or "camera" (see Rasterizer)
+           limits: ((x_min, x_max), (y_min, y_max), (z_min, z_max)) shown (in meters), None for no z limit
+           size: (width, height) of the image (in pixels)
+           splat: "zbuffer" or "max" (see Rasterizer)
+           point_size: Width of each point (in pixels)
+           compression: zlib level of saved PNG files (0-9)
+           return_image: If true, render also returns the drawn image
+           save: If false, images are not saved, only handed back (eg. to a writer.ImageWriter)
+    """
+
+    def __init__(self, view: str, limits: tuple, size: tuple[int, int] = (720, 720), splat: str = "zbuffer",
+                 point_size: int = 1, compression: int = PNG_COMPRESSION, return_image: bool = False, save: bool = True):
+        self.rasterizer = Rasterizer(view, limits, size, splat, point_size)
+        self.compression = compression
+        self.save = save
+        self.return_image = return_image or not save
+
+    def setup(self):
+        """ Nothing to set up, the projection is computed when the renderer is made """
+
+    def render(self, points: np.ndarray, intensity: np.ndarray, filename: str, title: str = None) -> Rendered:
+        """ Returns rendered frame, after saving the points as a PNG image (.png is added if filename has no extension)
+
+            Args:
+               points: (x, y, z) or (x, y) of each point
+               intensity: Intensity (0-255) of each point, or None for one colour
+               filename: Filename of output image, None to not save it (with return_image)
+               title: Not drawn, kept so renderers take the same arguments
+        """
+        image = self.rasterizer.draw(points, intensity)
+        if self.save and filename is not None:
+            write_png(filename if os.path.splitext(filename)[1] else filename + ".png", image, self.compression)
+        return Rendered(title, filename, image if self.return_image else None)
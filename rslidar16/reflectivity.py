@@ -0,0 +1,132 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Counts the points of a frame by (azimuth bin, channel, intensity) with a single np.bincount,
+so reflectivity ratios of any number of thresholds, any sector layout and each layer (channel)
+come from sums of the counts, without going over the points again.
+
+Azimuth bins are the runs between the sector edges (see edge_codes_for), eg. 4 bins of 90deg for 4 sectors,
+so the counts grow with the number of edges, wherever they are. Sectors are half-open, [start, end), in degrees.
+'''
+
+import numpy as np
+from .trig import AZIMUTH_CODES
+
+INTENSITY_LEVELS = 256    # Intensity is 1 byte
+NUM_CHANNELS = 16
+
+
+def edge_codes_for(sectors: list[tuple[float, float]]) -> np.ndarray:
+    """ Returns sorted, unique sector edges (in 0.01deg) of sectors, the azimuth bin edges of their histogram.
+
+        Args:
+           sectors: (start, end) of each sector (in degrees)
+    """
+    codes = [int(round(edge * 100)) for sector in sectors for edge in sector]
+    return np.unique(np.clip(codes, 0, AZIMUTH_CODES)).astype(np.uint16)
+
+
+class ReflectivityHistogram:
+    """ Number of points of each (azimuth bin, channel, intensity) of a frame.
+
+        Bin 0 holds azimuths below the first edge, bin i holds azimuths from edge i-1 (inclusive)
+        to edge i (exclusive), and the last bin holds azimuths from the last edge.
+
+        Args:
+           counts: Array of shape (edges + 1, 16, 256)
+           edges: Sorted azimuth bin edges (in 0.01deg), see edge_codes_for
+    """
+
+    def __init__(self, counts: np.ndarray, edges: np.ndarray):
+        self.counts = counts
+        self.edges = edges
+
+    @classmethod
+    def from_points(cls, points: np.ndarray, edges: np.ndarray = None) -> "ReflectivityHistogram":
+        """ Returns histogram of points, from one np.bincount.
+
+            Args:
+               points: Structured array (POINT_DTYPE), eg. CompactFrame.points
+               edges: Sorted azimuth bin edges (in 0.01deg), see edge_codes_for. Defaults to one bin per degree
+        """
+        if edges is None:
+            edges = np.arange(100, AZIMUTH_CODES, 100, dtype=np.uint16)
+        num_bins = len(edges) + 1
+        cell = np.searchsorted(edges, points["azimuth"], side="right") * np.int64(NUM_CHANNELS * INTENSITY_LEVELS)
+        cell += points["channel"] * np.int64(INTENSITY_LEVELS)
+        cell += points["intensity"]
+        counts = np.bincount(cell, minlength=num_bins * NUM_CHANNELS * INTENSITY_LEVELS)
+        return cls(counts.reshape(num_bins, NUM_CHANNELS, INTENSITY_LEVELS), edges)
+
+    def sector_counts(self, sectors: list[tuple[float, float]], by_channel: bool = True) -> np.ndarray:
+        """ Returns counts of each sector, shape (sectors, 16, 256), or (sectors, 256) if by_channel is not set.
+
+            Args:
+               sectors: (start, end) of each sector (in degrees), edges must be edges of the histogram
+               by_channel: Keep counts of each channel (layer) apart
+        """
+        codes = np.clip(np.array([[int(round(start * 100)), int(round(end * 100))] for start, end in sectors]), 0, AZIMUTH_CODES)
+        if not np.isin(codes, self.edges).all():
+            raise ValueError("Sector edges must be edges of the histogram, see edge_codes_for")
+        counts = self.counts if by_channel else self.counts.sum(axis=1)
+        
+        cumulative = np.zeros((len(counts) + 1,) + counts.shape[1:], dtype=np.int64)
+        np.cumsum(counts, axis=0, out=cumulative[1:])
+        # Bins before the one an edge starts are every azimuth below the edge
+        bins = np.searchsorted(self.edges, codes, side="right")
+        return cumulative[bins[:, 1]] - cumulative[bins[:, 0]]
+
+    def ratios(self, thresholds: list[int], sectors: list[tuple[float, float]], by_channel: bool = False) -> np.ndarray:
+        """ Returns fraction of points with intensity above each threshold, shape (sectors, thresholds),
+            or (sectors, 16, thresholds) if by_channel is set. nan where a sector has no points.
+
+            Args:
+               thresholds: Reflectivity values (0-255)
+               sectors: (start, end) of each sector (in degrees)
+               by_channel: Give ratios of each channel (layer) instead of the whole sector
+        """
+        return threshold_ratios(self.sector_counts(sectors, by_channel), thresholds)
+
+
+def threshold_ratios(counts: np.ndarray, thresholds: list[int]) -> np.ndarray:
+    """ Returns fraction of points with intensity above each threshold, nan where there are no points.
+
+        Args:
+           counts: Counts with intensity as last axis (256), eg. from ReflectivityHistogram.sector_counts
+           thresholds: Reflectivity values (0-255)
+    """
+    # above[..., i] is the number of points with intensity >= i
+    above = np.zeros(counts.shape[:-1] + (INTENSITY_LEVELS + 1,), dtype=np.int64)
+    np.cumsum(counts[..., ::-1], axis=-1, out=above[..., -2::-1])
+    
+    total = above[..., :1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return above[..., np.asarray(thresholds) + 1] / total
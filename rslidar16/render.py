@@ -0,0 +1,373 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Renders frames as images with a pool of processes, so saving images does not hold up decoding.
+Frames are handed to the workers through a bounded queue (the caller waits once QUEUE_PER_WORKER frames per worker
+are waiting), and results come back in the order the frames were given.
+
+Each worker sets up its own Agg figure once (see PointCloudRenderer and LayerRenderer), and reuses it for every frame,
+instead of building a new figure per image. File names are chosen by the caller, so they do not depend on which worker
+saved the image. Renderers can also hand back the drawn image (eg. for video.VideoSink), with or without saving it.
+'''
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, NamedTuple
+import os
+import numpy as np
+
+QUEUE_PER_WORKER = 2    # Frames waiting for each worker before the caller waits
+
+
+class Rendered(NamedTuple):
+    """ Result of rendering one frame.
+
+        title: Title of the frame (eg. "Frame 003")
+        filename: Filename of the image (saved by the renderer unless it was made with save=False), None if it was not saved
+        image: RGB image (uint8, shape (height, width, 3)), None unless the renderer was made with return_image
+    """
+    title: str
+    filename: str
+    image: np.ndarray
+
+
+def save_figure(fig, title: str, filename: str, return_image: bool, save: bool = True) -> Rendered:
+    """ Returns rendered frame, after saving the figure as an image (if filename and save are set)
+
+        Args:
+           fig: matplotlib figure, with an Agg canvas
+           title: Title of the frame
+           filename: Filename of output image, None to not save it
+           return_image: If true, the drawn image is handed back as an RGB array
+           save: If false, the image is not saved (eg. to hand it to a writer.ImageWriter instead)
+    """
+    if save and not return_image:
+        fig.savefig(fname=filename)
+        return Rendered(title, filename, None)
+    
+    # Draw once, then save the same pixels instead of drawing again in savefig
+    fig.canvas.draw()
+    return save_canvas(fig, title, filename, return_image, save)
+
+def draw_background(fig):
+    """ Returns copy of the figure drawn without its animated artists (eg. points and titles that change every frame)
+
+        Args:
+           fig: matplotlib figure, with an Agg canvas
+    """
+    fig.canvas.draw()
+    return fig.canvas.copy_from_bbox(fig.bbox)
+
+def save_canvas(fig, title: str, filename: str, return_image: bool, save: bool = True) -> Rendered:
+    """ Returns rendered frame, after saving what is on the canvas as a PNG image (if filename and save are set), without drawing again
+
+        Args:
+           fig: matplotlib figure, with an Agg canvas
+           title: Title of the frame
+           filename: Filename of output image (.png is added if it has no extension), None to not save it
+           return_image: If true, the image is handed back as an RGB array
+           save: If false, the image is not saved (eg. to hand it to a writer.ImageWriter instead)
+    """
+    from .raster import write_png
+    
+    # View of the canvas, saved as RGBA (same as savefig), only copied if it is handed back
+    rgba = np.asarray(fig.canvas.buffer_rgba())
+    if save and filename is not None:
+        write_png(filename if os.path.splitext(filename)[1] else filename + ".png", rgba)
+    return Rendered(title, filename, rgba[:, :, :3].copy() if return_image else None)
+
+
+class PointCloudRenderer:
+    """ Saves 3D scatter plots of frames, coloured by intensity, from one reused figure.
+
+        Args:
+           x_max: Point cloud will display from -x_max to +x_max (in meters)
+           y_max: Point cloud will display from -y_max to +y_max (in meters)
+           z_max: Point cloud will display from -z_max to +z_max (in meters)
+           figsize: Size of the image (in inches)
+           cmap: Color map of the points
+           color_range: (min, max) value of the color map, None to fit the values of each frame
+           return_image: If true, render also returns the drawn image
+           save: If false, images are not saved, only handed back (eg. to a writer.ImageWriter)
+    """
+
+    def __init__(self, x_max: float, y_max: float, z_max: float, figsize: tuple[float, float] = (7.2, 7.2), cmap: str = "viridis",
+                 color_range: tuple[float, float] = None, return_image: bool = False, save: bool = True):
+        self.x_max = x_max
+        self.y_max = y_max
+        self.z_max = z_max
+        self.figsize = figsize
+        self.cmap = cmap
+        self.color_range = color_range or (None, None)
+        self.save = save
+        self.return_image = return_image or not save
+        self.fig = None
+        self.ax = None
+        self.scatter = None
+
+    def setup(self):
+        """ Creates the figure and axes, called once in each worker """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        
+        self.fig = Figure(figsize=self.figsize)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot(projection='3d')
+        
+        # Set plot axes limits
+        self.ax.axes.set_xlim3d(left=-self.x_max, right=self.x_max)
+        self.ax.axes.set_ylim3d(bottom=-self.y_max, top=self.y_max)
+        self.ax.axes.set_zlim3d(bottom=-self.z_max, top=self.z_max)
+
+    def render(self, xyz: np.ndarray, intensity: np.ndarray, filename: str, title: str) -> Rendered:
+        """ Returns rendered frame, after saving the points as an image
+
+            Args:
+               xyz: (x, y, z) of each point, shape (points, 3)
+               intensity: Intensity (0-255) of each point, or any value the points are coloured by
+               filename: Filename of output image, None to not save it (with return_image)
+               title: Title of the plot
+        """
+        if self.scatter is not None:
+            self.scatter.remove()
+        x, y, z = xyz.T
+        vmin, vmax = self.color_range
+        # xyz as coords, . as marker, s is marker size, c is color of marker, cmap is color map which ranges from 0-255
+        self.scatter = self.ax.scatter(x, y, z, marker=".", s=1, c=intensity, cmap=self.cmap, vmin=vmin, vmax=vmax)
+        self.ax.set_title(title)
+        return save_figure(self.fig, title, filename, self.return_image, self.save)
+
+
+class LayerRenderer:
+    """ Saves 2D scatter plots of one layer of a frame, from one figure drawn once.
+
+        The axes, ticks and labels are drawn once and kept as a background. For each frame only the points
+        (set_offsets) and the title are drawn over a copy of it, so nothing is laid out again.
+
+        Args:
+           x_start: Min X coords (left)
+           x_end: Max X coords (right)
+           y_start: Min Y coords (bottom)
+           y_end: Max Y coords (top)
+           return_image: If true, render also returns the drawn image
+           save: If false, images are not saved, only handed back (eg. to a writer.ImageWriter)
+    """
+
+    def __init__(self, x_start: float, x_end: float, y_start: float, y_end: float, return_image: bool = False, save: bool = True):
+        self.limits = (x_start, x_end, y_start, y_end)
+        self.save = save
+        self.return_image = return_image or not save
+        self.fig = None
+        self.ax = None
+        self.scatter = None
+        self.background = None
+
+    def setup(self):
+        """ Creates the figure and axes, and draws everything that stays the same, called once in each worker """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        
+        self.fig = Figure()
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        
+        # Set marker limits
+        x_start, x_end, y_start, y_end = self.limits
+        self.ax.set_xlim(x_start, x_end)
+        self.ax.set_ylim(y_start, y_end)
+        
+        # Points and title change every frame, they are left out of the background
+        self.scatter = self.ax.scatter([], [], marker=".", s=0.4, color="C0", animated=True)
+        self.ax.title.set_animated(True)
+        self.background = draw_background(self.fig)
+
+    def render(self, plane_coords: np.ndarray, intensity: np.ndarray, filename: str, title: str) -> Rendered:
+        """ Returns rendered frame, after saving the points as an image
+
+            Args:
+               plane_coords: (x, y) of each point, shape (points, 2)
+               intensity: Not used, points are all one colour (kept so renderers take the same arguments)
+               filename: Filename of output image, None to not save it (with return_image)
+               title: Title of the plot
+        """
+        self.scatter.set_offsets(plane_coords)
+        self.ax.set_title(title)
+        self.fig.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.scatter)
+        self.ax.draw_artist(self.ax.title)
+        return save_canvas(self.fig, title, filename, self.return_image, self.save)
+
+
+class LayerGridRenderer:
+    """ Saves all 16 layers of a frame as a 4x4 grid of 2D scatter plots in one image, from one figure drawn once.
+
+        Args:
+           x_start: Min X coords (left)
+           x_end: Max X coords (right)
+           y_start: Min Y coords (bottom)
+           y_end: Max Y coords (top)
+           figsize: Size of the image (in inches)
+           return_image: If true, render also returns the drawn image
+           save: If false, images are not saved, only handed back (eg. to a writer.ImageWriter)
+    """
+
+    def __init__(self, x_start: float, x_end: float, y_start: float, y_end: float, figsize: tuple[float, float] = (16, 12), return_image: bool = False, save: bool = True):
+        self.limits = (x_start, x_end, y_start, y_end)
+        self.figsize = figsize
+        self.save = save
+        self.return_image = return_image or not save
+        self.fig = None
+        self.axes = None
+        self.scatters = None
+        self.title = None
+        self.background = None
+
+    def setup(self):
+        """ Creates the figure and the 16 axes, and draws everything that stays the same, called once in each worker """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        
+        self.fig = Figure(figsize=self.figsize, layout="constrained")
+        FigureCanvasAgg(self.fig)
+        self.axes = self.fig.subplots(4, 4, sharex=True, sharey=True).reshape(-1)
+        
+        x_start, x_end, y_start, y_end = self.limits
+        self.scatters = []
+        for layer, ax in enumerate(self.axes):
+            ax.set_xlim(x_start, x_end)
+            ax.set_ylim(y_start, y_end)
+            ax.set_title(f"Layer {str(layer).zfill(2)}", fontsize="small")
+            self.scatters.append(ax.scatter([], [], marker=".", s=0.4, color="C0", animated=True))
+        self.title = self.fig.suptitle(" ", animated=True)
+        self.background = draw_background(self.fig)
+        # Layout is fixed from here on, so every frame lines up with the background
+        self.fig.set_layout_engine("none")
+
+    def render(self, layers: list[np.ndarray], intensity: np.ndarray, filename: str, title: str) -> Rendered:
+        """ Returns rendered frame, after saving the layers as one image
+
+            Args:
+               layers: (x, y) of each point of each of the 16 layers
+               intensity: Not used, points are all one colour (kept so renderers take the same arguments)
+               filename: Filename of output image, None to not save it (with return_image)
+               title: Title of the image
+        """
+        self.fig.canvas.restore_region(self.background)
+        for ax, scatter, plane_coords in zip(self.axes, self.scatters, layers):
+            scatter.set_offsets(plane_coords)
+            ax.draw_artist(scatter)
+        self.title.set_text(title)
+        self.fig.draw_artist(self.title)
+        return save_canvas(self.fig, title, filename, self.return_image, self.save)
+
+
+_renderer = None    # Renderer of this worker process
+
+def _init_worker(renderer):
+    """ Worker initializer, keeps the renderer (and its figure) for every task of this worker. """
+    global _renderer
+    _renderer = renderer
+    _renderer.setup()
+
+def _render(args: tuple):
+    """ Worker task, renders one frame with the renderer of this worker. """
+    return _renderer.render(*args)
+
+
+class RenderPool:
+    """ Renders frames with a renderer (eg. PointCloudRenderer, or raster.RasterRenderer) in a pool of processes.
+
+        With 1 worker, frames are rendered in this process as they are given.
+
+        Args:
+           renderer: Object with setup() (called once per worker) and render(*args)
+           workers: Number of processes, 0 or None for one per CPU
+           queue_size: Frames waiting to be rendered before submit waits, defaults to QUEUE_PER_WORKER per worker
+           callback: Called with the result of each frame, in the order frames were submitted
+    """
+
+    def __init__(self, renderer, workers: int = None, queue_size: int = None, callback: Callable = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size or QUEUE_PER_WORKER * self.workers
+        self.callback = callback
+        self.rendered = 0
+        self.pending = deque()
+        
+        if self.workers == 1:
+            self.renderer = renderer
+            self.renderer.setup()
+            self.pool = None
+        else:
+            self.renderer = None
+            self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(renderer,))
+
+    def submit(self, *args):
+        """ Renders a frame, waits first if queue_size frames are already waiting
+
+            Args:
+               args: Arguments of renderer.render
+        """
+        if self.pool is None:
+            self._done(self.renderer.render(*args))
+            return
+        
+        while len(self.pending) >= self.queue_size:
+            self._done(self.pending.popleft().result())
+        self.pending.append(self.pool.submit(_render, args))
+
+    def _done(self, result):
+        self.rendered += 1
+        if self.callback is not None:
+            self.callback(result)
+
+    def close(self, cancel: bool = False) -> int:
+        """ Waits for the frames left, returns number of frames rendered
+
+            Args:
+               cancel: If true, frames not yet started are dropped instead
+        """
+        try:
+            while self.pending and not cancel:
+                self._done(self.pending.popleft().result())
+        finally:
+            if self.pool is not None:
+                for future in self.pending:
+                    future.cancel()
+                self.pending.clear()
+                self.pool.shutdown()
+                self.pool = None
+        return self.rendered
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        self.close(cancel=exc_type is not None)
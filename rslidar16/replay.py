@@ -0,0 +1,206 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Sends the MSOP packets of a pcap file to a UDP port, as a stand-in for the sensor (eg. for live.LiveReceiver).
+Packets are sent with their original timing, a multiple of it (speed), or as fast as possible (speed 0).
+DIFOP packets can be sent to their own port, the same way the sensor sends them.
+
+Packets are read in batches (see PcapReader.iter_batches) and copied into a send buffer allocated once.
+Every packet due by the time the sender wakes up is sent back to back, from a connected socket.
+DIFOP packets are found as the replay reaches them (see PcapReader.find_record), so sending starts straight away,
+and go out from a second, unconnected socket.
+The sender sleeps until SPIN_TIME before the next packet is due, then spins on the clock,
+as sleep alone can be late by a millisecond or more.
+
+The pacing error of a packet is the time it was sent minus the time it was due (late is positive).
+'''
+
+import socket
+import time
+import numpy as np
+from .decoder import DIFOP_MAGIC, DIFOP_PACKET_SIZE, MSOP_PACKET_SIZE
+from .live import DIFOP_PORT, MSOP_PORT
+from .pcap import PCAP_GLOBAL_HEADER_SIZE, PcapReader
+
+REPLAY_BATCH_SIZE = 1024    # Packets read from the pcap at once
+SPIN_TIME = 0.002           # Seconds before a packet is due to stop sleeping and spin on the clock
+SEND_BUFFER_SIZE = 4 << 20  # Socket send buffer asked for (SO_SNDBUF), the OS may give less
+
+
+class ReplayReport:
+    """ Result of replay_pcap.
+
+        Args:
+           filename: Filename of the pcap
+           speed: Multiple of real time the pcap was sent at, 0 for as fast as possible
+    """
+
+    def __init__(self, filename: str, speed: float):
+        self.filename = filename
+        self.speed = speed
+        self.packets = 0
+        self.difop_packets = 0
+        self.capture_duration = 0.0    # Time between first and last packet in the pcap (in seconds)
+        self.elapsed = 0.0             # Time taken to send all packets (in seconds)
+        self.errors = np.zeros(0)      # Pacing error of each packet (in seconds), empty if speed is 0
+
+    @property
+    def packets_per_second(self) -> float:
+        return self.packets / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def megabits_per_second(self) -> float:
+        return self.packets * MSOP_PACKET_SIZE * 8 / 1e6 / self.elapsed if self.elapsed > 0 else 0.0
+
+    def format(self) -> str:
+        """ Returns report as lines of text. """
+        pace = f"{self.speed:g}x real time" if self.speed else "as fast as possible"
+        lines = [
+            f"{self.filename} ({pace})",
+            f"  Packets: {self.packets} MSOP, {self.difop_packets} DIFOP, sent in {self.elapsed:.2f}s (capture is {self.capture_duration:.2f}s)",
+            f"  Rate: {self.packets_per_second:.0f} packets/s, {self.megabits_per_second:.1f} Mbit/s",
+        ]
+        if len(self.errors):
+            error = np.abs(self.errors)
+            lines.append(f"  Pacing error: mean {error.mean() * 1e6:.1f}us, p99 {np.percentile(error, 99) * 1e6:.1f}us, max {error.max() * 1e6:.1f}us")
+        return "\n".join(lines)
+
+
+def wait_until(deadline: float):
+    """ Returns at time.perf_counter() deadline, sleeps until SPIN_TIME before it then spins.
+
+        Args:
+           deadline: Time to return at (from time.perf_counter)
+    """
+    remaining = deadline - time.perf_counter()
+    if remaining > SPIN_TIME:
+        time.sleep(remaining - SPIN_TIME)
+    while time.perf_counter() < deadline:
+        pass
+
+def iter_difop(pcap: PcapReader, source: str = None):
+    """ Yields (byte offset of the record, payload) of each DIFOP packet, found one at a time as they are asked for.
+
+        Args:
+           pcap: mmap pcap reader object (rslidar16.PcapReader)
+           source: Only yield packets sent from this IPv4 address, for pcaps with more than 1 sensor
+    """
+    offset = pcap.find_record(PCAP_GLOBAL_HEADER_SIZE, None, DIFOP_MAGIC, DIFOP_PACKET_SIZE)
+    while offset < len(pcap):
+        record = next(pcap.records(offset), None)
+        if record is None:
+            return
+        end = record.data_start + record.caplen
+        for _, payload in pcap.iter_payloads(DIFOP_MAGIC, DIFOP_PACKET_SIZE, offset, end, source):
+            yield offset, bytes(payload)
+        offset = pcap.find_record(end, None, DIFOP_MAGIC, DIFOP_PACKET_SIZE)
+
+def replay_pcap(pcap_path: str, host: str = "127.0.0.1", port: int = MSOP_PORT, speed: float = 1.0, difop_port: int = DIFOP_PORT,
+                source: str = None, batch_size: int = REPLAY_BATCH_SIZE) -> ReplayReport:
+    """ Sends the MSOP packets of a pcap to a UDP port, returns a report of the rate and pacing reached.
+
+        Args:
+           pcap_path: Filename of input pcap file
+           host: Address to send to
+           port: UDP port to send MSOP packets to
+           speed: Multiple of real time to send at (eg. 1 for original timing, 2 for twice as fast), 0 for as fast as possible
+           difop_port: UDP port to send DIFOP packets to, None to not send them
+           source: Only send packets sent from this IPv4 address, for pcaps with more than 1 sensor
+           batch_size: Number of packets read from the pcap at once
+    """
+    report = ReplayReport(pcap_path, speed)
+    # Raw bytes of each packet, copied much faster than field by field as MSOP_DTYPE
+    buffer = np.zeros(batch_size, f"V{MSOP_PACKET_SIZE}")
+    flat = memoryview(buffer.view(np.uint8))
+    slots = [flat[i * MSOP_PACKET_SIZE:(i + 1) * MSOP_PACKET_SIZE] for i in range(batch_size)]
+    # Pacing error of each packet of a batch, kept once per batch
+    batch_errors = np.zeros(batch_size)
+    errors = []
+    
+    with PcapReader(pcap_path) as pcap, socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock, \
+         socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as difop_sock:
+        # DIFOP packets are sent once per second, each before the first MSOP packet after it in the pcap
+        difop = iter_difop(pcap, source) if difop_port is not None else iter(())
+        next_difop = next(difop, None)
+        
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_SIZE)
+        sock.connect((host, port))
+        send = sock.send
+        
+        first_timestamp = None
+        start = time.perf_counter()
+        for timestamps, offsets, packets in pcap.iter_batches(batch_size, source=source):
+            count = len(packets)
+            buffer[:count] = packets.view(buffer.dtype)
+            if first_timestamp is None:
+                # Start the clock once the first batch is read, so the first packets are not late
+                first_timestamp = float(timestamps[0])
+                start = time.perf_counter()
+            if speed:
+                due = start + (timestamps - first_timestamp) / speed
+            
+            sent = 0
+            while sent < count:
+                if speed:
+                    wait_until(due[sent])
+                    now = time.perf_counter()
+                    # Send every packet that is due already, at least 1
+                    stop = max(sent + 1, int(np.searchsorted(due, now, side="right")))
+                    np.subtract(now, due[sent:stop], out=batch_errors[sent:stop])
+                else:
+                    stop = count
+                
+                while next_difop is not None and next_difop[0] < offsets[stop - 1]:
+                    try:
+                        # Not on the connected socket, some systems (eg. macOS) refuse sendto on it
+                        difop_sock.sendto(next_difop[1], (host, difop_port))
+                    except ConnectionRefusedError:
+                        pass
+                    report.difop_packets += 1
+                    next_difop = next(difop, None)
+                for slot in slots[sent:stop]:
+                    try:
+                        send(slot)
+                    except ConnectionRefusedError:
+                        # Nothing listening on the port (yet), same as the sensor the packet is lost
+                        pass
+                sent = stop
+            
+            if speed:
+                errors.append(batch_errors[:count].copy())
+            report.packets += count
+            report.capture_duration = float(timestamps[-1]) - first_timestamp
+        
+        report.elapsed = time.perf_counter() - start
+    
+    if errors:
+        report.errors = np.concatenate(errors)
+    return report
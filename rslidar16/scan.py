@@ -0,0 +1,283 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Checks a pcap file for packet loss, reordering and timing gaps, without decoding any points.
+Only the pcap record headers, the MSOP header and the azimuth/flag of each datablock are read,
+whole batches of packets at a time, so a capture is scanned about as fast as it can be read from disk.
+
+Reports:
+missing packets: Gap in azimuth between 2 packets, counted in whole packets (based on the usual azimuth step)
+out of order packets: Packet with azimuth behind a packet before it (fills one of the gaps above)
+duplicate packets: Packet with the same azimuths as the packet before it
+azimuth jumps: Gap in azimuth that is not a whole number of packets, or inside a packet
+bad flags: Datablocks without the 0xffee flag
+timing gaps: Time between 2 packets more than GAP_FACTOR times the usual time
+timestamps backwards: pcap or MSOP header timestamp earlier than the packet before it
+jitter: Spread of time between packets, around the usual time
+packets per frame: Number of packets holding datablocks of each frame (same as FrameIndex)
+truncated: pcap ends partway through a record (eg. capture was cut off)
+
+Azimuth gaps are counted modulo one turn, a gap longer than half a turn shows up as a timing gap instead.
+'''
+
+from typing import NamedTuple
+import numpy as np
+from .decoder import BLOCKS_PER_PACKET, MSOP_TIME_DTYPE, MSOP_TIME_OFFSET
+from .index import WRAP_THRESHOLD, find_wraps
+from .pcap import PCAP_GLOBAL_HEADER_SIZE, PcapReader
+
+SCAN_BATCH_SIZE = 4096    # Packets read at once
+GAP_FACTOR = 2.5          # A step is a gap if it is more than GAP_FACTOR times the usual step
+MAX_EVENTS = 10000        # Max number of events kept, counts are always exact
+
+BLOCK_FLAG = 0xffee
+AZIMUTH_CODES = 36000
+
+
+class ScanEvent(NamedTuple):
+    """ One problem found in a pcap.
+
+        packet: Packet number (starts at 0)
+        offset: Byte offset of the pcap record of the packet
+        timestamp: pcap timestamp (in seconds) of the packet
+        kind: "missing", "out_of_order", "duplicate", "azimuth_jump", "bad_flag", "timing_gap", "timestamp_backwards" or "header_time_backwards"
+        value: Number of packets missing, azimuth gap (in degrees), time gap (in seconds), or number of bad datablocks
+    """
+    packet: int
+    offset: int
+    timestamp: float
+    kind: str
+    value: float
+
+
+class ScanReport:
+    """ Result of scan_pcap.
+
+        Args:
+           filename: Filename of the pcap
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.packets = 0
+        self.first_timestamp = 0.0
+        self.last_timestamp = 0.0
+        self.block_step = 0.0          # Usual azimuth step between datablocks (in 0.01deg)
+        self.packet_interval = 0.0     # Usual time between packets (in seconds)
+        self.counts = {kind: 0 for kind in ("missing", "out_of_order", "duplicate", "azimuth_jump", "bad_flag",
+                                            "timing_gap", "timestamp_backwards", "header_time_backwards")}
+        self.events = []
+        self.jitter_std = 0.0          # Standard deviation of time between packets (in seconds), gaps not included
+        self.jitter_max = 0.0          # Largest difference from the usual time between packets (in seconds), gaps not included
+        self.frame_packets = np.zeros(0, dtype=np.int64)
+        self.truncated = False         # True if the pcap ends partway through a record
+
+    @property
+    def duration(self) -> float:
+        return self.last_timestamp - self.first_timestamp
+
+    @property
+    def missing_packets(self) -> int:
+        """ Estimated number of packets lost, gaps filled by out of order packets are not counted. """
+        return max(0, self.counts["missing"] - self.counts["out_of_order"])
+
+    @property
+    def ok(self) -> bool:
+        """ True if no problems were found. """
+        return self.packets > 0 and not self.truncated and not any(self.counts.values())
+
+    def add_events(self, kind: str, mask: np.ndarray, offsets: np.ndarray, timestamps: np.ndarray, values: np.ndarray):
+        """ Counts events of one kind in a batch of packets, keeps them until there are MAX_EVENTS.
+            Packet numbers of the batch start at self.packets.
+
+            Args:
+               kind: Kind of event (see ScanEvent)
+               mask: True for each packet in the batch with the event
+               offsets, timestamps: Of every packet in the batch
+               values: Value of every packet in the batch (see ScanEvent)
+        """
+        pos = np.flatnonzero(mask)
+        if kind == "missing":
+            self.counts[kind] += int(values[pos].sum())
+        else:
+            self.counts[kind] += len(pos)
+        
+        room = MAX_EVENTS - len(self.events)
+        for i in pos[:max(room, 0)]:
+            self.events.append(ScanEvent(self.packets + int(i), int(offsets[i]), float(timestamps[i]), kind, float(values[i])))
+
+    def format(self, max_events: int = 20) -> str:
+        """ Returns report as lines of text.
+
+            Args:
+               max_events: Max number of events listed
+        """
+        lines = [
+            f"{self.filename}",
+            f"  Packets: {self.packets} over {self.duration:.1f}s, usual interval {self.packet_interval * 1e6:.1f}us, usual datablock step {self.block_step / 100:.2f}deg",
+            f"  Missing packets: {self.missing_packets}, out of order: {self.counts['out_of_order']}, duplicate: {self.counts['duplicate']}",
+            f"  Azimuth jumps: {self.counts['azimuth_jump']}, bad datablock flags: {self.counts['bad_flag']}",
+            f"  Timing gaps: {self.counts['timing_gap']}, timestamps backwards: {self.counts['timestamp_backwards']} (pcap), {self.counts['header_time_backwards']} (MSOP header)",
+            f"  Jitter: std {self.jitter_std * 1e6:.1f}us, max {self.jitter_max * 1e6:.1f}us",
+        ]
+        if self.truncated:
+            lines.append("  Truncated: pcap ends partway through a packet")
+        if len(self.frame_packets):
+            # First and last frame are usually cut by the start and end of capture
+            full = self.frame_packets[1:-1] if len(self.frame_packets) > 2 else self.frame_packets
+            usual = int(np.median(full))
+            short = np.flatnonzero(full < usual) + (2 if len(self.frame_packets) > 2 else 1)
+            lines.append(f"  Frames: {len(self.frame_packets)}, packets per frame min {full.min()} / usual {usual} / max {full.max()}")
+            if len(short):
+                listed = ", ".join(str(n) for n in short[:max_events])
+                lines.append(f"  Frames with fewer packets than usual ({len(short)}): {listed}{', ...' if len(short) > max_events else ''}")
+        
+        for event in self.events[:max_events]:
+            lines.append(f"  packet {event.packet} (offset {event.offset}, t={event.timestamp:.6f}): {event.kind} {event.value:g}")
+        if sum(self.counts.values()) > max_events:
+            lines.append("  ...")
+        return "\n".join(lines)
+
+
+def _header_times(packets: np.ndarray) -> np.ndarray:
+    """ Returns MSOP header time of each packet (in seconds from start of month), 0 if not set. """
+    t = packets.getfield(MSOP_TIME_DTYPE, MSOP_TIME_OFFSET)
+    seconds = ((t["day"].astype(np.int64) * 24 + t["hour"]) * 60 + t["minute"]) * 60 + t["second"]
+    return seconds + t["ms"] / 1e3 + t["us"] / 1e6
+
+def scan_pcap(pcap: PcapReader, batch_size: int = SCAN_BATCH_SIZE) -> ScanReport:
+    """ Returns ScanReport of a pcap, no points are decoded.
+
+        The usual azimuth step and time between packets are taken from the first batch of packets (with more than 1 packet for the time).
+
+        Args:
+           pcap: mmap pcap reader object (rslidar16.PcapReader)
+           batch_size: Number of packets read at once
+    """
+    report = ScanReport(pcap.filename)
+    
+    wraps = []            # Datablock numbers that start a new frame
+    previous = None       # (azimuth of last datablock, unwrapped azimuth of last datablock, highest unwrapped azimuth so far, first and last azimuth, timestamp, header time) of the previous packet
+    jitter_sum = 0.0
+    jitter_sumsq = 0.0
+    jitter_count = 0
+    end = PCAP_GLOBAL_HEADER_SIZE
+    
+    for timestamps, offsets, packets in pcap.iter_batches(batch_size):
+        count = len(packets)
+        blocks = packets["blocks"]
+        azimuths = blocks["azimuth"].astype(np.int64)
+        first = azimuths[:, 0]
+        last = azimuths[:, -1]
+        span = (last - first) % AZIMUTH_CODES
+        
+        if previous is None:
+            report.first_timestamp = float(timestamps[0])
+            report.block_step = max(float(np.median(span)) / (BLOCKS_PER_PACKET - 1), 1.0)
+            start = first[0] - report.block_step
+            previous = (start, start, start, -1, -1, timestamps[0], 0.0)
+        prev_last, prev_unwrapped, prev_high, prev_first, prev_last_az, prev_timestamp, prev_header = previous
+        
+        # Frames
+        for pos in find_wraps(blocks["azimuth"].ravel(), None if report.packets == 0 else prev_last):
+            wraps.append(report.packets * BLOCKS_PER_PACKET + int(pos))
+        
+        # Bad datablock flags
+        bad = (blocks["flag"] != BLOCK_FLAG).sum(axis=1)
+        report.add_events("bad_flag", bad > 0, offsets, timestamps, bad)
+        
+        # Azimuth step from the last datablock of the previous packet, a drop of more than half a turn is a new frame
+        steps = first - np.concatenate(([prev_last], last[:-1]))
+        steps[steps < -WRAP_THRESHOLD] += AZIMUTH_CODES
+        steps[steps > WRAP_THRESHOLD] -= AZIMUTH_CODES
+        
+        # Unwrapped azimuth (keeps counting up past 360deg), and highest one before each packet
+        unwrapped_first = prev_unwrapped + np.cumsum(steps + np.concatenate(([0], span[:-1])))
+        unwrapped_last = unwrapped_first + span
+        high = np.maximum.accumulate(np.concatenate(([prev_high], unwrapped_last)))
+        gaps = unwrapped_first - high[:-1]
+        
+        duplicate = (first == np.concatenate(([prev_first], first[:-1]))) & (last == np.concatenate(([prev_last_az], last[:-1])))
+        late = (gaps <= 0) & ~duplicate
+        missing = np.where(gaps > GAP_FACTOR * report.block_step, np.rint((gaps / report.block_step - 1) / BLOCKS_PER_PACKET), 0).astype(np.int64)
+        jumps = (gaps > GAP_FACTOR * report.block_step) & (missing == 0)
+        report.add_events("duplicate", duplicate, offsets, timestamps, np.zeros(count))
+        report.add_events("out_of_order", late, offsets, timestamps, gaps / 100)
+        report.add_events("missing", missing > 0, offsets, timestamps, missing)
+        
+        # Jumps inside a packet
+        inside_steps = (np.diff(azimuths, axis=1) % AZIMUTH_CODES).max(axis=1)
+        inside = inside_steps > GAP_FACTOR * report.block_step
+        report.add_events("azimuth_jump", jumps | inside, offsets, timestamps, np.where(inside, inside_steps, gaps) / 100)
+        
+        # Timing, checked once there are packets to take the usual time between packets from
+        intervals = np.diff(timestamps, prepend=prev_timestamp)
+        if report.packet_interval == 0 and np.any(intervals > 0):
+            report.packet_interval = float(np.median(intervals[intervals > 0]))
+        backwards = intervals < 0
+        timing_gaps = intervals > GAP_FACTOR * report.packet_interval
+        report.add_events("timestamp_backwards", backwards, offsets, timestamps, intervals)
+        report.add_events("timing_gap", timing_gaps & (report.packet_interval > 0), offsets, timestamps, intervals)
+        deviation = intervals[~backwards & ~timing_gaps] - report.packet_interval
+        if report.packets == 0:
+            deviation = deviation[1:]
+        jitter_sum += float(deviation.sum())
+        jitter_sumsq += float(np.square(deviation).sum())
+        jitter_count += len(deviation)
+        if len(deviation):
+            report.jitter_max = max(report.jitter_max, float(np.abs(deviation).max()))
+        
+        # MSOP header time, only checked where it is set
+        header = _header_times(packets)
+        header_before = np.concatenate(([prev_header], header[:-1]))
+        header_backwards = (header > 0) & (header_before > 0) & (header < header_before)
+        report.add_events("header_time_backwards", header_backwards, offsets, timestamps, header - header_before)
+        
+        report.packets += count
+        report.last_timestamp = float(timestamps[-1])
+        end = int(offsets[-1])
+        previous = (last[-1], unwrapped_last[-1], high[-1], first[-1], last[-1], timestamps[-1], header[-1])
+    
+    # Walk the records after the last MSOP packet, to see if the last one is cut off
+    for record in pcap.records(end):
+        end = record.data_start + record.caplen
+    report.truncated = end != len(pcap)
+    
+    if jitter_count:
+        mean = jitter_sum / jitter_count
+        report.jitter_std = max(jitter_sumsq / jitter_count - mean * mean, 0.0) ** 0.5
+    
+    # Packets holding datablocks of each frame, same as FrameIndex
+    if report.packets:
+        starts = np.array([0] + wraps, dtype=np.int64)
+        ends = np.append(starts[1:], report.packets * BLOCKS_PER_PACKET) - 1
+        report.frame_packets = ends // BLOCKS_PER_PACKET - starts // BLOCKS_PER_PACKET + 1
+    return report
@@ -0,0 +1,246 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Cuts the points of each frame into fixed azimuth slices (eg. 30deg), and hands each slice on
+as soon as the sensor has turned past its end, instead of waiting for the whole 360deg turn.
+Each slice has a sequence number (counting every slice sent) and the frame and slice number it belongs to,
+so consumers can update sector analyses mid-rotation (see SectorAccumulator).
+
+A slice is complete once a datablock at or past its end azimuth has arrived. Slices are cut on the azimuth
+of each point, so second firings (+0.35deg) fall in the same slices as with CompactFrame.azimuth,
+except second firings past 360deg, which stay in the last slice of the frame.
+Every frame is sent as all of its slices in order, slices the frame does not cover (eg. frame 1 starts partway
+through a turn) are sent empty. Slices of the last frame are only sent up to where the capture ends.
+'''
+
+from typing import Iterable, Iterator, NamedTuple
+import numpy as np
+from .compact import CompactFrame
+from .decoder import BLOCKS_PER_PACKET, POINT_DTYPE, RETURNS_PER_BLOCK, decode_compact
+from .index import find_wraps
+from .pcap import PcapReader
+from .trig import AZIMUTH_CODES
+
+SLICE_DEGREES = 30    # Default width of each slice (in degrees)
+
+
+class SectorSlice(NamedTuple):
+    """ Points of one azimuth slice of a frame.
+
+        sequence: Number of slices sent before this one (starts at 0), a gap means slices were lost
+        frame: Frame number (starts at 1, same as iter_frames)
+        sector: Slice number within the frame (starts at 0 at azimuth 0)
+        start_azimuth, end_azimuth: Azimuth range of the slice (in degrees), start inclusive and end exclusive
+        timestamp: Timestamp (in seconds) of the datablock that completed the slice
+        points: Structured array (POINT_DTYPE), one entry per point
+    """
+    sequence: int
+    frame: int
+    sector: int
+    start_azimuth: float
+    end_azimuth: float
+    timestamp: float
+    points: np.ndarray
+
+
+class SectorSlicer:
+    """ Cuts batches of MSOP packets into SectorSlice, keeping the points of slices not complete yet.
+
+        Args:
+           slice_degrees: Width of each slice (in degrees), the last slice of a turn is shorter if it does not divide 360
+    """
+
+    def __init__(self, slice_degrees: float = SLICE_DEGREES):
+        self.width = int(round(slice_degrees * 100))    # In 0.01deg
+        self.num_slices = -(-AZIMUTH_CODES // self.width)
+        self.sequence = 0
+        self.frame = 1
+        self.emitted = 0    # Number of slices of the current frame already sent
+        self._points = np.empty(0, dtype=POINT_DTYPE)
+        self._slices = np.empty(0, dtype=np.int64)
+        self._previous = None
+
+    def feed(self, timestamps: np.ndarray, packets: np.ndarray) -> list[SectorSlice]:
+        """ Returns slices completed by a batch of packets, in order.
+
+            Args:
+               timestamps: Timestamp (in seconds) of each packet
+               packets: Structured array of packets (MSOP_DTYPE)
+        """
+        points = decode_compact(packets)
+        azimuths = packets["blocks"]["azimuth"].ravel().astype(np.int64)
+        block_timestamps = np.repeat(timestamps, BLOCKS_PER_PACKET)
+        
+        # Second firings past 360deg are below the azimuth of their datablock
+        unwrapped = points["azimuth"].astype(np.int64)
+        unwrapped[unwrapped < np.repeat(azimuths, RETURNS_PER_BLOCK)] += AZIMUTH_CODES
+        slices = np.minimum(unwrapped // self.width, self.num_slices - 1)
+        
+        out = []
+        cut = 0
+        for pos in find_wraps(azimuths, self._previous):
+            self._add(points[cut * RETURNS_PER_BLOCK:pos * RETURNS_PER_BLOCK], slices[cut * RETURNS_PER_BLOCK:pos * RETURNS_PER_BLOCK])
+            self._close(np.full(self.num_slices - self.emitted, float(block_timestamps[pos])), out)
+            self.frame += 1
+            self.emitted = 0
+            cut = pos
+        self._add(points[cut * RETURNS_PER_BLOCK:], slices[cut * RETURNS_PER_BLOCK:])
+        
+        # Slices ending at or before the last datablock are complete,
+        # each one at the first datablock past its end
+        azimuths = azimuths[cut:]
+        complete = min(int(azimuths[-1]) // self.width, self.num_slices)
+        if complete > self.emitted:
+            ends = np.arange(self.emitted + 1, complete + 1) * self.width
+            first_past = np.minimum(np.searchsorted(azimuths, ends), len(azimuths) - 1)
+            self._close(block_timestamps[cut:][first_past], out)
+        
+        self._previous = azimuths[-1]
+        return out
+
+    def _add(self, points: np.ndarray, slices: np.ndarray):
+        """ Keeps points until their slice is complete
+
+            Args:
+               points: Structured array (POINT_DTYPE)
+               slices: Slice number of each point
+        """
+        if len(points) == 0:
+            return
+        # Points behind a slice already sent (azimuth jitter) go in the next slice not sent yet
+        slices = np.maximum(slices, self.emitted)
+        self._points = np.concatenate((self._points, points))
+        self._slices = np.concatenate((self._slices, slices))
+
+    def _close(self, timestamps: np.ndarray, out: list[SectorSlice]):
+        """ Sends the next len(timestamps) slices of the current frame
+
+            Args:
+               timestamps: Timestamp each slice was completed at
+               out: List to add the slices to
+        """
+        upto = self.emitted + len(timestamps)
+        closing = self._slices < upto
+        order = np.argsort(self._slices[closing], kind="stable")
+        points = self._points[closing][order]
+        bounds = np.searchsorted(self._slices[closing][order], np.arange(self.emitted, upto + 1))
+        
+        for i, sector in enumerate(range(self.emitted, upto)):
+            out.append(SectorSlice(self.sequence, self.frame, sector,
+                                   sector * self.width / 100, min((sector + 1) * self.width, AZIMUTH_CODES) / 100,
+                                   float(timestamps[i]), points[bounds[i]:bounds[i + 1]]))
+            self.sequence += 1
+        
+        self._points = self._points[~closing]
+        self._slices = self._slices[~closing]
+        self.emitted = upto
+
+
+class SectorAccumulator:
+    """ Adds up the slices of the current frame, so sector analyses can be updated after every slice.
+
+        Keeps a 256-bin intensity histogram of each slice, so reflectivity ratios of any threshold and slice range
+        cost the same no matter how many points there are.
+
+        Args:
+           num_slices: Number of slices per frame (SectorSlicer.num_slices)
+    """
+
+    def __init__(self, num_slices: int):
+        self.num_slices = num_slices
+        self.frame = None
+        self.timestamp = 0.0
+        self.histograms = np.zeros((num_slices, 256), dtype=np.int64)
+        self.slices = []
+
+    def add(self, piece: SectorSlice):
+        """ Adds a slice, starting over if it belongs to a new frame
+
+            Args:
+               piece: Slice from SectorSlicer
+        """
+        if piece.frame != self.frame:
+            self.frame = piece.frame
+            self.timestamp = piece.timestamp
+            self.histograms[:] = 0
+            self.slices = []
+        self.histograms[piece.sector] = np.bincount(piece.points["intensity"], minlength=256)
+        self.slices.append(piece)
+
+    @property
+    def complete(self) -> bool:
+        """ True once every slice of the frame has been added """
+        return len(self.slices) == self.num_slices
+
+    def reflectivity_ratio(self, threshold: int, first_slice: int = 0, last_slice: int = None) -> float:
+        """ Returns fraction of points with intensity above threshold, in slices first_slice to last_slice (inclusive).
+            Same ratio as reflectivity.threshold_ratios, for the slices added so far. Returns nan if there are no points.
+
+            Args:
+               threshold: Reflectivity value (0-255)
+               first_slice: First slice number
+               last_slice: Last slice number, defaults to the last slice
+        """
+        last_slice = self.num_slices - 1 if last_slice is None else last_slice
+        histogram = self.histograms[first_slice:last_slice + 1].sum(axis=0)
+        total = histogram.sum()
+        return float(histogram[threshold + 1:].sum() / total) if total else float("nan")
+
+    def to_frame(self) -> CompactFrame:
+        """ Returns points of the slices added so far as one frame """
+        if not self.slices:
+            return CompactFrame.empty()
+        return CompactFrame(np.concatenate([piece.points for piece in self.slices]), self.frame, self.timestamp)
+
+
+def slice_batches(batches: Iterable[tuple[np.ndarray, np.ndarray]], slice_degrees: float = SLICE_DEGREES) -> Iterator[SectorSlice]:
+    """ Yields each slice of batches of MSOP packets, as soon as it is complete.
+
+        Args:
+           batches: Iterable of (timestamps, packets) with packets as MSOP_DTYPE array
+           slice_degrees: Width of each slice (in degrees)
+    """
+    slicer = SectorSlicer(slice_degrees)
+    for timestamps, packets in batches:
+        yield from slicer.feed(timestamps, packets)
+
+def iter_sector_slices(pcap_path: str, slice_degrees: float = SLICE_DEGREES, batch_size: int = 256, source: str = None) -> Iterator[SectorSlice]:
+    """ Yields each azimuth slice of each frame in a pcap, in order.
+
+        Args:
+           pcap_path: Filename of input pcap file
+           slice_degrees: Width of each slice (in degrees)
+           batch_size: Number of packets decoded at once
+           source: Only use packets sent from this IPv4 address (eg. "192.168.1.200"), for pcaps with more than 1 sensor
+    """
+    with PcapReader(pcap_path) as pcap:
+        batches = ((timestamps, packets) for timestamps, _, packets in pcap.iter_batches(batch_size, source=source))
+        yield from slice_batches(batches, slice_degrees)
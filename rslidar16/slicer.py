@@ -0,0 +1,136 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Cuts a frame range or time window out of a pcap file into a new, smaller pcap file.
+The byte range of the records is found using the frame index (see index.py), only the records at the edges are read,
+and the records in between are copied byte for byte, without looking at each packet.
+
+A slice of frames starts with the packet before the first frame, so like a real capture, frame 1 of the slice
+is a partial frame and the first target frame is frame 2 (unless the first target frame is frame 1).
+It ends with the packet after the last frame, which marks the end of the last frame.
+'''
+
+from .decoder import DIFOP_MAGIC, DIFOP_PACKET_SIZE
+from .index import FrameIndex
+from .pcap import PCAP_GLOBAL_HEADER_SIZE, PcapReader
+
+COPY_CHUNK_SIZE = 8 * 1024 * 1024    # Bytes copied at once
+
+
+def record_end(pcap: PcapReader, offset: int) -> int:
+    """ Returns byte offset of the end of the record at offset.
+
+        Args:
+           pcap: mmap pcap reader object (rslidar16.PcapReader)
+           offset: Byte offset of the record header
+    """
+    record = next(pcap.records(offset), None)
+    return len(pcap) if record is None else record.data_start + record.caplen
+
+def frame_range_bounds(pcap: PcapReader, index: FrameIndex, first_frame: int, last_frame: int) -> tuple[int, int, int]:
+    """ Returns (start, end, frame number in slice) of the records holding frames first_frame to last_frame (inclusive).
+        Frame number in slice is the frame number first_frame will have in the slice.
+
+        Args:
+           pcap: mmap pcap reader object (rslidar16.PcapReader)
+           index: Frame index of the pcap
+           first_frame: Frame number to start from (inclusive)
+           last_frame: Frame number to stop at (inclusive)
+    """
+    first_frame = max(first_frame, 1)
+    last_frame = min(last_frame, len(index))
+    if first_frame > last_frame:
+        raise ValueError(f"{pcap.filename} has no frames {first_frame}-{last_frame} (it has {len(index)} frames)")
+    
+    if first_frame == 1:
+        start, slice_frame = PCAP_GLOBAL_HEADER_SIZE, 1
+    elif index[first_frame]["first_block"] > 0:
+        # Packet holding the start of the frame also holds the end of the frame before
+        start, slice_frame = int(index[first_frame]["offset"]), 2
+    else:
+        start, slice_frame = int(index[first_frame - 1]["last_offset"]), 2
+    
+    if last_frame < len(index):
+        end = record_end(pcap, int(index[last_frame + 1]["offset"]))
+    else:
+        end = len(pcap)
+    return start, end, slice_frame
+
+def time_range_bounds(pcap: PcapReader, index: FrameIndex, start_time: float, end_time: float) -> tuple[int, int]:
+    """ Returns (start, end) of the records with timestamps between start_time and end_time (inclusive).
+
+        Args:
+           pcap: mmap pcap reader object (rslidar16.PcapReader)
+           index: Frame index of the pcap
+           start_time: pcap timestamp (in seconds)
+           end_time: pcap timestamp (in seconds)
+    """
+    frames = index.frames_between(start_time, end_time)
+    if len(frames) == 0:
+        raise ValueError(f"{pcap.filename} has no packets between {start_time} and {end_time}")
+    
+    # Only records of the first and last frame are read
+    start = len(pcap)
+    for record in pcap.records(int(index[frames.start]["offset"])):
+        if record.timestamp >= start_time:
+            start = record.offset
+            break
+    end = len(pcap)
+    for record in pcap.records(max(int(index[frames.stop - 1]["offset"]), start)):
+        if record.timestamp > end_time:
+            end = record.offset
+            break
+    return start, end
+
+def slice_pcap(pcap: PcapReader, out_filename: str, start: int, end: int, keep_difop: bool = True) -> int:
+    """ Saves records in [start, end) of a pcap as a new pcap file, returns number of bytes saved.
+
+        Args:
+           pcap: mmap pcap reader object (rslidar16.PcapReader)
+           out_filename: Filename of output pcap file
+           start: Byte offset of the first record header
+           end: Byte offset to stop at (end of the last record)
+           keep_difop: If true and there is no DIFOP packet in the slice, the first DIFOP packet before it is added,
+                       so the vertical angles calibrated for the unit can still be read from the slice
+    """
+    ranges = [(0, PCAP_GLOBAL_HEADER_SIZE)]
+    if keep_difop and pcap.find_record(start, end, DIFOP_MAGIC, DIFOP_PACKET_SIZE) == end:
+        difop = pcap.find_record(PCAP_GLOBAL_HEADER_SIZE, start, DIFOP_MAGIC, DIFOP_PACKET_SIZE)
+        if difop < start:
+            ranges.append((difop, record_end(pcap, difop)))
+    ranges.append((start, end))
+    
+    written = 0
+    with open(out_filename, "wb") as f, memoryview(pcap.buffer) as view:
+        for range_start, range_end in ranges:
+            for chunk_start in range(range_start, range_end, COPY_CHUNK_SIZE):
+                written += f.write(view[chunk_start:min(chunk_start + COPY_CHUNK_SIZE, range_end)])
+    return written
@@ -0,0 +1,153 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Converts returns to (x, y, z) cartesian coordinates using precomputed lookup tables.
+The vertical angle only comes from 16 channels, and the azimuth is in steps of 0.01deg,
+so sin/cos of both are computed once (16 + 36000 values) instead of for every return.
+Conversion of a whole frame is then a few gathers and multiplies.
+
+Vertical angles default to CHANNEL_LIST, or can be loaded from the DIFOP packets in the pcap,
+which hold the vertical angles calibrated for each unit.
+'''
+
+from functools import lru_cache
+from typing import Optional
+import numpy as np
+from .decoder import CHANNEL_LIST, DIFOP_MAGIC, DIFOP_PACKET_SIZE, parse_vertical_angles
+from .pcap import PcapReader
+
+AZIMUTH_CODES = 36000    # Azimuth is sent in 0.01deg
+
+
+@lru_cache(maxsize=None)
+def _azimuth_tables(dtype: str = "f8") -> tuple[np.ndarray, np.ndarray]:
+    azimuth = np.radians(np.arange(AZIMUTH_CODES) / 100)
+    return np.cos(azimuth).astype(dtype), np.sin(azimuth).astype(dtype)
+
+def azimuth_to_code(azimuth: np.ndarray) -> np.ndarray:
+    """ Returns azimuth codes (in 0.01deg, 0-35999) of azimuths in degrees.
+
+        Args:
+           azimuth: Horizontal angle of each return (in degrees)
+    """
+    return np.rint(np.asarray(azimuth) * 100).astype(np.int32) % AZIMUTH_CODES
+
+
+class TrigTables:
+    """ sin/cos lookup tables of each channel and each azimuth code.
+
+        Use get_trig_tables() to share tables between callers.
+
+        Args:
+           vertical_angles: Vertical angle of each channel (in degrees)
+    """
+
+    def __init__(self, vertical_angles):
+        self.vertical_angles = np.array(vertical_angles, dtype=np.float64)
+        vert = np.radians(self.vertical_angles)
+        self.vert_cos = np.cos(vert)
+        self.vert_sin = np.sin(vert)
+        self.azimuth_cos, self.azimuth_sin = _azimuth_tables()
+        
+        # float32 copies, for float32 distances
+        self._float32 = (
+            self.vert_cos.astype(np.float32),
+            self.vert_sin.astype(np.float32),
+        ) + _azimuth_tables("f4")
+
+    def cartesian(self, distance: np.ndarray, azimuth_code: np.ndarray, channel: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ Returns (x, y, z) cartesian coordinates, float32 if distance is float32, else float64.
+
+            Args:
+               distance: Distance to each return (in meters)
+               azimuth_code: Horizontal angle of each return (in 0.01deg, see azimuth_to_code)
+               channel: Channel number of each return (0-15)
+        """
+        if distance.dtype == np.float32:
+            vert_cos, vert_sin, azimuth_cos, azimuth_sin = self._float32
+        else:
+            vert_cos, vert_sin, azimuth_cos, azimuth_sin = self.vert_cos, self.vert_sin, self.azimuth_cos, self.azimuth_sin
+        
+        horiz = distance * vert_cos[channel]
+        x = horiz * np.take(azimuth_cos, azimuth_code, mode="wrap")
+        y = horiz * np.take(azimuth_sin, azimuth_code, mode="wrap")
+        z = distance * vert_sin[channel]
+        return (x, y, z)
+
+    def returns_to_cartesian(self, returns) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ Returns (x, y, z) cartesian coordinates of decoded returns.
+
+            Args:
+               returns: decoded returns (rslidar16.Returns)
+        """
+        return self.cartesian(returns.distance, azimuth_to_code(returns.azimuth), returns.channel)
+
+
+@lru_cache(maxsize=None)
+def get_trig_tables(vertical_angles: tuple = None) -> TrigTables:
+    """ Returns cached lookup tables for vertical_angles (defaults to CHANNEL_LIST).
+
+        Args:
+           vertical_angles: Tuple of the vertical angle of each channel (in degrees)
+    """
+    return TrigTables(CHANNEL_LIST if vertical_angles is None else vertical_angles)
+
+def read_vertical_angles(pcap: PcapReader, source: str = None) -> Optional[list[float]]:
+    """ Returns calibrated vertical angles from the first valid DIFOP packet in a pcap, or None if there is none.
+
+        Args:
+           pcap: mmap pcap reader object (rslidar16.PcapReader)
+           source: Only use DIFOP packets sent from this IPv4 address, for pcaps with more than 1 sensor
+    """
+    for _, difop in pcap.iter_payloads(DIFOP_MAGIC, DIFOP_PACKET_SIZE, source=source):
+        angles = parse_vertical_angles(difop)
+        if angles is not None:
+            return angles
+    return None
+
+def load_trig_tables(pcap_filename: str, use_difop: bool = True, source: str = None) -> TrigTables:
+    """ Returns lookup tables for a pcap, with vertical angles from its DIFOP packets if use_difop is set.
+        Falls back to CHANNEL_LIST if the pcap has no valid DIFOP packet.
+
+        Args:
+           pcap_filename: Filename of input pcap file
+           use_difop: Load vertical angles from the DIFOP packets
+           source: Only use DIFOP packets sent from this IPv4 address, for pcaps with more than 1 sensor
+    """
+    if not use_difop:
+        return get_trig_tables()
+    
+    with PcapReader(pcap_filename) as pcap:
+        angles = read_vertical_angles(pcap, source)
+    if angles is None:
+        print(f"No DIFOP calibration in {pcap_filename}, using default vertical angles")
+        return get_trig_tables()
+    return get_trig_tables(tuple(angles))
@@ -0,0 +1,93 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Writes rendered frames straight into a video file (with OpenCV) as they are produced, in the order they are given,
+so frames do not need to be saved as images and read back to make a video.
+The video is opened when the first frame arrives, with the size of that frame.
+'''
+
+import numpy as np
+
+VIDEO_FPS = 10      # Frames per second of output video
+VIDEO_FOURCC = 0    # Codec of output video, 0 for uncompressed, or a 4 letter code (eg. "MJPG", "XVID")
+
+
+class VideoSink:
+    """ Adds RGB images to a video file, one frame at a time.
+
+        Args:
+           filename: Filename of output video (eg. "video.avi")
+           fps: Frames per second
+           fourcc: Codec, 0 for uncompressed, or a 4 letter code (eg. "MJPG")
+    """
+
+    def __init__(self, filename: str, fps: float = VIDEO_FPS, fourcc=VIDEO_FOURCC):
+        self.filename = filename
+        self.fps = fps
+        self.fourcc = fourcc
+        self.writer = None
+        self.size = None
+        self.frames = 0
+
+    def write(self, image: np.ndarray):
+        """ Adds an image as the next frame of the video
+
+            Args:
+               image: RGB image (uint8, shape (height, width, 3)), same size as the first frame
+        """
+        import cv2
+        
+        height, width = image.shape[:2]
+        if self.writer is None:
+            fourcc = cv2.VideoWriter_fourcc(*self.fourcc) if isinstance(self.fourcc, str) else self.fourcc
+            self.writer = cv2.VideoWriter(self.filename, fourcc, self.fps, (width, height))
+            if not self.writer.isOpened():
+                raise OSError(f"Could not open video {self.filename}")
+            self.size = (width, height)
+        elif (width, height) != self.size:
+            raise ValueError(f"Frame is {width}x{height}, video is {self.size[0]}x{self.size[1]}")
+        
+        # OpenCV takes BGR
+        self.writer.write(np.ascontiguousarray(image[:, :, ::-1]))
+        self.frames += 1
+
+    def close(self) -> int:
+        """ Finishes the video file, returns number of frames written """
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+        return self.frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,173 @@
+'''
+MIT License
+
+Copyright (c) 2025 StrixGoldhorn
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+
+
+
+
+
+For Robosense RS-LiDAR-16
+
+What this does:
+Encodes and saves rendered images in the background, so rendering the next frame does not wait for
+PNG compression. Images are handed to a pool of threads (zlib and OpenCV let go of the GIL while encoding)
+or processes through a bounded queue, so only a few images are held in memory at a time.
+
+Images can be saved as PNG (with a chosen zlib level), JPEG or WebP (with OpenCV, at a chosen quality),
+or added to a raw image stack of each folder (FOLDER/images, a metrics store with an "image" and a "name"
+column, see metrics.py), which is the fastest to write and can be read back with MetricsTable.open.
+'''
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import os
+import numpy as np
+from .metrics import MetricsWriter
+from .raster import PNG_COMPRESSION, write_png
+
+IMAGE_FORMATS = ("png", "jpeg", "webp", "npy")
+IMAGE_QUALITY = 90         # Quality of JPEG and WebP images (0-100)
+QUEUE_PER_WORKER = 4       # Images waiting for each worker before the caller waits
+STACK_FOLDER = "images"    # Name of the image stack (npy format) in each folder
+STACK_FLUSH_ROWS = 8       # Images of a stack kept in memory before they are written out
+STACK_NAME_LENGTH = 64     # Max characters of each image name kept in a stack
+
+
+def encode_image(filename: str, image: np.ndarray, image_format: str, compression: int = PNG_COMPRESSION, quality: int = IMAGE_QUALITY) -> str:
+    """ Returns filename, after saving an image in one of the formats (the extension is added if filename has none)
+
+        Args:
+           filename: Filename of output image
+           image: RGB or RGBA image (uint8, shape (height, width, 3 or 4))
+           image_format: "png", "jpeg" or "webp"
+           compression: zlib level of PNG images (0-9)
+           quality: Quality of JPEG and WebP images (0-100)
+    """
+    if not os.path.splitext(filename)[1]:
+        filename += "." + image_format
+    
+    if image_format == "png":
+        write_png(filename, image, compression)
+        return filename
+    
+    import cv2
+    
+    # OpenCV takes BGR, and JPEG has no alpha
+    bgr = np.ascontiguousarray(image[:, :, 2::-1])
+    params = [cv2.IMWRITE_JPEG_QUALITY, quality] if image_format == "jpeg" else [cv2.IMWRITE_WEBP_QUALITY, quality]
+    if not cv2.imwrite(filename, bgr, params):
+        raise OSError(f"Could not save {filename}")
+    return filename
+
+
+class ImageWriter:
+    """ Saves images in the background, in one format.
+
+        Use as a context manager, or call close() when done.
+
+        Args:
+           image_format: "png", "jpeg", "webp", or "npy" (raw image stack of each folder)
+           workers: Number of threads (or processes) encoding images, 0 to save each image as it is given
+           processes: If true, images are encoded by processes instead of threads
+           queue_size: Images waiting to be saved before write waits, defaults to QUEUE_PER_WORKER per worker
+           compression: zlib level of PNG images (0-9), lower is faster and larger
+           quality: Quality of JPEG and WebP images (0-100)
+    """
+
+    def __init__(self, image_format: str = "png", workers: int = 2, processes: bool = False, queue_size: int = None,
+                 compression: int = PNG_COMPRESSION, quality: int = IMAGE_QUALITY):
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"image_format must be one of {IMAGE_FORMATS}")
+        
+        self.image_format = image_format
+        self.compression = compression
+        self.quality = quality
+        self.written = 0
+        self.pending = deque()
+        self.stacks = {}    # Image stack of each folder (npy format)
+        
+        # Stacks are written in order by the caller, there is nothing to encode
+        if workers and image_format != "npy":
+            self.queue_size = queue_size or QUEUE_PER_WORKER * workers
+            self.pool = (ProcessPoolExecutor if processes else ThreadPoolExecutor)(workers)
+        else:
+            self.pool = None
+
+    def write(self, filename: str, image: np.ndarray):
+        """ Saves an image, waits first if queue_size images are already waiting
+
+            Args:
+               filename: Filename of output image (without extension), or name of the image in the stack of its folder
+               image: RGB or RGBA image (uint8, shape (height, width, 3 or 4)), must not be changed after
+        """
+        if self.image_format == "npy":
+            self._add_to_stack(filename, image)
+            return
+        
+        if self.pool is None:
+            encode_image(filename, image, self.image_format, self.compression, self.quality)
+            self.written += 1
+            return
+        
+        while len(self.pending) >= self.queue_size:
+            self.pending.popleft().result()
+            self.written += 1
+        self.pending.append(self.pool.submit(encode_image, filename, image, self.image_format, self.compression, self.quality))
+
+    def _add_to_stack(self, filename: str, image: np.ndarray):
+        folder, name = os.path.split(filename)
+        stack = self.stacks.get(folder)
+        if stack is None:
+            columns = {"image": ("u1", image.shape), "name": (f"U{STACK_NAME_LENGTH}", ())}
+            stack = MetricsWriter(os.path.join(folder, STACK_FOLDER), columns, flush_rows=STACK_FLUSH_ROWS)
+            self.stacks[folder] = stack
+        stack.append(image=image, name=name)
+        self.written += 1
+
+    def close(self, cancel: bool = False) -> int:
+        """ Waits for the images left and closes the image stacks, returns number of images saved
+
+            Args:
+               cancel: If true, images not yet started are dropped instead
+        """
+        try:
+            while self.pending and not cancel:
+                self.pending.popleft().result()
+                self.written += 1
+        finally:
+            if self.pool is not None:
+                for future in self.pending:
+                    future.cancel()
+                self.pending.clear()
+                self.pool.shutdown()
+                self.pool = None
+            for stack in self.stacks.values():
+                stack.close()
+            self.stacks = {}
+        return self.written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        self.close(cancel=exc_type is not None)